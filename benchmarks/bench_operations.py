@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Bootstrap operation benchmarks
+
+Times the bootstrap operations that scale with installation size, on
+synthetic fixtures built in a temporary directory:
+
+    copy_framework_files        fresh install of an N-file engine
+    copy.shutil_copytree        the same copy with shutil.copytree (the pre-copy-engine path)
+    copy.copy_engine            the same copy with specpilot.copy_engine.copy_tree
+    update_engine_files.noop    update check against a current engine
+    update_engine_files.1pct    update with 1% of the engine files changed
+    create_backup               backup after 1% churn, on top of a history
+    rollback_update             restore the newest backup
+    cleanup_old_backups         prune a history of B backups down to 3
+    log_index.refresh           cold offset index of an M-MB specpilot.log
+    session_analytics.update    cold session analytics over the same log
+
+Usage:
+    python3 benchmarks/bench_operations.py run --scale small
+    python3 benchmarks/bench_operations.py run --scale large --save benchmarks/results/baseline.json
+    python3 benchmarks/bench_operations.py compare baseline.json current.json --threshold 0.15
+
+Scales (engine files / backup counts / log sizes):
+    small     100, 1000                 / 10, 50        / 10 MB
+    medium    100, 1000, 10000          / 10, 100       / 100 MB
+    large     100, 1000, 10000, 50000   / 10, 100, 300  / 300 MB
+
+compare exits 1 when any case regressed. See harness.py for the counters.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple
+
+import harness
+import synthetic
+
+from specpilot.analytics import SessionAnalytics
+from specpilot.copy_engine import copy_tree
+from specpilot.installer import SpecPilotBootstrap
+from specpilot.log_index import LogIndex
+
+SCALES = {
+    "small": {"engine_files": [100, 1000], "backups": [10, 50], "log_mb": [10]},
+    "medium": {"engine_files": [100, 1000, 10000], "backups": [10, 100], "log_mb": [100]},
+    "large": {"engine_files": [100, 1000, 10000, 50000], "backups": [10, 100, 300], "log_mb": [300]}
+}
+BACKUP_ENGINE_FILES = 1000
+CHURN = 0.01
+KEEP_BACKUPS = 3
+
+
+class Case(NamedTuple):
+    """One benchmark: setup builds the fixture once, prepare resets it before each timed run."""
+    name: str
+    setup: Callable[[Path], Dict]
+    prepare: Callable[[Dict], object]
+    run: Callable[[object], object]
+
+
+def make_bootstrap(target: Path, framework_root: Path) -> SpecPilotBootstrap:
+    bootstrap = SpecPilotBootstrap(str(target))
+    bootstrap.framework_root = framework_root
+    bootstrap.force = True
+    return bootstrap
+
+
+def engine_fixture(workdir: Path, file_count: int) -> Dict:
+    """A framework with an N-file engine and a project installed from it (shared by the engine cases)."""
+    framework = workdir / f"framework_{file_count}"
+    installed = workdir / f"installed_{file_count}"
+    if not framework.exists():
+        synthetic.generate_engine(framework / ".specpilot" / "engine", file_count)
+        installed.mkdir()
+        bootstrap = make_bootstrap(installed, framework)
+        bootstrap.copy_framework_files()
+        bootstrap.create_backup()
+    return {"framework": framework, "installed": installed, "workdir": workdir, "files": file_count}
+
+
+def engine_cases(file_count: int) -> List[Case]:
+    def setup(workdir: Path) -> Dict:
+        return engine_fixture(workdir, file_count)
+
+    def fresh_target(fixture: Dict) -> SpecPilotBootstrap:
+        target = fixture["workdir"] / f"copy_{file_count}"
+        shutil.rmtree(target, ignore_errors=True)
+        target.mkdir()
+        return make_bootstrap(target, fixture["framework"])
+
+    def fresh_copy(fixture: Dict):
+        target = fixture["workdir"] / f"tree_{file_count}"
+        shutil.rmtree(target, ignore_errors=True)
+        return fixture["framework"] / ".specpilot" / "engine", target
+
+    def installed(fixture: Dict) -> SpecPilotBootstrap:
+        return make_bootstrap(fixture["installed"], fixture["framework"])
+
+    def churned(fixture: Dict) -> SpecPilotBootstrap:
+        bootstrap = installed(fixture)
+        synthetic.mutate_files(bootstrap.engine_dir, CHURN, seed=file_count, tag="churn")
+        return bootstrap
+
+    def newest_backup(fixture: Dict):
+        bootstrap = installed(fixture)
+        return bootstrap, str(bootstrap.list_backups()[0]["path"])
+
+    return [
+        Case(f"copy_framework_files[{file_count}]", setup, fresh_target, lambda b: b.copy_framework_files()),
+        Case(f"copy.shutil_copytree[{file_count}]", setup, fresh_copy, lambda paths: shutil.copytree(*paths)),
+        Case(f"copy.copy_engine[{file_count}]", setup, fresh_copy, lambda paths: copy_tree(*paths)),
+        Case(f"update_engine_files.noop[{file_count}]", setup, installed, lambda b: b.update_engine_files()),
+        Case(f"update_engine_files.1pct[{file_count}]", setup, churned, lambda b: b.update_engine_files()),
+        Case(f"create_backup[{file_count}]", setup, churned, lambda b: b.create_backup()),
+        Case(f"rollback_update[{file_count}]", setup, newest_backup, lambda state: state[0].rollback_update(state[1]))
+    ]
+
+
+def cleanup_case(backup_count: int) -> Case:
+    def setup(workdir: Path) -> Dict:
+        template = workdir / f"backups_{backup_count}"
+        if not template.exists():
+            engine_dir = template / ".specpilot" / "engine"
+            synthetic.generate_engine(engine_dir, BACKUP_ENGINE_FILES)
+            synthetic.generate_backup_history(engine_dir, template / ".specpilot" / "backups", backup_count, CHURN)
+        return {"template": template, "workdir": workdir}
+
+    def prepare(fixture: Dict) -> SpecPilotBootstrap:
+        target = fixture["workdir"] / f"cleanup_{backup_count}"
+        shutil.rmtree(target, ignore_errors=True)
+        shutil.copytree(fixture["template"], target)
+        return SpecPilotBootstrap(str(target))
+
+    return Case(f"cleanup_old_backups[{backup_count}]", setup, prepare,
+                lambda b: b.cleanup_old_backups(KEEP_BACKUPS))
+
+
+def log_cases(size_mb: int) -> List[Case]:
+    def setup(workdir: Path) -> Dict:
+        logs_dir = workdir / f"logs_{size_mb}mb" / "logs"
+        log_path = logs_dir / "specpilot.log"
+        if not log_path.exists():
+            synthetic.generate_log(log_path, size_mb * 1024 * 1024)
+        return {"logs_dir": logs_dir, "log_path": log_path}
+
+    def cold_index(fixture: Dict) -> LogIndex:
+        index = LogIndex(fixture["log_path"])
+        index.index_path.unlink(missing_ok=True)
+        return index
+
+    def cold_analytics(fixture: Dict) -> SessionAnalytics:
+        analytics = SessionAnalytics(fixture["logs_dir"])
+        analytics.checkpoint_path.unlink(missing_ok=True)
+        return analytics
+
+    return [
+        Case(f"log_index.refresh[{size_mb}MB]", setup, cold_index, lambda index: index.refresh()),
+        Case(f"session_analytics.update[{size_mb}MB]", setup, cold_analytics, lambda analytics: analytics.update())
+    ]
+
+
+def build_cases(scale: str) -> List[Case]:
+    params = SCALES[scale]
+    cases = []
+    for file_count in params["engine_files"]:
+        cases.extend(engine_cases(file_count))
+    cases.extend(cleanup_case(count) for count in params["backups"])
+    for size_mb in params["log_mb"]:
+        cases.extend(log_cases(size_mb))
+    return cases
+
+
+def format_row(name: str, result: Dict) -> str:
+    syscalls = "-" if result["read_syscalls"] is None else result["read_syscalls"] + result["write_syscalls"]
+    return (f"{name:<40} {result['median_ms']:>10.2f} {result['min_ms']:>10.2f} {result['stdev_ms']:>8.2f} "
+            f"{result['peak_rss_kb'] / 1024:>8.1f} {syscalls:>10}")
+
+
+def run_command(args) -> int:
+    cases = [case for case in build_cases(args.scale) if not args.only or args.only in case.name]
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="specpilot-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    results = {}
+    print(f"{'case':<40} {'median ms':>10} {'min ms':>10} {'stdev':>8} {'rss MB':>8} {'syscalls':>10}")
+    try:
+        for case in cases:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                fixture = case.setup(workdir)
+            results[case.name] = harness.measure(case.prepare, case.run, fixture, args.repeats, args.warmup)
+            print(format_row(case.name, results[case.name]), flush=True)
+    finally:
+        if not args.workdir and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    if args.save:
+        harness.save_results(Path(args.save), args.scale, results)
+        print(f"\nSaved {len(results)} results to {args.save}")
+    return 0
+
+
+def compare_command(args) -> int:
+    rows = harness.compare(harness.load_results(Path(args.baseline)), harness.load_results(Path(args.current)),
+                           args.threshold, args.rss_threshold)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'case':<40} {'baseline':>10} {'current':>10} {'ratio':>7}  status")
+        for row in rows:
+            status = "REGRESSION " + ", ".join(row["reasons"]) if row["regression"] else "ok"
+            print(f"{row['case']:<40} {row['baseline_ms']:>10.2f} {row['current_ms']:>10.2f} "
+                  f"{row['time_ratio']:>7.2f}  {status}")
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SpecPilot bootstrap operations")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument('--scale', choices=sorted(SCALES), default='small', help='Fixture sizes (default: small)')
+    run_parser.add_argument('--repeats', type=int, default=5, help='Timed repetitions per case (default: 5)')
+    run_parser.add_argument('--warmup', type=int, default=1, help='Untimed repetitions first (default: 1)')
+    run_parser.add_argument('--only', help='Run only cases whose name contains this text')
+    run_parser.add_argument('--save', help='Write the results as JSON (usable as a baseline)')
+    run_parser.add_argument('--workdir', help='Build fixtures here and keep them for later runs')
+    run_parser.add_argument('--keep', action='store_true', help='Keep the temporary fixture directory')
+
+    compare_parser = commands.add_parser("compare", help="Compare results against a baseline")
+    compare_parser.add_argument('baseline', help='Baseline results file')
+    compare_parser.add_argument('current', help='Current results file')
+    compare_parser.add_argument('--threshold', type=float, default=0.15,
+                                help='Allowed relative growth of median time and syscalls (default: 0.15)')
+    compare_parser.add_argument('--rss-threshold', type=float, default=0.25,
+                                help='Allowed relative growth of peak RSS (default: 0.25)')
+    compare_parser.add_argument('--json', action='store_true', help='Print the comparison as JSON')
+
+    args = parser.parse_args(argv)
+    return run_command(args) if args.command == "run" else compare_command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Start-up benchmark for bootstrap.py
+
+Measures wall-clock time of fresh bootstrap.py processes, the cost CI wrappers
+pay on every call, against a bare interpreter. Each scenario runs once to warm
+the bytecode and disk caches, then --runs times; the best and median times are
+reported. Exits 1 if any bootstrap scenario's best time is above --target-ms.
+
+The commands run with bytecode writing enabled (PYTHONDONTWRITEBYTECODE is
+cleared), as on a normal install, so the warm-up run leaves cached .pyc files.
+
+Usage:
+    python3 benchmarks/bench_startup.py
+    python3 benchmarks/bench_startup.py --runs 50 --target-ms 40 --json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BOOTSTRAP = REPO_ROOT / "bootstrap.py"
+
+
+def scenarios(project: Path):
+    """(name, argv, counts_toward_target) for every measured command."""
+    python = sys.executable
+    return [
+        ("python -c pass", [python, "-c", "pass"], False),
+        ("import bootstrap", [python, "-c", f"import sys; sys.path.insert(0, {str(REPO_ROOT)!r}); import bootstrap"],
+         True),
+        ("bootstrap --help", [python, str(BOOTSTRAP), "--help"], True),
+        ("config show --json", [python, str(BOOTSTRAP), str(project), "config", "show", "--json"], True),
+        ("update --force --quiet (missing install)",
+         [python, str(BOOTSTRAP), str(project), "update", "--force", "--quiet"], True),
+    ]
+
+
+def time_command(argv, runs: int):
+    """Run a command once to warm up, then return per-run wall times in milliseconds."""
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+    subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark bootstrap.py cold start")
+    parser.add_argument('--runs', type=int, default=20, help='Timed runs per scenario (default: 20)')
+    parser.add_argument('--target-ms', type=float, default=40.0, help='Best-time budget per scenario (default: 40)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args(argv)
+
+    project = Path(tempfile.mkdtemp(prefix="specpilot-startup-"))
+    try:
+        results = []
+        for name, command, gated in scenarios(project):
+            times = time_command(command, args.runs)
+            results.append({
+                'scenario': name,
+                'best_ms': round(min(times), 2),
+                'median_ms': round(statistics.median(times), 2),
+                'gated': gated,
+                'pass': not gated or min(times) <= args.target_ms
+            })
+    finally:
+        shutil.rmtree(project, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps({'target_ms': args.target_ms, 'runs': args.runs, 'results': results}, indent=2))
+    else:
+        print(f"{'scenario':<42} {'best ms':>9} {'median ms':>10}  target {args.target_ms:g} ms")
+        for result in results:
+            verdict = ("ok" if result['pass'] else "OVER") if result['gated'] else "baseline"
+            print(f"{result['scenario']:<42} {result['best_ms']:>9.2f} {result['median_ms']:>10.2f}  {verdict}")
+    return 0 if all(result['pass'] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
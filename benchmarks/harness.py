@@ -0,0 +1,208 @@
+"""
+Benchmark harness
+
+Runs every measured repetition in a forked child, so each one starts from
+the same parent state and its memory and I/O counters belong to it alone:
+
+    prepare(context) -> state     untimed; resets the on-disk fixture
+    run(state)                    timed
+
+Per repetition the child reports:
+    wall_ms             time.perf_counter() around run()
+    peak_rss_kb         peak resident set during run() (VmHWM, reset through
+                        /proc/self/clear_refs; getrusage ru_maxrss elsewhere)
+    read_syscalls       read-class system calls (/proc/self/io syscr)
+    write_syscalls      write-class system calls (/proc/self/io syscw)
+    read_bytes          bytes passed to read calls (rchar)
+    write_bytes         bytes passed to write calls (wchar)
+The /proc counters are Linux-only and reported as None elsewhere.
+
+Results are saved as JSON baselines; compare() flags cases whose median time
+(or peak RSS, or syscall count) grew by more than a threshold.
+"""
+
+import contextlib
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+RESULTS_VERSION = 1
+IO_FIELDS = {"syscr": "read_syscalls", "syscw": "write_syscalls", "rchar": "read_bytes", "wchar": "write_bytes"}
+
+
+def read_io_counters() -> Dict[str, Optional[int]]:
+    """The calling process's I/O counters, or Nones where /proc/self/io is unavailable."""
+    counters = {name: None for name in IO_FIELDS.values()}
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in IO_FIELDS:
+                    counters[IO_FIELDS[key]] = int(value)
+    except OSError:
+        pass
+    return counters
+
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's peak-RSS mark for this process (Linux 4.0+); False if unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_kb(reset_supported: bool) -> int:
+    """Peak resident set size in KiB since the last reset (or since process start)."""
+    if reset_supported:
+        try:
+            with open("/proc/self/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB on Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def measure_once(prepare: Callable, run: Callable, context) -> Dict:
+    """Run one repetition in a forked child and return its counters."""
+    # Unflushed parent output would otherwise be written twice
+    sys.stdout.flush()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        status = 0
+        try:
+            # Operation output would swamp the benchmark report
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                state = prepare(context)
+                reset_supported = reset_peak_rss()
+                before = read_io_counters()
+                start = time.perf_counter()
+                run(state)
+                wall_ms = (time.perf_counter() - start) * 1000
+                after = read_io_counters()
+            sample = {"wall_ms": wall_ms, "peak_rss_kb": peak_rss_kb(reset_supported)}
+            for name in IO_FIELDS.values():
+                sample[name] = None if before[name] is None else after[name] - before[name]
+        except BaseException as e:  # noqa: B902 - everything must reach the parent
+            sample = {"error": f"{type(e).__name__}: {e}"}
+            status = 1
+        with os.fdopen(write_fd, "w") as pipe:
+            json.dump(sample, pipe)
+        os._exit(status)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, "r") as pipe:
+        payload = pipe.read()
+    os.waitpid(pid, 0)
+    sample = json.loads(payload) if payload else {"error": "benchmark child exited without a result"}
+    if "error" in sample:
+        raise RuntimeError(sample["error"])
+    return sample
+
+
+def summarize(samples: List[Dict]) -> Dict:
+    """Median, best and spread of the timed samples, and the medians of the counters."""
+    times = [sample["wall_ms"] for sample in samples]
+    summary = {
+        "repeats": len(samples),
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+        "max_ms": round(max(times), 3),
+        "stdev_ms": round(statistics.stdev(times), 3) if len(times) > 1 else 0.0,
+        "peak_rss_kb": max(sample["peak_rss_kb"] for sample in samples)
+    }
+    for name in IO_FIELDS.values():
+        values = [sample[name] for sample in samples if sample[name] is not None]
+        summary[name] = int(statistics.median(values)) if values else None
+    return summary
+
+
+def measure(prepare: Callable, run: Callable, context, repeats: int, warmup: int) -> Dict:
+    """Run warmup untimed repetitions, then repeats measured ones, and summarize them."""
+    for _ in range(warmup):
+        measure_once(prepare, run, context)
+    return summarize([measure_once(prepare, run, context) for _ in range(repeats)])
+
+
+def machine_info() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def save_results(path: Path, scale: str, results: Dict[str, Dict]):
+    """Write a results file that can serve as a baseline."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "scale": scale,
+        "machine": machine_info(),
+        "results": results
+    }
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def load_results(path: Path) -> Dict:
+    with open(path, "r") as f:
+        data = json.load(f)
+    if data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path}: unsupported results version {data.get('version')}")
+    return data
+
+
+def compare(baseline: Dict, current: Dict, threshold: float, rss_threshold: float) -> List[Dict]:
+    """
+    Compare the cases present in both result sets.
+
+    A case regresses when its median time grows by more than threshold, its
+    peak RSS by more than rss_threshold, or its syscall count by more than
+    threshold (all relative to the baseline).
+    """
+    rows = []
+    for name in sorted(set(baseline["results"]) & set(current["results"])):
+        before = baseline["results"][name]
+        after = current["results"][name]
+        time_ratio = after["median_ms"] / before["median_ms"] if before["median_ms"] else 1.0
+        rss_ratio = after["peak_rss_kb"] / before["peak_rss_kb"] if before["peak_rss_kb"] else 1.0
+        syscalls_before = (before["read_syscalls"] or 0) + (before["write_syscalls"] or 0)
+        syscalls_after = (after["read_syscalls"] or 0) + (after["write_syscalls"] or 0)
+        syscall_ratio = syscalls_after / syscalls_before if syscalls_before else 1.0
+        reasons = []
+        if time_ratio > 1 + threshold:
+            reasons.append(f"time x{time_ratio:.2f}")
+        if rss_ratio > 1 + rss_threshold:
+            reasons.append(f"rss x{rss_ratio:.2f}")
+        if syscall_ratio > 1 + threshold:
+            reasons.append(f"syscalls x{syscall_ratio:.2f}")
+        rows.append({
+            "case": name,
+            "baseline_ms": before["median_ms"],
+            "current_ms": after["median_ms"],
+            "time_ratio": round(time_ratio, 3),
+            "rss_ratio": round(rss_ratio, 3),
+            "syscall_ratio": round(syscall_ratio, 3),
+            "regression": bool(reasons),
+            "reasons": reasons
+        })
+    return rows
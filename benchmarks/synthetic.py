@@ -0,0 +1,117 @@
+"""
+Synthetic data for the SpecPilot benchmarks
+
+Deterministic generators (seeded) for the inputs the bootstrap operations see
+in large installations: engine trees of any size, backup histories with a
+fixed churn per backup, and multi-hundred-MB milestone logs.
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from specpilot.backup_store import BackupStore  # noqa: E402
+from specpilot.manifest import build_manifest, load_manifest, save_manifest  # noqa: E402
+
+ENGINE_TOP_DIRS = ("core", "reference", "commands", "protocols", "templates")
+FILES_PER_DIR = 100
+WORDS = ("spec", "pilot", "architecture", "roadmap", "convention", "validation", "commit", "session",
+         "golden", "thread", "protocol", "reference", "template", "engine", "workspace", "override")
+LOG_EVENTS = (
+    ("🔄", "MODE_SWITCH", "Switched to Pilot Mode"),
+    ("💡", "CODE_PROPOSED", "Proposed implementation"),
+    ("📐", "DESIGN_PROPOSED", "Proposed design"),
+    ("🔁", "PLAN_ITERATION", "Revised plan after feedback"),
+    ("❌", "VERIFICATION_FAILED", "Tests failed"),
+    ("✅", "VERIFICATION_PASSED", "Tests passed"),
+    ("📦", "GIT_COMMIT_SUCCESS", "Committed feature work")
+)
+
+
+def engine_paths(file_count: int) -> List[str]:
+    """Relative paths of a synthetic engine: the real top-level layout, FILES_PER_DIR files per directory."""
+    paths = []
+    for index in range(file_count):
+        top = ENGINE_TOP_DIRS[index % len(ENGINE_TOP_DIRS)]
+        bucket = index // (FILES_PER_DIR * len(ENGINE_TOP_DIRS))
+        paths.append(f"{top}/group_{bucket:04d}/doc_{index:06d}.md")
+    return paths
+
+
+def markdown_text(rng: random.Random, min_bytes: int = 200, max_bytes: int = 8192) -> str:
+    """Markdown-like filler of a random size."""
+    target = rng.randint(min_bytes, max_bytes)
+    lines = [f"# {rng.choice(WORDS).title()} {rng.randint(1, 999)}", ""]
+    size = len(lines[0])
+    while size < target:
+        line = " ".join(rng.choice(WORDS) for _ in range(12))
+        lines.append(f"- {line}")
+        size += len(line) + 3
+    return "\n".join(lines) + "\n"
+
+
+def generate_engine(engine_dir: Path, file_count: int, seed: int = 0) -> List[str]:
+    """Write a synthetic engine of file_count Markdown files; returns their relative paths."""
+    rng = random.Random(seed)
+    engine_dir = Path(engine_dir)
+    paths = engine_paths(file_count)
+    for relative in paths:
+        path = engine_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(markdown_text(rng), encoding="utf-8")
+    return paths
+
+
+def mutate_files(root: Path, fraction: float, seed: int, tag: str) -> List[str]:
+    """Append a line to a random fraction of the Markdown files under root; returns the changed paths."""
+    rng = random.Random(seed)
+    root = Path(root)
+    files = sorted(path for path in root.rglob("*.md"))
+    count = max(1, int(len(files) * fraction))
+    changed = rng.sample(files, min(count, len(files)))
+    for path in changed:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(f"\n<!-- {tag} -->\n")
+    return [path.relative_to(root).as_posix() for path in changed]
+
+
+def generate_backup_history(engine_dir: Path, backup_dir: Path, count: int, churn: float = 0.01,
+                            seed: int = 0) -> None:
+    """Create count backups of an engine, changing a churn fraction of its files between backups."""
+    store = BackupStore(backup_dir)
+    for index in range(count):
+        if index:
+            mutate_files(engine_dir, churn, seed + index, f"backup {index}")
+        files = build_manifest(engine_dir, load_manifest(engine_dir))
+        save_manifest(engine_dir, files)
+        store.create_snapshot(engine_dir, files)
+
+
+def generate_log(log_path: Path, size_bytes: int, user: str = "developer", seed: int = 0) -> int:
+    """Write a milestone log of roughly size_bytes in the specpilot.log format; returns the event count."""
+    rng = random.Random(seed)
+    log_path = Path(log_path)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    # Events are one to three minutes apart, starting 2025-01-01
+    timestamp = 1735689600
+    written = 0
+    events = 0
+    with open(log_path, "w", encoding="utf-8") as f:
+        while written < size_bytes:
+            block = []
+            for _ in range(1000):
+                timestamp += rng.randint(60, 180)
+                emoji, event_type, message = rng.choice(LOG_EVENTS)
+                when = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(timestamp))
+                block.append(f"{when} - {user} - {emoji} - [{event_type}] - {message} #{events}\n")
+                if event_type == "CODE_PROPOSED":
+                    block.append(f"  Details: {' '.join(rng.choice(WORDS) for _ in range(10))}\n")
+                events += 1
+            chunk = "".join(block)
+            f.write(chunk)
+            written += len(chunk.encode("utf-8"))
+    return events
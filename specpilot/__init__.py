@@ -0,0 +1,6 @@
+"""
+SpecPilot Python Support Package
+
+Helper modules used by bootstrap.py to install, update and maintain the
+SpecPilot engine inside a project.
+"""
@@ -0,0 +1,448 @@
+"""
+SpecPilot Session Analytics
+
+Incrementally maintained Commit Mode intelligence (protocols/commit.md).
+Instead of re-reading both logs on every commit, the aggregates for the
+current session (everything since the last [GIT_COMMIT_SUCCESS]) are kept in
+a small checkpoint and advanced by parsing only bytes appended to the logs
+since the previous update.
+
+Checkpoint: .specpilot/workspace/<user>/cache/session_analytics.json
+
+Scoring (all scores 0-10, one decimal):
+    Frustration          20 x (frustration phrases + corrections) / (user turns + proposals)
+    Productivity         2 x progress events (proposals + successes) per hour
+    Agent Effectiveness  10 - 2 x repeated user requests
+    Vibe                 10 x share of session time spent in Vibe Mode
+
+Mode time is attributed from one event to the next; gaps longer than
+IDLE_GAP_SECONDS count as idle. New events from both logs are applied in
+timestamp order, so a commit splits the transcripts around it correctly; a
+transcript batch older than the last commit that only arrives after it is
+attributed to the previous session. A first run (no checkpoint) also reads
+the rotated log segments back to the last commit they contain.
+
+Usage:
+    python3 -m specpilot.analytics --project . appendix    # render the appendix
+    python3 -m specpilot.analytics --project . json        # raw aggregates and scores
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from specpilot.log_index import LogEvent, fingerprint, iter_events, last_line_end
+
+CHECKPOINT_VERSION = 2
+CHECKPOINT_NAME = "session_analytics.json"
+IDLE_GAP_SECONDS = 30 * 60
+RECENT_PROMPTS = 200
+FLOW_LENGTH = 50
+
+PROPOSAL_EVENTS = {"CODE_PROPOSED", "DESIGN_PROPOSED", "ARCHITECTURE_PROPOSED"}
+CORRECTION_EVENTS = {"VERIFICATION_FAILED", "PLAN_ITERATION", "AI_ERROR"}
+COMMIT_EVENT = "GIT_COMMIT_SUCCESS"
+MODE_PATTERN = re.compile(r"Switched to (.+?) Mode")
+FRUSTRATION_PATTERN = re.compile(
+    r"\b(fix (this|it)|still (not|broken|failing|wrong)|not working|doesn'?t work|didn'?t work|"
+    r"wrong|try again|again\b|that'?s not|why (is|did|does|are)|broken)",
+    re.IGNORECASE
+)
+USER_HEADINGS = ("### USER PROMPT:", "### USER RESPONSE:")
+
+
+def parse_timestamp(timestamp: str) -> float:
+    """Convert a 'YYYY-MM-DD HH:MM:SS' log timestamp to epoch seconds."""
+    return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").timestamp()
+
+
+def is_proposal(event_type: str) -> bool:
+    """Proposals and Pilot step executions count as attempted work items."""
+    return event_type in PROPOSAL_EVENTS or event_type.startswith("Pilot_")
+
+
+def is_success(event_type: str) -> bool:
+    """Approvals, completions and successes count as forward progress."""
+    if event_type == COMMIT_EVENT:
+        return False
+    return event_type.endswith(("_SUCCESS", "_COMPLETE", "_APPROVED"))
+
+
+def extract_user_turns(body: str) -> List[str]:
+    """Pull the user's messages out of a TRANSCRIPT_BATCH body."""
+    turns = []
+    current = None
+    for line in body.splitlines():
+        stripped = line.strip()
+        if stripped in USER_HEADINGS:
+            current = []
+            turns.append(current)
+        elif stripped.startswith("USER:"):
+            current = [stripped[len("USER:"):]]
+            turns.append(current)
+        elif stripped.startswith("###") or stripped == "---" or stripped.startswith("CURSOR:"):
+            current = None
+        elif current is not None:
+            current.append(stripped)
+    return [" ".join(part for part in turn if part).strip() for turn in turns if any(turn)]
+
+
+def empty_session() -> Dict:
+    return {
+        'start': None,
+        'end': None,
+        'mode_seconds': {},
+        'event_counts': {},
+        'proposals': 0,
+        'successes': 0,
+        'corrections': 0,
+        'verification_failures': 0,
+        'plan_iterations': 0,
+        'user_turns': 0,
+        'frustration_hits': 0,
+        'repeat_requests': 0,
+        'flow': []
+    }
+
+
+class SessionAnalytics:
+    """Checkpointed session aggregates for one user workspace."""
+
+    def __init__(self, logs_dir: Path, checkpoint_path: Optional[Path] = None):
+        self.logs_dir = Path(logs_dir)
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else \
+            self.logs_dir.parent / "cache" / CHECKPOINT_NAME
+        self.state = self._empty_state()
+
+    def _empty_state(self) -> Dict:
+        return {
+            'version': CHECKPOINT_VERSION,
+            'logs': {},
+            'current_mode': None,
+            'last_event_time': None,
+            'recent_prompts': [],
+            'last_commit': None,
+            'session': empty_session(),
+            'previous_session': None
+        }
+
+    def load(self):
+        """Load the checkpoint, starting from scratch if it is missing or outdated."""
+        try:
+            with open(self.checkpoint_path, "r") as f:
+                state = json.load(f)
+            if state.get('version') == CHECKPOINT_VERSION:
+                self.state = state
+                return
+        except (OSError, ValueError):
+            pass
+        self.state = self._empty_state()
+
+    def save(self):
+        """Atomically write the checkpoint."""
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, separators=(",", ":"))
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _replay_since(self) -> Optional[str]:
+        """
+        Where a first run starts reading rotated-out history, or None when the live logs suffice.
+
+        The session starts at the last commit, so the replay begins with the
+        newest segment that holds one (mode switches earlier in that segment
+        still seed the current mode); with no commit anywhere it covers all
+        rotated history.
+        """
+        from specpilot.log_index import LogIndex
+        from specpilot.log_rotation import LogRotator
+        rotator = LogRotator(self.logs_dir / "specpilot.log")
+        if LogIndex(rotator.log_path).refresh().offsets(COMMIT_EVENT):
+            return None
+        sources = rotator.archived()
+        if not sources:
+            return None
+        position, _ = rotator.last_archived(COMMIT_EVENT)
+        segment, read = sources[position or 0]
+        if segment is not None:
+            return segment["first_timestamp"]
+        first = next(read(False), None)
+        return first.timestamp if first else None
+
+    def _new_events(self, name: str, include_body: bool, replay_since: Optional[str] = None) -> Iterable[LogEvent]:
+        """
+        Yield events appended to a log since the checkpoint, then advance its offset.
+
+        A log the checkpoint has never seen first replays its rotated-out
+        events from replay_since on. If the checkpointed log has since been
+        rotated, its unread tail is read from the segment it became, then any
+        logs rotated after it, then the new live log from the start.
+        """
+        from specpilot.log_rotation import LogRotator
+        path = self.logs_dir / name
+        rotator = LogRotator(path)
+        position = self.state['logs'].get(name)
+        if position is None:
+            position = {'offset': 0, 'fingerprint': None, 'sequence': rotator.latest_sequence()}
+            if replay_since is not None:
+                yield from rotator.iter_events(since=replay_since, include_body=include_body, include_live=False)
+        else:
+            rotated = rotator.rotated_since(position['sequence'])
+            for number, (_, read) in enumerate(rotated):
+                yield from read(include_body, position['offset'] if number == 0 else 0)
+            if rotated:
+                position = {'offset': 0, 'fingerprint': None, 'sequence': rotated[-1][0]}
+        if not path.exists():
+            self.state['logs'][name] = position
+            return
+        size = path.stat().st_size
+        offset = position['offset']
+        # A log that shrank or was rewritten in place, not through rotation, is read again
+        if size < offset or (offset and fingerprint(path, offset) != position['fingerprint']):
+            offset = 0
+        end = last_line_end(path, offset, size)
+        if end > offset:
+            yield from iter_events(path, offset, end, include_body=include_body)
+        self.state['logs'][name] = {'offset': end, 'fingerprint': fingerprint(path, end),
+                                    'sequence': position['sequence']}
+
+    def update(self) -> "SessionAnalytics":
+        """Fold newly logged events into the checkpoint; cost is O(new events)."""
+        from specpilot.event_store import open_store
+        store = open_store(self.logs_dir)
+        if store is not None:
+            # With the sqlite backend the text logs are an export; render pending rows before reading them
+            try:
+                store.export()
+            finally:
+                store.close()
+        self.load()
+        replay_since = None if self.state['logs'] else self._replay_since()
+        # Merge both logs by timestamp (milestones first within a second) so that
+        # transcripts logged before a commit are applied before it resets the session
+        milestones = ((event.timestamp, 0, event)
+                      for event in self._new_events("specpilot.log", False, replay_since))
+        transcripts = ((event.timestamp, 1, event)
+                       for event in self._new_events("specpilot_verbose.log", True, replay_since)
+                       if event.event_type == "TRANSCRIPT_BATCH")
+        for _, stream, event in heapq.merge(milestones, transcripts, key=lambda item: item[:2]):
+            if stream == 0:
+                self._apply_milestone(event)
+            else:
+                self._apply_transcript(event)
+        self.save()
+        return self
+
+    def _touch(self, session: Dict, timestamp: str):
+        if session['start'] is None or timestamp < session['start']:
+            session['start'] = timestamp
+        if session['end'] is None or timestamp > session['end']:
+            session['end'] = timestamp
+
+    def _apply_milestone(self, event: LogEvent):
+        state = self.state
+        session = state['session']
+        try:
+            event_time = parse_timestamp(event.timestamp)
+        except ValueError:
+            return
+
+        # Attribute the time since the previous event to the mode that was active
+        previous = state['last_event_time']
+        mode = state['current_mode']
+        if previous is not None and mode and 0 <= event_time - previous <= IDLE_GAP_SECONDS:
+            session['mode_seconds'][mode] = session['mode_seconds'].get(mode, 0) + event_time - previous
+        state['last_event_time'] = event_time
+
+        if event.event_type == COMMIT_EVENT:
+            self._touch(session, event.timestamp)
+            state['last_commit'] = event.timestamp
+            state['previous_session'] = session
+            state['session'] = empty_session()
+            return
+
+        self._touch(session, event.timestamp)
+        counts = session['event_counts']
+        counts[event.event_type] = counts.get(event.event_type, 0) + 1
+
+        if event.event_type == "MODE_SWITCH":
+            match = MODE_PATTERN.search(event.message)
+            if match:
+                state['current_mode'] = match.group(1).strip()
+                if not session['flow'] or session['flow'][-1] != state['current_mode']:
+                    session['flow'] = (session['flow'] + [state['current_mode']])[-FLOW_LENGTH:]
+        if is_proposal(event.event_type):
+            session['proposals'] += 1
+        if is_success(event.event_type):
+            session['successes'] += 1
+        if event.event_type in CORRECTION_EVENTS:
+            session['corrections'] += 1
+        if event.event_type == "VERIFICATION_FAILED":
+            session['verification_failures'] += 1
+        if event.event_type == "PLAN_ITERATION":
+            session['plan_iterations'] += 1
+
+    def _apply_transcript(self, event: LogEvent):
+        session = self.state['session']
+        last_commit = self.state.get('last_commit')
+        if last_commit is not None and event.timestamp < last_commit:
+            # Logged before the last commit but read after it: it belongs to the committed session
+            session = self.state['previous_session']
+            if session is None:
+                return
+        elif session['start'] is not None and event.timestamp < session['start']:
+            return
+        recent = self.state['recent_prompts']
+        for turn in extract_user_turns(event.body):
+            session['user_turns'] += 1
+            session['frustration_hits'] += len(FRUSTRATION_PATTERN.findall(turn))
+            normalized = " ".join(turn.lower().split())[:200]
+            digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+            if digest in recent:
+                session['repeat_requests'] += 1
+            else:
+                recent.append(digest)
+        del recent[:-RECENT_PROMPTS]
+
+    def summary(self, lines_changed: Optional[int] = None) -> Dict:
+        """Derive the appendix metrics and scores from the current session aggregates."""
+        session = self.state['session']
+        if session['start'] and session['end']:
+            duration_minutes = (parse_timestamp(session['end']) - parse_timestamp(session['start'])) / 60
+        else:
+            duration_minutes = 0.0
+        hours = max(duration_minutes / 60, 0.25)
+
+        total_mode_seconds = sum(session['mode_seconds'].values())
+        distribution = {
+            mode: round(100 * seconds / total_mode_seconds)
+            for mode, seconds in sorted(session['mode_seconds'].items(), key=lambda item: -item[1])
+        } if total_mode_seconds else {}
+
+        proposals = session['proposals']
+        completed = max(0, proposals - session['verification_failures'])
+        interactions = max(session['user_turns'] + proposals, 1)
+        frustration = min(10.0, round(20 * (session['frustration_hits'] + session['corrections']) / interactions, 1))
+        productivity = min(10.0, round(2 * (proposals + session['successes']) / hours, 1))
+        effectiveness = max(0, 10 - 2 * session['repeat_requests'])
+        vibe_seconds = session['mode_seconds'].get("Vibe", 0)
+        vibe = round(10 * vibe_seconds / total_mode_seconds, 1) if total_mode_seconds else 0.0
+
+        return {
+            'start': session['start'],
+            'end': session['end'],
+            'duration_minutes': round(duration_minutes),
+            'mode_distribution': distribution,
+            'features': proposals,
+            'completed': completed,
+            'completion_rate': round(100 * completed / proposals) if proposals else 100,
+            'corrections': session['corrections'],
+            'error_rate': round(100 * session['corrections'] / proposals) if proposals else 0,
+            'lines_per_hour': round(lines_changed / hours) if lines_changed is not None else None,
+            'time_per_feature': round(duration_minutes / proposals) if proposals else None,
+            'plan_iterations': session['plan_iterations'],
+            'scores': {
+                'frustration': frustration,
+                'productivity': productivity,
+                'agent_effectiveness': effectiveness,
+                'vibe': vibe
+            },
+            'session': session
+        }
+
+
+def render_appendix(summary: Dict) -> str:
+    """Render the DEVELOPMENT INTELLIGENCE APPENDIX block from protocols/commit.md."""
+    session = summary['session']
+    scores = summary['scores']
+    distribution = ", ".join(f"{mode} {percent}%" for mode, percent in summary['mode_distribution'].items()) \
+        or "No mode switches recorded"
+    lines_per_hour = summary['lines_per_hour'] if summary['lines_per_hour'] is not None else "n/a"
+    time_per_feature = f"{summary['time_per_feature']} minutes" if summary['time_per_feature'] is not None else "n/a"
+    decision = "immediate" if summary['plan_iterations'] == 0 else "iterative"
+    flow = " → ".join(session['flow']) or "No mode switches"
+
+    return "\n".join([
+        "---",
+        "DEVELOPMENT INTELLIGENCE APPENDIX",
+        "",
+        "Session Analytics:",
+        f"- Duration: {summary['duration_minutes']}min ({summary['start'] or 'n/a'} - {summary['end'] or 'n/a'})",
+        f"- Mode Distribution: {distribution}",
+        f"- Task Completion Rate: {summary['completion_rate']}% ({summary['completed']}/{summary['features']} features)",
+        f"- Error Rate: {summary['error_rate']}% ({summary['corrections']} corrections required)",
+        "",
+        "Performance Metrics:",
+        f"- Lines per Hour: {lines_per_hour} (net change rate)",
+        f"- Features per Session: {summary['features']}",
+        f"- Time per Feature: {time_per_feature}",
+        f"- Decision Speed: {decision} ({summary['plan_iterations']} cycles)",
+        "",
+        "Intelligence Scores:",
+        f"- Frustration: {scores['frustration']}/10 ({session['frustration_hits']} frustration signals, "
+        f"{summary['corrections']} corrections over {session['user_turns']} user turns)",
+        f"- Productivity: {scores['productivity']}/10 ({summary['features']} proposals and "
+        f"{session['successes']} successes in {summary['duration_minutes']}min)",
+        f"- Agent Effectiveness: {scores['agent_effectiveness']}/10 ({session['repeat_requests']} repeated requests)",
+        f"- Vibe Score: {scores['vibe']}/10 ({summary['mode_distribution'].get('Vibe', 0)}% of session time in Vibe Mode)",
+        "",
+        "Development Flow:",
+        f"- {flow}; {summary['features']} proposals, {session['successes']} successes, "
+        f"{summary['corrections']} corrections",
+        ""
+    ])
+
+
+def git_lines_changed(project_root: Path) -> Optional[int]:
+    """Net lines changed (insertions minus deletions) in the working tree versus HEAD, or None outside a Git repository."""
+    if not (Path(project_root) / ".git").exists():
+        return None
+    try:
+        result = subprocess.run(['git', 'diff', '--shortstat', 'HEAD'], cwd=project_root,
+                                capture_output=True, text=True, check=True)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    insertions = re.search(r"(\d+) insertion", result.stdout)
+    deletions = re.search(r"(\d+) deletion", result.stdout)
+    return (int(insertions.group(1)) if insertions else 0) - (int(deletions.group(1)) if deletions else 0)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point used by Commit Mode."""
+    parser = argparse.ArgumentParser(description="SpecPilot Commit Mode session analytics")
+    parser.add_argument('--project', default='.', help='Project root (default: current directory)')
+    parser.add_argument('--user', help='Username (default: from .specpilot.local)')
+    parser.add_argument('--lines', type=int, help='Lines changed in this session (default: from git diff)')
+    parser.add_argument('--reset', action='store_true', help='Discard the checkpoint and rebuild from the logs')
+    parser.add_argument('action', nargs='?', default='appendix', choices=['appendix', 'json', 'update'],
+                        help='appendix (default), json, or update (refresh the checkpoint only)')
+    args = parser.parse_args(argv)
+
+    from specpilot.log_index import logs_dir_for
+    analytics = SessionAnalytics(logs_dir_for(Path(args.project), args.user))
+    if args.reset and analytics.checkpoint_path.exists():
+        analytics.checkpoint_path.unlink()
+    analytics.update()
+
+    if args.action == 'update':
+        return 0
+    lines = args.lines if args.lines is not None else git_lines_changed(Path(args.project))
+    summary = analytics.summary(lines)
+    if args.action == 'json':
+        print(json.dumps(summary, indent=2))
+    else:
+        print(render_appendix(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+SpecPilot Answers
+
+Non-interactive inputs for an install: the values the interactive prompts ask
+for, read from an answers file (--answers, JSON or YAML), from SPECPILOT_*
+environment variables, or from one line of an NDJSON batch (bootstrap.py
+SOURCE batch). Later layers win: defaults < environment < answers file <
+command-line flags (--title) < batch line.
+
+    title                 Project title              SPECPILOT_TITLE
+    description           Project description        SPECPILOT_DESCRIPTION
+    username              Workspace username         SPECPILOT_USERNAME
+    philosophy            enterprise|scalable|vibe   SPECPILOT_PHILOSOPHY
+    architecture          enterprise|scalable|vibe   SPECPILOT_ARCHITECTURE
+    notepad               one-line|command|none      SPECPILOT_NOTEPAD
+    commit_intelligence   true|false                 SPECPILOT_COMMIT_INTELLIGENCE
+
+"verbose", the notepad name older installers wrote, is read as "command".
+
+A batch line adds "target" (the project directory, required) and "force"
+(overwrite an existing installation).
+"""
+
+import os
+from typing import Dict, Iterator, Optional, Tuple
+
+from specpilot.config import NOTEPAD_SUMMARIES
+
+CHOICES = ("enterprise", "scalable", "vibe")
+FIELDS = {
+    "title": None,
+    "description": None,
+    "username": None,
+    "philosophy": CHOICES,
+    "architecture": CHOICES,
+    "notepad": NOTEPAD_SUMMARIES,
+    "commit_intelligence": bool
+}
+DEFAULT_ANSWERS = {
+    "philosophy": "scalable",
+    "architecture": "scalable",
+    "notepad": "one-line",
+    "commit_intelligence": True
+}
+CHOICE_ALIASES = {"notepad": {"verbose": "command"}}
+ENV_PREFIX = "SPECPILOT_"
+BATCH_FIELDS = {"target": None, "force": bool}
+TRUE_WORDS = ("1", "true", "yes", "y", "on")
+FALSE_WORDS = ("0", "false", "no", "n", "off")
+
+
+class AnswerError(ValueError):
+    """An answers file, environment variable or batch line holds an unknown key or invalid value."""
+
+
+def parse_bool(value, key: str, source: str) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_WORDS:
+        return True
+    if text in FALSE_WORDS:
+        return False
+    raise AnswerError(f"{source}: {key} must be true or false (got {value!r})")
+
+
+def normalize_answers(raw: Dict, source: str, fields: Optional[Dict] = None) -> Dict:
+    """Validate keys and values; keys may use dashes, values are trimmed and lower-cased where they are choices."""
+    fields = fields or FIELDS
+    if not isinstance(raw, dict):
+        raise AnswerError(f"{source}: expected a mapping of answers, got {type(raw).__name__}")
+    answers = {}
+    for key, value in raw.items():
+        name = str(key).strip().replace("-", "_").lower()
+        if name not in fields:
+            raise AnswerError(f"{source}: unknown answer '{key}' (expected: {', '.join(fields)})")
+        if value is None:
+            continue
+        kind = fields[name]
+        if kind is bool:
+            answers[name] = parse_bool(value, name, source)
+        elif kind:
+            choice = str(value).strip().lower()
+            choice = CHOICE_ALIASES.get(name, {}).get(choice, choice)
+            if choice not in kind:
+                raise AnswerError(f"{source}: {name} must be one of {', '.join(kind)} (got {value!r})")
+            answers[name] = choice
+        else:
+            answers[name] = str(value).strip()
+    return answers
+
+
+def load_answers_file(path: str) -> Dict:
+    """Read a JSON or YAML (.yaml/.yml, needs PyYAML) answers file."""
+    source = str(path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except OSError as e:
+        raise AnswerError(f"{source}: {e.strerror or e}")
+    if source.lower().endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise AnswerError(f"{source}: YAML answers files require the 'PyYAML' package (or use JSON)")
+        try:
+            raw = yaml.safe_load(text) or {}
+        except yaml.YAMLError as e:
+            raise AnswerError(f"{source}: invalid YAML: {e}")
+    else:
+        import json
+        try:
+            raw = json.loads(text)
+        except ValueError as e:
+            raise AnswerError(f"{source}: invalid JSON: {e}")
+    return normalize_answers(raw, source)
+
+
+def env_answers(environ: Optional[Dict[str, str]] = None) -> Dict:
+    """Answers given as SPECPILOT_<FIELD> environment variables (empty values are ignored)."""
+    environ = os.environ if environ is None else environ
+    raw = {}
+    for name in FIELDS:
+        value = environ.get(ENV_PREFIX + name.upper())
+        if value:
+            raw[name] = value
+    return normalize_answers(raw, "environment")
+
+
+def resolve_answers(answers_path: Optional[str] = None, environ: Optional[Dict[str, str]] = None) -> Dict:
+    """Environment answers overlaid with the answers file, if any (defaults are applied by the installer)."""
+    answers = env_answers(environ)
+    if answers_path:
+        answers.update(load_answers_file(answers_path))
+    return answers
+
+
+def iter_batch(stream) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Read NDJSON batch lines as they arrive.
+
+    Yields (line_number, record, error): record holds the validated answers
+    plus "target" (and "force" if given); error is set instead for a line
+    that is not a valid request. Blank lines are skipped.
+    """
+    import json
+    fields = dict(FIELDS, **BATCH_FIELDS)
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        source = f"line {line_number}"
+        try:
+            record = normalize_answers(json.loads(line), source, fields)
+        except ValueError as e:
+            yield line_number, None, str(e) if isinstance(e, AnswerError) else f"{source}: invalid JSON: {e}"
+            continue
+        if not record.get("target"):
+            yield line_number, None, f"{source}: 'target' is required"
+            continue
+        yield line_number, record, None
@@ -0,0 +1,477 @@
+"""
+SpecPilot Backup Store
+
+Content-addressed, deduplicated storage for engine backups.
+
+Layout under .specpilot/backups/:
+    objects/ab/cdef...          One file per unique content digest
+    refs.json                   Reference count per digest
+    engine_backup_<ts>.json     One small snapshot manifest per backup
+
+A snapshot only references digests, so files that did not change between
+backups are stored once. Objects are cloned with FICLONE (reflink) when the
+filesystem supports it and fall back to a plain copy otherwise. Objects are
+never hardlinked into the live engine, because engine files can be edited in
+place and would silently rewrite the backup along with them.
+
+    engine_backup_<ts>.zip      A whole engine archive, for projects whose engine
+                                is installed as .specpilot/engine.zip
+
+Legacy ``engine_backup_<ts>/`` directories created by older versions are still
+listed, restored and pruned.
+
+    catalog.jsonl               Append-only catalog: one line per backup added
+                                ({"op": "add", id, kind, created, version, size,
+                                files, stored}) or removed ({"op": "remove", id})
+
+Listing, pruning and rollback selection read only the catalog, never the
+backups themselves, so they cost one small file read however large the
+history is, and creation times survive copies that do not keep ctime. The
+catalog is compacted when removals outnumber live entries, and rebuilt by
+scanning the backups if it is missing. Backups are found by id, by engine
+version (the newest backup of it) or by time (the newest at or before it).
+
+Retention combines policies (see plan_retention): keep the newest N, keep the
+newest backup of each of the last D days and W ISO weeks, and keep the total
+size under a byte budget. The budget counts each backup's full engine size,
+so the deduplicated store itself always stays below it.
+"""
+
+import bisect
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from specpilot.manifest import build_manifest
+
+SNAPSHOT_PREFIX = "engine_backup_"
+SNAPSHOT_SUFFIX = ".json"
+ARCHIVE_SUFFIX = ".zip"
+REFS_NAME = "refs.json"
+CATALOG_NAME = "catalog.jsonl"
+KIND_SUFFIXES = {"snapshot": SNAPSHOT_SUFFIX, "archive": ARCHIVE_SUFFIX, "legacy": ""}
+FICLONE = 0x40049409
+
+
+def clone_file(source: Path, target: Path):
+    """Copy file contents, using a copy-on-write reflink when the filesystem allows it."""
+    try:
+        import fcntl
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return
+    except (ImportError, OSError):
+        pass
+    shutil.copyfile(source, target)
+
+
+def plan_retention(snapshots: List[Dict], keep_count: Optional[int] = None, keep_daily: int = 0,
+                   keep_weekly: int = 0, max_bytes: Optional[int] = None) -> List[Dict]:
+    """
+    Return the snapshots (oldest first, as given) that a retention policy removes.
+
+    A snapshot is kept if it is among the newest keep_count, or is the newest
+    of one of the last keep_daily days or keep_weekly ISO weeks that have
+    backups. With no such rule every snapshot is a candidate. max_bytes then
+    keeps candidates newest first while their total size fits; the newest one
+    is always kept.
+    """
+    newest_first = list(reversed(snapshots))
+    if keep_count is None and not keep_daily and not keep_weekly:
+        # Only a byte budget (or nothing) to enforce
+        keep = {snapshot['id'] for snapshot in snapshots}
+    else:
+        keep = set()
+    if keep_count:
+        keep.update(snapshot['id'] for snapshot in newest_first[:keep_count])
+    for periods, bucket in ((keep_daily, "%Y-%m-%d"), (keep_weekly, "%G-W%V")):
+        seen = set()
+        for snapshot in newest_first:
+            if len(seen) >= periods:
+                break
+            key = datetime.fromtimestamp(snapshot['created']).strftime(bucket)
+            if key not in seen:
+                seen.add(key)
+                keep.add(snapshot['id'])
+    if max_bytes is not None:
+        kept = [snapshot for snapshot in newest_first if snapshot['id'] in keep]
+        total = sum(snapshot.get('size') or 0 for snapshot in kept[:1])
+        for snapshot in kept[1:]:
+            size = snapshot.get('size') or 0
+            if total + size > max_bytes:
+                keep.discard(snapshot['id'])
+            else:
+                total += size
+    return [snapshot for snapshot in snapshots if snapshot['id'] not in keep]
+
+
+class BackupStore:
+    """Deduplicated snapshot store for the engine directory."""
+
+    def __init__(self, backup_dir: Path):
+        self.backup_dir = Path(backup_dir)
+        self.objects_dir = self.backup_dir / "objects"
+        self.refs_path = self.backup_dir / REFS_NAME
+        self.catalog_path = self.backup_dir / CATALOG_NAME
+        self._refs = None
+        self._catalog = None
+        self._catalog_lines = 0
+
+    def object_path(self, digest: str) -> Path:
+        """Return the storage path for a content digest."""
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def load_refs(self) -> Dict[str, int]:
+        """Load reference counts, rebuilding them from snapshots if the file is missing."""
+        if self._refs is None:
+            try:
+                with open(self.refs_path, "r") as f:
+                    self._refs = json.load(f)
+            except (OSError, ValueError):
+                self._refs = self.rebuild_refs()
+        return self._refs
+
+    def save_refs(self):
+        """Atomically persist reference counts."""
+        tmp_path = self.refs_path.with_name(REFS_NAME + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._refs, f, sort_keys=True)
+        os.replace(tmp_path, self.refs_path)
+
+    def rebuild_refs(self) -> Dict[str, int]:
+        """Recount references from every snapshot and drop objects nothing points to."""
+        refs = {}
+        for snapshot in self.list_snapshots():
+            if snapshot['legacy'] or snapshot.get('archive') or not snapshot['path'].exists():
+                continue
+            for entry in self.read_snapshot(snapshot['path'])['files'].values():
+                refs[entry['digest']] = refs.get(entry['digest'], 0) + 1
+
+        if self.objects_dir.exists():
+            for shard in self.objects_dir.iterdir():
+                if not shard.is_dir():
+                    continue
+                for obj in shard.iterdir():
+                    if shard.name + obj.name not in refs:
+                        self.remove_object(shard.name + obj.name)
+        return refs
+
+    def load_catalog(self) -> Dict[str, Dict]:
+        """Replay the catalog into {id: entry}, rebuilding it from the backups on disk if it is missing."""
+        if self._catalog is None:
+            try:
+                self._catalog = self.read_catalog()
+            except FileNotFoundError:
+                self._catalog = self.rebuild_catalog()
+        return self._catalog
+
+    def read_catalog(self) -> Dict[str, Dict]:
+        """Replay catalog.jsonl; a torn last line from an interrupted append is skipped."""
+        catalog = {}
+        self._catalog_lines = 0
+        with open(self.catalog_path, "r") as f:
+            for line in f:
+                self._catalog_lines += 1
+                try:
+                    record = json.loads(line)
+                    op = record.pop('op')
+                    snapshot_id = record['id']
+                except (ValueError, KeyError):
+                    continue
+                if op == "remove":
+                    catalog.pop(snapshot_id, None)
+                else:
+                    catalog[snapshot_id] = record
+        return catalog
+
+    def append_catalog(self, record: Dict):
+        """Append one record to the catalog with a single write."""
+        self.load_catalog()
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.catalog_path, "a") as f:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+        self._catalog_lines += 1
+        snapshot_id = record['id']
+        if record['op'] == "remove":
+            self._catalog.pop(snapshot_id, None)
+        else:
+            self._catalog[snapshot_id] = {key: value for key, value in record.items() if key != 'op'}
+        if self._catalog_lines > 2 * len(self._catalog) + 16:
+            self.write_catalog(self._catalog)
+
+    def write_catalog(self, catalog: Dict[str, Dict]):
+        """Atomically rewrite the catalog with one add record per live backup."""
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.catalog_path.with_name(CATALOG_NAME + ".tmp")
+        with open(tmp_path, "w") as f:
+            for entry in sorted(catalog.values(), key=lambda entry: entry['created']):
+                f.write(json.dumps(dict(entry, op="add"), sort_keys=True) + "\n")
+        os.replace(tmp_path, self.catalog_path)
+        self._catalog_lines = len(catalog)
+
+    def rebuild_catalog(self) -> Dict[str, Dict]:
+        """Describe every backup on disk and write a fresh catalog (used once, when there is none)."""
+        catalog = {}
+        if not self.backup_dir.exists():
+            return catalog
+        for item in self.backup_dir.iterdir():
+            if not item.name.startswith(SNAPSHOT_PREFIX) or item.name.endswith(".tmp"):
+                continue
+            try:
+                entry = self.describe_backup(item)
+            except (OSError, ValueError, KeyError):
+                continue
+            if entry is not None:
+                catalog[entry['id']] = entry
+        self.write_catalog(catalog)
+        return catalog
+
+    def describe_backup(self, item: Path) -> Optional[Dict]:
+        """The catalog entry of one backup, read from the backup itself."""
+        if item.is_dir():
+            sizes = [entry.stat().st_size for entry in item.rglob("*") if entry.is_file()]
+            version_file = item / "engine_version.json"
+            version = json.loads(version_file.read_text())['version'] if version_file.is_file() else None
+            return {'id': item.name, 'kind': "legacy", 'created': item.stat().st_ctime, 'version': version,
+                    'size': sum(sizes), 'files': len(sizes), 'stored': sum(sizes)}
+        if item.suffix == SNAPSHOT_SUFFIX:
+            snapshot = self.read_snapshot(item)
+            size = sum(entry['size'] for entry in snapshot['files'].values())
+            version = snapshot.get('version')
+            if version is None and "engine_version.json" in snapshot['files']:
+                # Snapshots from before the catalog did not record it; their stored copy of the file has it
+                version_object = self.object_path(snapshot['files']["engine_version.json"]['digest'])
+                version = json.loads(version_object.read_text()).get('version')
+            return {'id': item.stem, 'kind': "snapshot", 'created': snapshot['created'],
+                    'version': version, 'size': size, 'files': len(snapshot['files']), 'stored': None}
+        if item.suffix == ARCHIVE_SUFFIX:
+            from specpilot.engine_archive import EngineArchive
+            archive = EngineArchive(item)
+            try:
+                return {'id': item.stem, 'kind': "archive", 'created': item.stat().st_mtime,
+                        'version': archive.version, 'size': item.stat().st_size, 'files': len(archive.files),
+                        'stored': item.stat().st_size}
+            finally:
+                archive.close()
+        return None
+
+    def snapshot_info(self, entry: Dict) -> Dict:
+        """A catalog entry with the path and flags callers use to restore or delete it."""
+        kind = entry.get('kind', "snapshot")
+        info = dict(entry, path=self.backup_dir / (entry['id'] + KIND_SUFFIXES[kind]), legacy=kind == "legacy")
+        if kind == "archive":
+            info['archive'] = True
+        return info
+
+    def create_snapshot(self, engine_dir: Path, files: Dict[str, Dict], version: Optional[str] = None) -> Path:
+        """
+        Snapshot an engine tree described by its manifest.
+
+        Only digests not already in the store are written, so a backup costs
+        one object per changed file plus a small manifest.
+        """
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        refs = self.load_refs()
+
+        stored = 0
+        for relative, entry in files.items():
+            digest = entry['digest']
+            if refs.get(digest, 0) > 0:
+                continue
+            obj_path = self.object_path(digest)
+            if not obj_path.exists():
+                obj_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = obj_path.with_name(obj_path.name + ".tmp")
+                clone_file(Path(engine_dir) / relative, tmp_path)
+                os.replace(tmp_path, obj_path)
+                stored += entry['size']
+
+        created = time.time()
+        snapshot_path = self.new_snapshot_path(created, SNAPSHOT_SUFFIX)
+
+        snapshot = {
+            "id": snapshot_path.stem,
+            "created": created,
+            "version": version,
+            "files": dict(sorted(files.items()))
+        }
+        tmp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp_path, snapshot_path)
+
+        for entry in files.values():
+            refs[entry['digest']] = refs.get(entry['digest'], 0) + 1
+        self.save_refs()
+        self.append_catalog({
+            "op": "add",
+            "id": snapshot_path.stem,
+            "kind": "snapshot",
+            "created": created,
+            "version": version,
+            "size": sum(entry['size'] for entry in files.values()),
+            "files": len(files),
+            "stored": stored
+        })
+        return snapshot_path
+
+    def new_snapshot_path(self, created: float, suffix: str) -> Path:
+        """A free engine_backup_<timestamp>[_n] path, unique across all snapshot kinds."""
+        snapshot_id = SNAPSHOT_PREFIX + datetime.fromtimestamp(created).strftime("%Y%m%d_%H%M%S")
+        candidate = snapshot_id
+        counter = 1
+        while any((self.backup_dir / (candidate + ext)).exists() for ext in ("", SNAPSHOT_SUFFIX, ARCHIVE_SUFFIX)):
+            candidate = f"{snapshot_id}_{counter}"
+            counter += 1
+        return self.backup_dir / (candidate + suffix)
+
+    def create_archive_snapshot(self, archive_path: Path, version: Optional[str] = None,
+                                file_count: Optional[int] = None) -> Path:
+        """Back up an engine archive as one file (reflinked where the filesystem allows)."""
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        created = time.time()
+        snapshot_path = self.new_snapshot_path(created, ARCHIVE_SUFFIX)
+        tmp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+        clone_file(Path(archive_path), tmp_path)
+        os.replace(tmp_path, snapshot_path)
+        size = snapshot_path.stat().st_size
+        self.append_catalog({
+            "op": "add",
+            "id": snapshot_path.stem,
+            "kind": "archive",
+            "created": created,
+            "version": version,
+            "size": size,
+            "files": file_count,
+            "stored": size
+        })
+        return snapshot_path
+
+    def read_snapshot(self, snapshot_path: Path) -> Dict:
+        """Read a snapshot manifest."""
+        with open(snapshot_path, "r") as f:
+            return json.load(f)
+
+    def list_snapshots(self) -> List[Dict]:
+        """List snapshots (and legacy backup directories) from the catalog, oldest first."""
+        entries = sorted(self.load_catalog().values(), key=lambda entry: entry['created'])
+        return [self.snapshot_info(entry) for entry in entries]
+
+    def find_snapshot(self, selector: str) -> Optional[Dict]:
+        """
+        Look a snapshot up in the catalog by id, engine version or time.
+
+        A version selects the newest backup of that version; a time (ISO 8601,
+        e.g. 2026-01-31 or 2026-01-31T14:00) the newest backup taken at or
+        before it. Returns None if nothing matches.
+        """
+        catalog = self.load_catalog()
+        selector = str(selector).strip()
+        if selector in catalog:
+            return self.snapshot_info(catalog[selector])
+        if SNAPSHOT_PREFIX + selector in catalog:
+            return self.snapshot_info(catalog[SNAPSHOT_PREFIX + selector])
+
+        entries = sorted(catalog.values(), key=lambda entry: entry['created'])
+        by_version = {str(entry['version']): entry for entry in entries if entry.get('version')}
+        version = selector[1:] if selector[:1] in ("v", "V") else selector
+        if version in by_version:
+            return self.snapshot_info(by_version[version])
+
+        try:
+            moment = datetime.fromisoformat(selector).timestamp()
+        except ValueError:
+            return None
+        if len(selector) == 10:
+            # A bare date selects the newest backup taken during that day
+            moment += 24 * 3600 - 1e-6
+        position = bisect.bisect_right([entry['created'] for entry in entries], moment)
+        return self.snapshot_info(entries[position - 1]) if position else None
+
+    def materialize(self, snapshot_path: Path, target_dir: Path) -> Dict[str, Dict]:
+        """Write the files of a snapshot into target_dir and return their manifest."""
+        snapshot_path = Path(snapshot_path)
+        target_dir = Path(target_dir)
+
+        if snapshot_path.is_dir():
+            shutil.copytree(snapshot_path, target_dir, dirs_exist_ok=True)
+            return build_manifest(target_dir)
+        if snapshot_path.suffix == ARCHIVE_SUFFIX:
+            from specpilot.engine_archive import EngineArchive
+            archive = EngineArchive(snapshot_path)
+            try:
+                return archive.extract(target_dir)
+            finally:
+                archive.close()
+
+        files = self.read_snapshot(snapshot_path)['files']
+        restored = {}
+        for relative, entry in files.items():
+            target_path = target_dir / relative
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            clone_file(self.object_path(entry['digest']), target_path)
+            os.utime(target_path, ns=(entry['mtime_ns'], entry['mtime_ns']))
+            st = target_path.stat()
+            restored[relative] = {
+                'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns,
+                'digest': entry['digest']
+            }
+        return restored
+
+    def delete_snapshot(self, snapshot: Dict):
+        """Delete a snapshot, record it in the catalog and garbage-collect objects it held the last reference to."""
+        try:
+            self._delete_snapshot_files(snapshot)
+        except FileNotFoundError:
+            # Removed by hand: drop the catalog entry and recount what the other snapshots still use
+            if not snapshot['legacy'] and not snapshot.get('archive'):
+                self.load_catalog().pop(snapshot['id'], None)
+                self._refs = self.rebuild_refs()
+                self.save_refs()
+        self.append_catalog({"op": "remove", "id": snapshot['id'], "removed": time.time()})
+
+    def _delete_snapshot_files(self, snapshot: Dict):
+        if snapshot['legacy']:
+            shutil.rmtree(snapshot['path'])
+            return
+        if snapshot.get('archive'):
+            snapshot['path'].unlink()
+            return
+
+        refs = self.load_refs()
+        files = self.read_snapshot(snapshot['path'])['files']
+        snapshot['path'].unlink()
+        for entry in files.values():
+            digest = entry['digest']
+            count = refs.get(digest, 0) - 1
+            if count > 0:
+                refs[digest] = count
+                continue
+            refs.pop(digest, None)
+            self.remove_object(digest)
+        self.save_refs()
+
+    def remove_object(self, digest: str):
+        """Unlink an object and its shard directory once the shard is empty."""
+        obj_path = self.object_path(digest)
+        try:
+            obj_path.unlink()
+        except FileNotFoundError:
+            return
+        try:
+            obj_path.parent.rmdir()
+        except OSError:
+            pass
+
+    def prune(self, keep_count: Optional[int] = None, keep_daily: int = 0, keep_weekly: int = 0,
+              max_bytes: Optional[int] = None) -> List[Dict]:
+        """Delete the snapshots a retention policy (see plan_retention) does not keep and return them."""
+        removed = plan_retention(self.list_snapshots(), keep_count, keep_daily, keep_weekly, max_bytes)
+        for snapshot in removed:
+            self.delete_snapshot(snapshot)
+        return removed
@@ -0,0 +1,283 @@
+"""
+SpecPilot Prompt Bundles
+
+Compiles the engine's Markdown into one precompiled bundle per mode, so a
+session loads a single file instead of main.md, the core rules, the mode's
+protocol and every reference they point to, and re-applies the override each
+time.
+
+Each bundle (.specpilot/bundles/<mode>.md) contains, in load order:
+    main.md, core/global_rules.md, core/override_logic.md
+    protocols/<mode>.md
+    every core/, reference/ and commands/ file these mention, transitively
+    the project override (.specpilot/workspace/config/spec_driven_prompt_override.md),
+    appended last so it keeps its precedence
+
+Compilation:
+    - "Example" sections of shared files are stripped; the active mode's own
+      protocol keeps its examples
+    - paragraphs already included earlier in the bundle are dropped
+    - the bundle starts with a comment carrying its SHA-256 content hash
+
+Index (.specpilot/bundles/index.json) records each bundle's hash and the
+digest of every source file, so refresh_bundles() rebuilds only the bundles
+whose sources or override changed. Source digests come from the engine
+manifest, so checking an unchanged engine costs one stat per file.
+
+Sources are read through specpilot.engine_archive.open_engine(), so an
+engine installed as a single .specpilot/engine.zip archive compiles the same
+bundles, read in place from the archive and never extracted. Bundles of an
+archive install are self-contained: references to .specpilot/engine/ are
+rewritten to what the agent can open instead. A mode protocol becomes that
+mode's bundle, a file already compiled into the bundle keeps its engine
+path, and any other member becomes
+``python3 -m specpilot.engine_archive cat .specpilot/engine.zip <member>``.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from specpilot.engine_archive import ARCHIVE_NAME, DirectoryEngine, open_engine
+from specpilot.manifest import hash_file
+
+BUNDLE_DIR_NAME = "bundles"
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+BASE_FILES = ("main.md", "core/global_rules.md", "core/override_logic.md")
+OVERRIDE_PATH = Path("workspace") / "config" / "spec_driven_prompt_override.md"
+ENGINE_ROOT = ".specpilot/engine"
+ARCHIVE_ROOT = f".specpilot/{ARCHIVE_NAME}"
+CAT_COMMAND = f"python3 -m specpilot.engine_archive cat {ARCHIVE_ROOT}"
+ENGINE_REFERENCE = re.compile(r"\.specpilot/engine/(?:[A-Za-z0-9_\-\[\]./]*[A-Za-z0-9_\]/])?")
+REFERENCE_PATTERN = re.compile(r"\b((?:core|reference|commands)/[A-Za-z0-9_\-]+\.md)\b")
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*)$")
+EXAMPLE_HEADING = re.compile(r"\bexamples?\b", re.IGNORECASE)
+DEDUP_MIN_CHARS = 80
+
+
+def engine_root(engine) -> str:
+    """The installed engine as the agent sees it: the engine directory, or the archive."""
+    return ENGINE_ROOT if isinstance(engine, DirectoryEngine) else ARCHIVE_ROOT
+
+
+def archive_reference(member: str, sources: Sequence[str]) -> str:
+    """What a bundle of an archive install says instead of .specpilot/engine/<member>."""
+    if not member:
+        return ARCHIVE_ROOT
+    if member.startswith("protocols/") and (member.endswith(".md") or member == "protocols/"):
+        return f".specpilot/{BUNDLE_DIR_NAME}/{member[len('protocols/'):]}"
+    if member in sources:
+        return member
+    if member.endswith("/"):
+        return f"{CAT_COMMAND} {member}<name>.md"
+    return f"{CAT_COMMAND} {member}"
+
+
+def relocate(text: str, root: str, sources: Sequence[str]) -> str:
+    """Rewrite .specpilot/engine/ references for an archive install; a directory engine keeps them."""
+    if root == ENGINE_ROOT:
+        return text
+    prefix = len(ENGINE_ROOT) + 1
+    return ENGINE_REFERENCE.sub(lambda match: archive_reference(match.group(0)[prefix:], sources), text)
+
+
+def as_engine(engine):
+    """Accept an engine reader (see engine_archive) or an engine directory path."""
+    return DirectoryEngine(engine) if isinstance(engine, (str, Path)) else engine
+
+
+def list_modes(engine) -> List[str]:
+    """Every mode with a protocol file, e.g. 'pilot' for protocols/pilot.md."""
+    return sorted(name[len("protocols/"):-len(".md")] for name in as_engine(engine).names()
+                  if name.startswith("protocols/") and name.endswith(".md") and name.count("/") == 1)
+
+
+def bundle_sources(engine, mode: str) -> List[str]:
+    """Engine files that make up a mode's bundle, in load order."""
+    engine = as_engine(engine)
+    ordered = []
+    pending = list(BASE_FILES) + [f"protocols/{mode}.md"]
+    while pending:
+        relative = pending.pop(0)
+        if relative in ordered or not engine.is_file(relative):
+            continue
+        ordered.append(relative)
+        text = engine.read_text(relative)
+        pending.extend(match for match in REFERENCE_PATTERN.findall(text) if match not in ordered)
+    return ordered
+
+
+def strip_examples(text: str) -> str:
+    """Remove Markdown sections whose heading mentions examples, up to the next heading of the same level."""
+    kept = []
+    skip_level = None
+    in_fence = False
+    for line in text.splitlines(keepends=True):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        heading = None if in_fence else HEADING_PATTERN.match(line)
+        if heading:
+            level = len(heading.group(1))
+            if skip_level is not None and level <= skip_level:
+                skip_level = None
+            if skip_level is None and EXAMPLE_HEADING.search(heading.group(2)):
+                skip_level = level
+        if skip_level is None:
+            kept.append(line)
+    return "".join(kept)
+
+
+def split_blocks(text: str) -> List[str]:
+    """Split Markdown into blank-line separated blocks, keeping fenced code blocks whole."""
+    blocks = []
+    current = []
+    in_fence = False
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not line.strip() and not in_fence:
+            if current:
+                blocks.append("\n".join(current))
+                current = []
+            continue
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def compile_bundle(engine, mode: str, sources: List[str], override: Optional[str]) -> str:
+    """Render one mode's bundle body (without the hash header)."""
+    engine = as_engine(engine)
+    root = engine_root(engine)
+    seen = set()
+    parts = []
+    if root != ENGINE_ROOT:
+        parts.append(f"<!-- engine: {root} -->\n"
+                     f"This project installs the engine as `{root}`, which is not unpacked. Engine files named "
+                     f"by path below (e.g. `core/global_rules.md`) are included in this bundle after their "
+                     f"`source:` marker. Each mode's protocol is compiled into `.specpilot/{BUNDLE_DIR_NAME}/"
+                     f"<mode>.md`; print any other engine file, such as `commands/<name>.md`, with "
+                     f"`{CAT_COMMAND} <file>`.")
+    active_protocol = f"protocols/{mode}.md"
+    sections = [(relative, engine.read_text(relative)) for relative in sources]
+    if override is not None:
+        sections.append((OVERRIDE_PATH.as_posix() + " (takes precedence over everything above)", override))
+    for relative, text in sections:
+        if relative in BASE_FILES or relative.startswith(("core/", "reference/", "commands/")):
+            text = strip_examples(text)
+        blocks = []
+        for block in split_blocks(text):
+            key = block.strip()
+            # Keep the active protocol intact; drop repeated boilerplate elsewhere
+            if len(key) >= DEDUP_MIN_CHARS and relative != active_protocol:
+                if key in seen:
+                    continue
+            seen.add(key)
+            blocks.append(block)
+        parts.append(f"<!-- source: {relative} -->\n" + relocate("\n\n".join(blocks), root, sources))
+    return "\n\n".join(parts) + "\n"
+
+
+def load_index(bundle_dir: Path) -> Dict:
+    """Load the bundle index, or an empty one."""
+    try:
+        with open(Path(bundle_dir) / INDEX_NAME, "r") as f:
+            data = json.load(f)
+        if data.get("version") == INDEX_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "bundles": {}}
+
+
+def save_index(bundle_dir: Path, index: Dict):
+    """Atomically write the bundle index."""
+    path = Path(bundle_dir) / INDEX_NAME
+    tmp_path = path.with_name(INDEX_NAME + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def refresh_bundles(specpilot_dir: Path, force: bool = False) -> List[str]:
+    """
+    Rebuild the bundles whose sources or override changed, and remove stale ones.
+
+    Returns the modes that were (re)built.
+    """
+    specpilot_dir = Path(specpilot_dir)
+    engine = open_engine(specpilot_dir)
+    if engine is None:
+        raise FileNotFoundError(f"No engine directory or archive in {specpilot_dir}")
+    bundle_dir = specpilot_dir / BUNDLE_DIR_NAME
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+
+    digests = engine.digests()
+    root = engine_root(engine)
+    index = load_index(bundle_dir)
+    override_path = specpilot_dir / OVERRIDE_PATH
+    override = override_path.read_text(encoding="utf-8") if override_path.is_file() else None
+    override_digest = hash_file(override_path) if override is not None else None
+
+    modes = list_modes(engine)
+    rebuilt = []
+    for mode in modes:
+        entry = index["bundles"].get(mode)
+        bundle_path = bundle_dir / f"{mode}.md"
+        # The source list can only change if one of the recorded sources changed
+        if (not force and entry and bundle_path.exists() and entry.get("override") == override_digest
+                and entry.get("engine_root", ENGINE_ROOT) == root
+                and all(digests.get(relative) == digest for relative, digest in entry["sources"].items())):
+            continue
+
+        sources = bundle_sources(engine, mode)
+        source_digests = {relative: digests.get(relative) for relative in sources}
+        body = compile_bundle(engine, mode, sources, override)
+        content_hash = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        tmp_path = bundle_path.with_name(bundle_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(f"<!-- SpecPilot bundle: mode={mode} sha256={content_hash} -->\n")
+            f.write(body)
+        os.replace(tmp_path, bundle_path)
+        index["bundles"][mode] = {
+            "file": bundle_path.name,
+            "hash": content_hash,
+            "bytes": bundle_path.stat().st_size,
+            "sources": source_digests,
+            "override": override_digest,
+            "engine_root": root
+        }
+        rebuilt.append(mode)
+
+    for mode in [mode for mode in index["bundles"] if mode not in modes]:
+        (bundle_dir / index["bundles"].pop(mode)["file"]).unlink(missing_ok=True)
+
+    save_index(bundle_dir, index)
+    return rebuilt
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point for rebuilding a project's bundles."""
+    parser = argparse.ArgumentParser(description="Compile SpecPilot per-mode prompt bundles")
+    parser.add_argument('--project', default='.', help='Project root (default: current directory)')
+    parser.add_argument('--force', action='store_true', help='Rebuild every bundle')
+    args = parser.parse_args(argv)
+
+    specpilot_dir = Path(args.project) / ".specpilot"
+    rebuilt = refresh_bundles(specpilot_dir, args.force)
+    index = load_index(specpilot_dir / BUNDLE_DIR_NAME)
+    for mode, entry in sorted(index["bundles"].items()):
+        state = "rebuilt" if mode in rebuilt else "current"
+        print(f"{mode:<20} {entry['bytes']:>7} bytes  {entry['hash'][:12]}  {state}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+SpecPilot Config Resolver
+
+Resolves the effective configuration once per change instead of every
+consumer re-reading and re-merging the JSON files. Layers, lowest
+precedence first:
+
+    default   .specpilot/engine/config_default.json (or that member of
+              .specpilot/engine.zip when the engine is installed as an archive)
+    project   .specpilot/workspace/config/config.json
+    user      .specpilot/workspace/<user>/config/config.json
+    local     .specpilot.local
+
+Objects are deep-merged; any other value in a higher layer replaces the
+lower one. Metadata keys starting with "_" (such as "_warning") are not part
+of the effective configuration.
+
+The merged result is validated against CONFIG_SCHEMA and compiled into
+.specpilot/workspace/<user>/cache/config_resolved.json, keyed by the size and
+mtime of every input file. Later runs reuse the snapshot after four stats;
+within a process, lookups are plain dict hits.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_NAME = "config_resolved.json"
+DEFAULT_MEMBER = "config_default.json"
+# Notepad summary formats, as documented in protocols/config.md
+NOTEPAD_SUMMARIES = ("one-line", "command", "none")
+
+# Leaf values are a type, or a tuple of allowed string values
+CONFIG_SCHEMA = {
+    "logging": {
+        "verbose_mode": bool,
+        "notepad_summary": NOTEPAD_SUMMARIES,
+        "track_model": bool,
+        "event_store": bool
+    },
+    "commitconfiguration": {
+        "commit_intelligence": bool,
+        "session_analytics": bool,
+        "frustration_scoring": bool,
+        "productivity_metrics": bool
+    },
+    "username": str,
+    "workspace_path": str
+}
+
+_resolved_cache: Dict[str, Tuple[List, Dict, List[str]]] = {}
+
+
+def deep_merge(base: Dict, override: Dict) -> Dict:
+    """Return base with override merged in recursively, dropping "_" metadata keys."""
+    merged = {key: value for key, value in base.items() if not key.startswith("_")}
+    for key, value in override.items():
+        if key.startswith("_"):
+            continue
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        elif isinstance(value, dict):
+            merged[key] = deep_merge({}, value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def validate_config(config: Dict, schema: Dict = CONFIG_SCHEMA, prefix: str = "") -> List[str]:
+    """Return a list of problems with a resolved config (empty when valid)."""
+    errors = []
+    for key, value in config.items():
+        option = f"{prefix}{key}"
+        if key not in schema:
+            errors.append(f"Unknown option: {option}")
+            continue
+        expected = schema[key]
+        if isinstance(expected, dict):
+            if not isinstance(value, dict):
+                errors.append(f"{option} must be an object")
+            else:
+                errors.extend(validate_config(value, expected, f"{option}."))
+        elif isinstance(expected, tuple):
+            if value not in expected:
+                allowed = ", ".join(f'"{choice}"' for choice in expected)
+                errors.append(f"{option} must be one of {allowed} (got {json.dumps(value)})")
+        elif not isinstance(value, expected):
+            errors.append(f"{option} must be a {expected.__name__} (got {json.dumps(value)})")
+    return errors
+
+
+def flatten(config: Dict, prefix: str = "") -> Dict[str, Any]:
+    """Map dotted option names (e.g. "logging.verbose_mode") to leaf values."""
+    flat = {}
+    for key, value in config.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+class ConfigResolver:
+    """Layered, cached configuration for one project and user."""
+
+    def __init__(self, project_root: Path, username: Optional[str] = None):
+        self.project_root = Path(project_root).resolve()
+        if not username:
+            from specpilot.logging import resolve_username
+            username = resolve_username(self.project_root)
+        self.username = username
+        specpilot_dir = self.project_root / ".specpilot"
+        self.snapshot_path = specpilot_dir / "workspace" / username / "cache" / SNAPSHOT_NAME
+        default_path = specpilot_dir / "engine" / DEFAULT_MEMBER
+        if not default_path.exists() and (specpilot_dir / "engine.zip").is_file():
+            # Engine installed as a single archive: the defaults are read from it in place
+            default_path = specpilot_dir / "engine.zip"
+        self.layers = [
+            ("default", default_path),
+            ("project", specpilot_dir / "workspace" / "config" / "config.json"),
+            ("user", specpilot_dir / "workspace" / username / "config" / "config.json"),
+            ("local", self.project_root / ".specpilot.local")
+        ]
+        self.config = None
+        self.errors = []
+        self._flat = None
+
+    def input_key(self) -> List:
+        """Identify the current inputs by (layer, size, mtime_ns); missing files are None."""
+        key = []
+        for name, path in self.layers:
+            try:
+                st = os.stat(path)
+                key.append([name, st.st_size, st.st_mtime_ns])
+            except OSError:
+                key.append([name, None, None])
+        return key
+
+    def read_layers(self, errors: Optional[List[str]] = None) -> List[Tuple[str, Path, Optional[Dict]]]:
+        """Read every layer; unreadable or invalid JSON is skipped and reported in errors."""
+        errors = [] if errors is None else errors
+        layers = []
+        for name, path in self.layers:
+            data = None
+            if path.exists():
+                try:
+                    if path.suffix == ".zip":
+                        from specpilot.engine_archive import open_archive
+                        data = json.loads(open_archive(path).read_text(DEFAULT_MEMBER))
+                    else:
+                        with open(path, "r") as f:
+                            data = json.load(f)
+                    if not isinstance(data, dict):
+                        errors.append(f"{name} layer ({path}) is not a JSON object")
+                        data = None
+                except (OSError, ValueError) as e:
+                    errors.append(f"Cannot read {name} layer ({path}): {e}")
+            layers.append((name, path, data))
+        return layers
+
+    def _load_snapshot(self, key: List) -> bool:
+        try:
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("inputs") != key:
+            return False
+        self.config = snapshot["config"]
+        self.errors = snapshot["errors"]
+        return True
+
+    def _save_snapshot(self, key: List):
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.snapshot_path.with_name(f"{SNAPSHOT_NAME}.{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"version": SNAPSHOT_VERSION, "inputs": key,
+                           "config": self.config, "errors": self.errors}, f, indent=2)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError:
+            # A read-only workspace still gets a correct (uncached) result
+            pass
+
+    def resolve(self) -> Dict:
+        """Return the effective configuration, re-merging only if an input changed."""
+        key = self.input_key()
+        cache_key = f"{self.project_root}\0{self.username}"
+        cached = _resolved_cache.get(cache_key)
+        if cached and cached[0] == key:
+            _, self.config, self.errors = cached
+        elif not self._load_snapshot(key):
+            self.errors = []
+            config = {}
+            for _, _, data in self.read_layers(self.errors):
+                if data:
+                    config = deep_merge(config, data)
+            self.config = config
+            self.errors.extend(validate_config(config))
+            self._save_snapshot(key)
+        _resolved_cache[cache_key] = (key, self.config, self.errors)
+        self._flat = flatten(self.config)
+        return self.config
+
+    def get(self, option: str, default: Any = None) -> Any:
+        """Look up a dotted option such as "logging.verbose_mode"."""
+        if self._flat is None:
+            self.resolve()
+        if option in self._flat:
+            return self._flat[option]
+        node = self.config
+        for part in option.split("."):
+            if not isinstance(node, dict) or part not in node:
+                return default
+            node = node[part]
+        return node
+
+    def get_all(self) -> Dict[str, Any]:
+        """Every effective option as a dotted name -> value map."""
+        if self._flat is None:
+            self.resolve()
+        return dict(self._flat)
+
+    def sources(self) -> Dict[str, str]:
+        """Map each dotted option to the name of the layer that set its effective value."""
+        origin = {}
+        for name, _, data in self.read_layers():
+            if data:
+                for option in flatten(deep_merge({}, data)):
+                    origin[option] = name
+        return origin
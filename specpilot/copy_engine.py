@@ -0,0 +1,204 @@
+"""
+SpecPilot Copy Engine
+
+Bulk file copy for installs and engine updates, in place of shutil.copytree
+and per-file shutil.copy2. For each file the first method that works is used:
+
+    reflink            FICLONE ioctl (Btrfs, XFS, ...): blocks are shared, no data copied
+    copy_file_range    in-kernel copy (Linux, Python 3.8+); server-side copy on NFS 4.2
+    sendfile           in-kernel copy (Linux)
+    userspace          read/write loop
+
+A method the filesystem rejects is disabled for the rest of the run, so each
+file pays at most one failed attempt per method.
+
+Target directories are created up front, shallowest first, with one mkdir
+each instead of a makedirs per file. Files are copied on a small thread pool
+so that latency on network-mounted directories overlaps. The stat results
+from the source walk are reused: the copy loop, the mode and the times come
+from them, and are applied through the open descriptors (fchmod, futimens).
+Because the source mtime is kept exactly, manifest_from_stats() can build the
+target manifest without re-stat-ing or re-hashing the copies.
+"""
+
+import errno
+import os
+import stat as stat_module
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from specpilot.manifest import iter_engine_files
+
+DEFAULT_WORKERS = 4
+# Below this many files a thread pool costs more than it overlaps
+PARALLEL_THRESHOLD = 32
+CHUNK_SIZE = 1024 * 1024
+FICLONE = 0x40049409
+# Errors meaning "this method does not work here", as opposed to a failed copy
+UNSUPPORTED = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTTY, errno.EBADF,
+               getattr(errno, "ENOTSUP", errno.EOPNOTSUPP)}
+
+
+def scan_tree(root: Path) -> Dict[str, os.stat_result]:
+    """Map every file under root (except the manifest) to the stat result of the walk."""
+    return dict(iter_engine_files(root))
+
+
+def create_directories(target_root: Path, relatives: Iterable[str]) -> int:
+    """Create the parent directories of the given files, parents before children; returns how many were made."""
+    target_root = Path(target_root)
+    target_root.mkdir(parents=True, exist_ok=True)
+    directories = set()
+    for relative in relatives:
+        parent = os.path.dirname(relative)
+        while parent and parent not in directories:
+            directories.add(parent)
+            parent = os.path.dirname(parent)
+    created = 0
+    for directory in sorted(directories, key=lambda path: (path.count("/"), path)):
+        try:
+            os.mkdir(target_root / directory)
+            created += 1
+        except FileExistsError:
+            pass
+    return created
+
+
+def manifest_from_stats(stats: Dict[str, os.stat_result], known: Dict[str, Dict]) -> Optional[Dict[str, Dict]]:
+    """
+    Manifest entries for files copied with their source mtime, taking digests from known.
+
+    Returns None if any file is missing from known or no longer matches it by
+    size and mtime, in which case the caller should build the manifest normally.
+    """
+    files = {}
+    for relative, st in stats.items():
+        entry = known.get(relative)
+        if not entry or entry.get("size") != st.st_size or entry.get("mtime_ns") != st.st_mtime_ns:
+            return None
+        files[relative] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": entry["digest"]}
+    return files
+
+
+class CopyEngine:
+    """Copies files with the fastest method the platform and filesystem allow."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS):
+        self.workers = max(1, workers)
+        linux = sys.platform.startswith("linux")
+        self.use_reflink = linux
+        self.use_copy_file_range = linux and hasattr(os, "copy_file_range")
+        self.use_sendfile = linux and hasattr(os, "sendfile")
+        self.methods: Dict[str, int] = {}
+
+    def copy_file(self, source: Path, target: Path, st: Optional[os.stat_result] = None) -> str:
+        """Copy one file's data, mode and times; returns the method used."""
+        src_fd = os.open(source, os.O_RDONLY)
+        try:
+            if st is None:
+                st = os.fstat(src_fd)
+            dst_fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            try:
+                method = self._copy_data(src_fd, dst_fd, st.st_size)
+                if hasattr(os, "fchmod"):
+                    os.fchmod(dst_fd, stat_module.S_IMODE(st.st_mode))
+                if os.utime in os.supports_fd:
+                    os.utime(dst_fd, ns=(st.st_atime_ns, st.st_mtime_ns))
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+        if not hasattr(os, "fchmod"):
+            os.chmod(target, stat_module.S_IMODE(st.st_mode))
+        if os.utime not in os.supports_fd:
+            os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+        # Counter updates from worker threads may race; the tally is informational only
+        self.methods[method] = self.methods.get(method, 0) + 1
+        return method
+
+    def _copy_data(self, src_fd: int, dst_fd: int, size: int) -> str:
+        if self.use_reflink and size:
+            try:
+                import fcntl
+                fcntl.ioctl(dst_fd, FICLONE, src_fd)
+                return "reflink"
+            except (ImportError, OSError):
+                self.use_reflink = False
+
+        if self.use_copy_file_range:
+            copied = self._kernel_copy(src_fd, dst_fd, size, lambda count: os.copy_file_range(src_fd, dst_fd, count))
+            if copied:
+                return "copy_file_range"
+            self.use_copy_file_range = False
+
+        if self.use_sendfile:
+            copied = self._kernel_copy(src_fd, dst_fd, size, lambda count: os.sendfile(dst_fd, src_fd, None, count))
+            if copied:
+                return "sendfile"
+            self.use_sendfile = False
+
+        while True:
+            chunk = os.read(src_fd, CHUNK_SIZE)
+            if not chunk:
+                return "userspace"
+            view = memoryview(chunk)
+            while view:
+                view = view[os.write(dst_fd, view):]
+
+    @staticmethod
+    def _kernel_copy(src_fd: int, dst_fd: int, size: int, call) -> bool:
+        """Copy until EOF with call(count); False if the first call shows the method is unsupported."""
+        offset = 0
+        while True:
+            try:
+                sent = call(max(size - offset, CHUNK_SIZE))
+            except OSError as e:
+                if offset == 0 and e.errno in UNSUPPORTED:
+                    # Nothing written yet: rewind for the next method
+                    os.lseek(src_fd, 0, os.SEEK_SET)
+                    os.lseek(dst_fd, 0, os.SEEK_SET)
+                    return False
+                raise
+            if sent == 0:
+                return True
+            offset += sent
+
+    def copy_files(self, source_root: Path, target_root: Path, stats: Dict[str, Optional[os.stat_result]]) -> Dict:
+        """
+        Copy the given relative paths from source_root to target_root.
+
+        stats maps each path to its source stat result (None to fstat it while
+        copying). Returns {"files", "bytes", "directories", "methods"}.
+        """
+        source_root = Path(source_root)
+        target_root = Path(target_root)
+        directories = create_directories(target_root, stats)
+        items = sorted(stats.items())
+
+        def copy(item):
+            relative, st = item
+            self.copy_file(source_root / relative, target_root / relative, st)
+
+        if self.workers > 1 and len(items) >= PARALLEL_THRESHOLD:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                # Consuming the results re-raises the first failed copy
+                for _ in pool.map(copy, items):
+                    pass
+        else:
+            for item in items:
+                copy(item)
+
+        return {
+            "files": len(items),
+            "bytes": sum(st.st_size for st in stats.values() if st is not None),
+            "directories": directories,
+            "methods": dict(self.methods)
+        }
+
+
+def copy_tree(source_root: Path, target_root: Path, workers: int = DEFAULT_WORKERS):
+    """Copy every file under source_root into target_root; returns (source stats, copy summary)."""
+    stats = scan_tree(source_root)
+    return stats, CopyEngine(workers).copy_files(source_root, target_root, stats)
@@ -0,0 +1,349 @@
+"""
+SpecPilot Engine Archive
+
+The engine packaged as one versioned, checksummed zip file, so that an
+install is a single sequential write and backups, updates and integrity
+checks handle one file instead of every Markdown file in the engine.
+
+Archive layout:
+    .engine-index.json        first member: format, engine version (from
+                              engine_version.json when present), compression,
+                              and {"size", "mtime_ns", "digest", "codec"} per file
+    main.md, core/..., ...    engine files, sorted by path
+
+Members are ZIP_STORED by default. A stored member is read by slicing a
+read-only mmap of the archive at the offset taken from the central directory,
+with no decompression and no extraction. "deflate" uses zip's own
+compression. "zstd" (needs the optional ``zstandard`` package) stores each
+member as a zstd frame; the index records the codec. Every member carries its
+SHA-256 digest in the index, and verify() checks them all. build_archive()
+also writes "<archive>.sha256" (sha256sum format) for the whole file.
+
+open_archive() caches the parsed index per (path, size, mtime), so repeated
+reads in one process parse the central directory once. open_engine() returns
+the installed engine of a project, whether it is the usual
+.specpilot/engine/ directory or a .specpilot/engine.zip archive, behind the
+same small reader interface (names, is_file, read_bytes, read_text, digests).
+
+    python3 -m specpilot.engine_archive build .specpilot/engine engine.zip [--compression zstd]
+    python3 -m specpilot.engine_archive verify engine.zip
+    python3 -m specpilot.engine_archive list engine.zip
+    python3 -m specpilot.engine_archive cat engine.zip protocols/pilot.md
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from specpilot.engine_version import read_version_info
+from specpilot.manifest import build_manifest, hash_file, load_manifest
+
+ARCHIVE_NAME = "engine.zip"
+INDEX_MEMBER = ".engine-index.json"
+ARCHIVE_FORMAT = 1
+COMPRESSIONS = ("stored", "deflate", "zstd")
+LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+_open_archives: Dict[str, "EngineArchive"] = {}
+
+
+class ArchiveError(ValueError):
+    """An engine archive is unreadable, of an unknown format, or fails verification."""
+
+
+def content_version(files: Dict[str, Dict]) -> str:
+    """Short id of an engine's content: the same files always give the same id."""
+    digest = hashlib.sha256()
+    for relative, entry in sorted(files.items()):
+        digest.update(f"{relative}\0{entry['digest']}\n".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def release_version(engine_dir: Path) -> Optional[str]:
+    """The version in the engine's engine_version.json, if it has one."""
+    info = read_version_info(Path(engine_dir))
+    return info["version"] if info else None
+
+
+def build_archive(engine_dir: Path, archive_path: Path, compression: str = "stored",
+                  version: Optional[str] = None, files: Optional[Dict[str, Dict]] = None) -> Dict:
+    """
+    Package an engine directory into archive_path (atomically) and return its index.
+
+    files is the engine manifest when the caller already has one; unchanged
+    files then are not re-hashed.
+    """
+    if compression not in COMPRESSIONS:
+        raise ArchiveError(f"Unknown compression {compression!r} (expected: {', '.join(COMPRESSIONS)})")
+    if compression == "zstd" and zstandard is None:
+        raise ArchiveError("zstd archives require the 'zstandard' package")
+    engine_dir = Path(engine_dir)
+    archive_path = Path(archive_path)
+    files = files if files is not None else build_manifest(engine_dir, load_manifest(engine_dir))
+    codec = "deflate" if compression == "deflate" else compression
+    index = {
+        "format": ARCHIVE_FORMAT,
+        "version": version or release_version(engine_dir) or content_version(files),
+        "created": time.time(),
+        "compression": compression,
+        "files": {relative: dict(entry, codec=codec) for relative, entry in sorted(files.items())}
+    }
+
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = archive_path.with_name(archive_path.name + ".tmp")
+    compressor = zstandard.ZstdCompressor(level=10) if compression == "zstd" else None
+    zip_method = zipfile.ZIP_DEFLATED if compression == "deflate" else zipfile.ZIP_STORED
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression=zip_method) as archive:
+            archive.writestr(INDEX_MEMBER, json.dumps(index, indent=2), compress_type=zipfile.ZIP_STORED)
+            for relative, entry in index["files"].items():
+                data = (engine_dir / relative).read_bytes()
+                if compressor is not None:
+                    data = compressor.compress(data)
+                # Zip timestamps start in 1980
+                date_time = max(time.localtime(entry["mtime_ns"] // 1_000_000_000)[:6], (1980, 1, 1, 0, 0, 0))
+                info = zipfile.ZipInfo(relative, date_time)
+                info.compress_type = zip_method
+                info.external_attr = 0o644 << 16
+                archive.writestr(info, data)
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    with open(checksum_path(archive_path), "w") as f:
+        f.write(f"{hash_file(archive_path)}  {archive_path.name}\n")
+    return index
+
+
+def checksum_path(archive_path: Path) -> Path:
+    return Path(archive_path).with_name(Path(archive_path).name + ".sha256")
+
+
+def read_checksum(archive_path: Path) -> Optional[str]:
+    """The whole-archive digest recorded next to the archive, if any."""
+    try:
+        with open(checksum_path(archive_path), "r") as f:
+            return f.read().split()[0]
+    except (OSError, IndexError):
+        return None
+
+
+class EngineArchive:
+    """Read-only access to the members of an engine archive without extracting it."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.cache_key = None
+        self._map = None
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            # The central directory is parsed once; member data is then sliced straight from the map
+            with zipfile.ZipFile(self._file) as archive:
+                infos = archive.infolist()
+            self._members = {info.filename: self._locate(info) for info in infos}
+            if INDEX_MEMBER not in self._members:
+                raise ArchiveError(f"{self.path}: not an engine archive (no {INDEX_MEMBER})")
+            self.index = json.loads(self._member_data(INDEX_MEMBER))
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            self.close()
+            raise e if isinstance(e, ArchiveError) else ArchiveError(f"{self.path}: {e}")
+        if self.index.get("format") != ARCHIVE_FORMAT:
+            self.close()
+            raise ArchiveError(f"{self.path}: unsupported archive format {self.index.get('format')}")
+        self.files: Dict[str, Dict] = self.index["files"]
+        self.version: str = self.index["version"]
+
+    def _locate(self, info: zipfile.ZipInfo):
+        """(data offset, stored size, zip method) of a member, read from its local header."""
+        header = LOCAL_HEADER.unpack_from(self._map, info.header_offset)
+        if header[0] != LOCAL_HEADER_SIGNATURE:
+            raise ArchiveError(f"{self.path}: bad local header for {info.filename}")
+        name_length, extra_length = header[-2], header[-1]
+        offset = info.header_offset + LOCAL_HEADER.size + name_length + extra_length
+        return offset, info.compress_size, info.compress_type
+
+    def _member_data(self, name: str) -> bytes:
+        offset, size, method = self._members[name]
+        data = self._map[offset:offset + size]
+        if method == zipfile.ZIP_DEFLATED:
+            data = zlib.decompress(data, -15)
+        return data
+
+    def names(self) -> List[str]:
+        return list(self.files)
+
+    def is_file(self, name: str) -> bool:
+        return name in self.files
+
+    def view(self, name: str) -> memoryview:
+        """Zero-copy view of a stored, uncompressed member (raises for compressed ones)."""
+        offset, size, method = self._members[name]
+        if method != zipfile.ZIP_STORED or self.files[name]["codec"] != "stored":
+            raise ArchiveError(f"{name} is compressed; use read_bytes()")
+        return memoryview(self._map)[offset:offset + size]
+
+    def read_bytes(self, name: str) -> bytes:
+        if name not in self.files:
+            raise FileNotFoundError(f"{name} not in {self.path}")
+        data = self._member_data(name)
+        if self.files[name]["codec"] == "zstd":
+            if zstandard is None:
+                raise ArchiveError(f"Reading {self.path.name} requires the 'zstandard' package")
+            data = zstandard.ZstdDecompressor().decompress(data, max_output_size=self.files[name]["size"])
+        return data
+
+    def read_text(self, name: str, encoding: str = "utf-8") -> str:
+        return self.read_bytes(name).decode(encoding)
+
+    def digests(self) -> Dict[str, str]:
+        return {name: entry["digest"] for name, entry in self.files.items()}
+
+    def verify(self) -> List[str]:
+        """Check every member against its recorded size and digest; returns the problems found."""
+        problems = []
+        for name, entry in self.files.items():
+            if name not in self._members:
+                problems.append(f"{name}: missing from archive")
+                continue
+            try:
+                data = self.read_bytes(name)
+            except (ArchiveError, OSError, zlib.error, ValueError) as e:
+                problems.append(f"{name}: unreadable ({e})")
+                continue
+            if len(data) != entry["size"] or hashlib.sha256(data).hexdigest() != entry["digest"]:
+                problems.append(f"{name}: digest mismatch")
+        recorded = read_checksum(self.path)
+        if recorded and recorded != hash_file(self.path):
+            problems.append(f"{self.path.name}: archive checksum does not match {checksum_path(self.path).name}")
+        return problems
+
+    def extract(self, target_dir: Path) -> Dict[str, Dict]:
+        """Write every member into target_dir with its recorded mtime; returns the manifest of the result."""
+        from specpilot.copy_engine import create_directories
+        target_dir = Path(target_dir)
+        create_directories(target_dir, self.files)
+        for name, entry in self.files.items():
+            path = target_dir / name
+            with open(path, "wb") as f:
+                f.write(self.view(name) if entry["codec"] == "stored" else self.read_bytes(name))
+            os.utime(path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+        return {name: {"size": entry["size"], "mtime_ns": entry["mtime_ns"], "digest": entry["digest"]}
+                for name, entry in self.files.items()}
+
+    def close(self):
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def open_archive(path: Path) -> EngineArchive:
+    """Open an archive, reusing the parsed index while the file is unchanged."""
+    path = Path(path).resolve()
+    st = path.stat()
+    key = f"{path}:{st.st_size}:{st.st_mtime_ns}:{st.st_ino}"
+    archive = _open_archives.get(str(path))
+    if archive is None or archive.cache_key != key:
+        if archive is not None:
+            archive.close()
+        archive = EngineArchive(path)
+        archive.cache_key = key
+        _open_archives[str(path)] = archive
+    return archive
+
+
+class DirectoryEngine:
+    """The same reader interface over an unpacked engine directory."""
+
+    def __init__(self, engine_dir: Path):
+        self.path = Path(engine_dir)
+        self.files = build_manifest(self.path, load_manifest(self.path))
+
+    def names(self) -> List[str]:
+        return list(self.files)
+
+    def is_file(self, name: str) -> bool:
+        return name in self.files
+
+    def read_bytes(self, name: str) -> bytes:
+        return (self.path / name).read_bytes()
+
+    def read_text(self, name: str, encoding: str = "utf-8") -> str:
+        return (self.path / name).read_text(encoding=encoding)
+
+    def digests(self) -> Dict[str, str]:
+        return {name: entry["digest"] for name, entry in self.files.items()}
+
+
+def open_engine(specpilot_dir: Path):
+    """The installed engine of a project: the engine/ directory, else engine.zip, else None."""
+    specpilot_dir = Path(specpilot_dir)
+    if (specpilot_dir / "engine").is_dir():
+        return DirectoryEngine(specpilot_dir / "engine")
+    if (specpilot_dir / ARCHIVE_NAME).is_file():
+        return open_archive(specpilot_dir / ARCHIVE_NAME)
+    return None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point for building and inspecting engine archives."""
+    parser = argparse.ArgumentParser(description="Build and inspect SpecPilot engine archives")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="Package an engine directory")
+    build_parser.add_argument("engine_dir")
+    build_parser.add_argument("archive")
+    build_parser.add_argument("--compression", choices=COMPRESSIONS, default="stored",
+                              help="Member compression (default: stored, readable in place)")
+    build_parser.add_argument("--version", help="Engine version to record (default: engine_version.json, "
+                                                "else a content id)")
+    for name, help_text in (("verify", "Check every member digest"), ("list", "List members")):
+        commands.add_parser(name, help=help_text).add_argument("archive")
+    cat_parser = commands.add_parser("cat", help="Print one member")
+    cat_parser.add_argument("archive")
+    cat_parser.add_argument("name")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "build":
+            index = build_archive(Path(args.engine_dir), Path(args.archive), args.compression, args.version)
+            print(f"{args.archive}: {len(index['files'])} files, version {index['version']}, "
+                  f"{Path(args.archive).stat().st_size} bytes, sha256 {read_checksum(Path(args.archive))}")
+            return 0
+        archive = open_archive(Path(args.archive))
+        if args.command == "verify":
+            problems = archive.verify()
+            for problem in problems:
+                print(f"❌ {problem}")
+            if not problems:
+                print(f"✅ {args.archive}: {len(archive.files)} files verified (version {archive.version})")
+            return 1 if problems else 0
+        if args.command == "list":
+            for name, entry in archive.files.items():
+                print(f"{entry['size']:>9}  {entry['codec']:<8} {entry['digest'][:12]}  {name}")
+            return 0
+        sys.stdout.buffer.write(archive.read_bytes(args.name))
+        return 0
+    except (ArchiveError, OSError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
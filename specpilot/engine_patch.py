@@ -0,0 +1,312 @@
+"""
+SpecPilot Engine Patches
+
+Delta patches between engine releases, so that an update which changes a
+handful of protocol files transfers and writes only those files' changes
+instead of the whole engine.
+
+A patch (<from>_to_<to>.patch) is a zip file:
+    .patch-index.json     from/to versions, and per changed file its operation:
+                            delta   binary delta against base_digest
+                            add     full contents (new files, or when the delta is not smaller;
+                                    a replaced file keeps its base_digest)
+                            remove
+                          plus "result", the digest of every file after the patch
+    <relative path>       delta or contents of each delta/add file
+
+Deltas are line-based copy/insert instructions (difflib over the old and new
+lines), so a one-paragraph edit to a Markdown protocol costs about that
+paragraph. compose_patches() applies a chain of patches in memory: each
+step checks the base digest of every file it patches, replaces or removes
+(and that a file it adds is not already there with other contents), and
+each result is checked against its target digest. The final tree must then match the last
+patch's "result" exactly; an installed engine with local edits is refused.
+
+Releases publish patches for the common paths (each previous release to the
+next, and the last few straight to the latest). find_chain() picks the
+shortest chain from the installed version in a patch directory.
+
+    python3 -m specpilot.engine_patch make OLD NEW patches/     # engine dirs or engine archives
+    python3 -m specpilot.engine_patch show patches/1.0.0_to_1.1.0.patch
+    python3 -m specpilot.engine_patch chain patches/ --from 1.0.0
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zipfile
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from specpilot.engine_version import VERSION_FILE, parse_version, read_version_info
+
+PATCH_INDEX = ".patch-index.json"
+PATCH_FORMAT = 1
+PATCH_SUFFIX = ".patch"
+DELTA_MAGIC = b"SPD1"
+COPY = b"C"
+INSERT = b"I"
+COPY_OP = struct.Struct(">cII")
+INSERT_OP = struct.Struct(">cI")
+
+
+class PatchError(ValueError):
+    """A patch does not apply to the installed engine, or its result fails verification."""
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_delta(old: bytes, new: bytes) -> bytes:
+    """Encode new as copy ranges of old plus inserted bytes."""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    old_offsets = [0]
+    for line in old_lines:
+        old_offsets.append(old_offsets[-1] + len(line))
+    new_offsets = [0]
+    for line in new_lines:
+        new_offsets.append(new_offsets[-1] + len(line))
+
+    parts = [DELTA_MAGIC]
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            parts.append(COPY_OP.pack(COPY, old_offsets[i1], old_offsets[i2] - old_offsets[i1]))
+        elif j2 > j1:
+            data = new[new_offsets[j1]:new_offsets[j2]]
+            parts.append(INSERT_OP.pack(INSERT, len(data)) + data)
+    return b"".join(parts)
+
+
+def apply_delta(old: bytes, delta: bytes) -> bytes:
+    """Rebuild the new contents from old and a make_delta() result."""
+    if not delta.startswith(DELTA_MAGIC):
+        raise PatchError("Not a SpecPilot delta")
+    parts = []
+    position = len(DELTA_MAGIC)
+    while position < len(delta):
+        op = delta[position:position + 1]
+        if op == COPY:
+            _, offset, length = COPY_OP.unpack_from(delta, position)
+            if offset + length > len(old):
+                raise PatchError("Delta copies beyond the end of the base file")
+            parts.append(old[offset:offset + length])
+            position += COPY_OP.size
+        elif op == INSERT:
+            _, length = INSERT_OP.unpack_from(delta, position)
+            position += INSERT_OP.size
+            parts.append(delta[position:position + length])
+            position += length
+        else:
+            raise PatchError(f"Corrupt delta at byte {position}")
+    return b"".join(parts)
+
+
+def make_patch(old, new, output: Path) -> Dict:
+    """
+    Write the patch from engine old to engine new (readers from engine_archive) and return its index.
+
+    output is the patch file when it ends in .patch; anything else is a directory (created if
+    missing) in which the file is named <from>_to_<to>.patch.
+    """
+    old_info = read_version_info(old)
+    new_info = read_version_info(new)
+    if old_info is None or new_info is None:
+        raise PatchError(f"Both engines need a {VERSION_FILE} to be patched between")
+    output = Path(output)
+    if output.is_dir() or output.suffix != PATCH_SUFFIX:
+        output = output / f"{old_info['version']}_to_{new_info['version']}{PATCH_SUFFIX}"
+
+    old_files = old.files
+    new_files = new.files
+    entries = {}
+    members = {}
+    for relative in sorted(new_files):
+        entry = new_files[relative]
+        base = old_files.get(relative)
+        if base and base["digest"] == entry["digest"]:
+            continue
+        data = new.read_bytes(relative)
+        record = {"op": "add", "digest": entry["digest"], "size": len(data), "mtime_ns": entry["mtime_ns"]}
+        members[relative] = data
+        if base:
+            record["base_digest"] = base["digest"]
+            delta = make_delta(old.read_bytes(relative), data)
+            if len(delta) < len(data):
+                record["op"] = "delta"
+                members[relative] = delta
+        entries[relative] = record
+    for relative in sorted(set(old_files) - set(new_files)):
+        entries[relative] = {"op": "remove", "base_digest": old_files[relative]["digest"]}
+
+    index = {
+        "format": PATCH_FORMAT,
+        "from_version": old_info["version"],
+        "to_version": new_info["version"],
+        "created": time.time(),
+        "files": entries,
+        "result": {relative: entry["digest"] for relative, entry in sorted(new_files.items())}
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_name(output.name + ".tmp")
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(PATCH_INDEX, json.dumps(index, indent=2))
+        for relative, data in members.items():
+            archive.writestr(relative, data)
+    os.replace(tmp_path, output)
+    index["path"] = output
+    return index
+
+
+def read_patch_index(path: Path) -> Dict:
+    """The index of a patch file (reads only the central directory and one small member)."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            index = json.loads(archive.read(PATCH_INDEX))
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        raise PatchError(f"{path}: not a readable engine patch ({e})")
+    if index.get("format") != PATCH_FORMAT:
+        raise PatchError(f"{path}: unsupported patch format {index.get('format')}")
+    index["path"] = Path(path)
+    return index
+
+
+def find_chain(patch_dir: Path, from_version: str, to_version: Optional[str] = None) -> List[Dict]:
+    """
+    Shortest chain of patch indexes from from_version to to_version (default: the newest reachable).
+
+    Returns [] if from_version is already the target, and raises PatchError if no chain exists.
+    """
+    edges: Dict[str, List[Dict]] = {}
+    for path in sorted(Path(patch_dir).glob(f"*{PATCH_SUFFIX}")):
+        index = read_patch_index(path)
+        edges.setdefault(index["from_version"], []).append(index)
+
+    # Breadth-first, so the chain with the fewest patches wins
+    previous: Dict[str, Optional[Dict]] = {from_version: None}
+    queue = deque([from_version])
+    while queue:
+        version = queue.popleft()
+        for index in edges.get(version, []):
+            if index["to_version"] not in previous:
+                previous[index["to_version"]] = index
+                queue.append(index["to_version"])
+
+    target = to_version or max(previous, key=parse_version)
+    if target not in previous:
+        raise PatchError(f"No patch chain from {from_version} to {target} in {patch_dir}")
+    chain = []
+    while previous[target] is not None:
+        chain.append(previous[target])
+        target = previous[target]["from_version"]
+    return list(reversed(chain))
+
+
+def compose_patches(chain: List[Dict], installed: Dict[str, str], read_installed: Callable[[str], bytes]) -> Dict:
+    """
+    Apply a chain of patch indexes in memory.
+
+    installed maps each installed file to its digest and read_installed reads
+    one. Returns {"write": {path: (data, mtime_ns)}, "remove": [paths],
+    "digests": final digest per path, "transferred": patch bytes read}.
+    """
+    digests = dict(installed)
+    written: Dict[str, tuple] = {}
+    transferred = 0
+    for index in chain:
+        with zipfile.ZipFile(index["path"]) as archive:
+            for relative, entry in index["files"].items():
+                if "base_digest" in entry:
+                    if digests.get(relative) != entry["base_digest"]:
+                        raise PatchError(f"{relative} does not match {index['from_version']} "
+                                         f"(locally modified?); run a full update instead")
+                elif relative in digests and digests[relative] != entry["digest"]:
+                    # An added file must not overwrite one that exists locally
+                    raise PatchError(f"{relative} is not part of {index['from_version']} but exists locally; "
+                                     f"run a full update instead")
+                if entry["op"] == "remove":
+                    digests.pop(relative, None)
+                    written.pop(relative, None)
+                    continue
+                info = archive.getinfo(relative)
+                transferred += info.compress_size
+                payload = archive.read(info)
+                if entry["op"] == "delta":
+                    base = written[relative][0] if relative in written else read_installed(relative)
+                    data = apply_delta(base, payload)
+                else:
+                    data = payload
+                if sha256(data) != entry["digest"]:
+                    raise PatchError(f"{relative}: patched contents do not match the {index['to_version']} digest")
+                written[relative] = (data, entry["mtime_ns"])
+                digests[relative] = entry["digest"]
+        if digests != index["result"]:
+            drifted = sorted(path for path in set(digests) | set(index["result"])
+                             if digests.get(path) != index["result"].get(path))
+            raise PatchError(f"Engine does not match {index['to_version']} after patching "
+                             f"({len(drifted)} files differ, e.g. {drifted[0]}); run a full update instead")
+    return {
+        "write": written,
+        "remove": sorted(set(installed) - set(digests)),
+        "digests": digests,
+        "transferred": transferred
+    }
+
+
+def open_engine_path(path: Path):
+    """A reader for an engine directory or an engine archive file."""
+    from specpilot.engine_archive import DirectoryEngine, open_archive
+    path = Path(path)
+    return DirectoryEngine(path) if path.is_dir() else open_archive(path)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point for building and inspecting engine patches."""
+    parser = argparse.ArgumentParser(description="Build and inspect SpecPilot engine delta patches")
+    commands = parser.add_subparsers(dest="command", required=True)
+    make_parser = commands.add_parser("make", help="Build the patch from OLD to NEW")
+    make_parser.add_argument("old", help="Old engine directory or archive")
+    make_parser.add_argument("new", help="New engine directory or archive")
+    make_parser.add_argument("output", help="Patch file (*.patch), or a directory to name it in (created if missing)")
+    show_parser = commands.add_parser("show", help="Describe a patch")
+    show_parser.add_argument("patch")
+    chain_parser = commands.add_parser("chain", help="Resolve the patch chain between two versions")
+    chain_parser.add_argument("patch_dir")
+    chain_parser.add_argument("--from", dest="from_version", required=True)
+    chain_parser.add_argument("--to", dest="to_version")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "make":
+            index = make_patch(open_engine_path(Path(args.old)), open_engine_path(Path(args.new)), Path(args.output))
+            ops = [entry["op"] for entry in index["files"].values()]
+            print(f"{index['path']}: {index['from_version']} -> {index['to_version']}, "
+                  f"{ops.count('delta')} deltas, {ops.count('add')} added, {ops.count('remove')} removed, "
+                  f"{index['path'].stat().st_size} bytes")
+        elif args.command == "show":
+            index = read_patch_index(Path(args.patch))
+            print(f"{index['from_version']} -> {index['to_version']} ({len(index['result'])} files after patching)")
+            for relative, entry in index["files"].items():
+                print(f"  {entry['op']:<7} {relative}")
+        else:
+            chain = find_chain(Path(args.patch_dir), args.from_version, args.to_version)
+            for index in chain:
+                print(f"{index['from_version']} -> {index['to_version']}  {index['path'].name}")
+            if not chain:
+                print(f"Already at {args.from_version}")
+        return 0
+    except (PatchError, OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+SpecPilot Engine Version
+
+Every engine release carries engine_version.json at the engine root:
+
+    {"version": "1.2.0", "compatible_from": "1.0.0"}
+
+version is the release (MAJOR.MINOR.PATCH). compatible_from is the oldest
+installed release this one can replace directly. Older installs have to go
+through an intermediate release, or through a chain of delta patches (see
+engine_patch), which only ever step between adjacent releases. An update to a
+lower version is refused as well unless the caller allows the downgrade
+explicitly (update --allow-downgrade). Installs from before versioning carry
+no version file; they are accepted and pick up a version with their update.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+VERSION_FILE = "engine_version.json"
+
+
+def parse_version(text: str) -> Tuple[int, ...]:
+    """'1.2.0' -> (1, 2, 0); a missing part counts as 0 and any suffix after '-' or '+' is ignored."""
+    core = str(text).strip().lstrip("v").split("-")[0].split("+")[0]
+    try:
+        parts = tuple(int(part) for part in core.split("."))
+    except ValueError:
+        raise ValueError(f"Invalid engine version {text!r} (expected MAJOR.MINOR.PATCH)")
+    return (parts + (0, 0, 0))[:3]
+
+
+def parse_version_info(data: bytes) -> Dict:
+    """Validate the contents of an engine_version.json file."""
+    info = json.loads(data)
+    if not isinstance(info, dict) or "version" not in info:
+        raise ValueError(f"{VERSION_FILE} must be an object with a 'version'")
+    parse_version(info["version"])
+    info.setdefault("compatible_from", info["version"])
+    parse_version(info["compatible_from"])
+    return info
+
+
+def read_version_info(engine) -> Optional[Dict]:
+    """The version info of an engine directory or engine reader (see engine_archive), or None if unversioned."""
+    if isinstance(engine, (str, os.PathLike)):
+        path = Path(engine) / VERSION_FILE
+        return parse_version_info(path.read_bytes()) if path.is_file() else None
+    if engine is None or not engine.is_file(VERSION_FILE):
+        return None
+    return parse_version_info(engine.read_bytes(VERSION_FILE))
+
+
+def check_compatibility(installed: Optional[Dict], source: Optional[Dict],
+                        allow_downgrade: bool = False) -> Tuple[bool, str]:
+    """Whether source may directly replace installed; returns (ok, reason), the reason naming the direction."""
+    if source is None:
+        return True, "source engine is unversioned"
+    if installed is None:
+        return True, f"installed engine predates versioning; updating to {source['version']}"
+    current = parse_version(installed["version"])
+    target = parse_version(source["version"])
+    if target < current:
+        if not allow_downgrade:
+            return False, (f"refusing to downgrade {installed['version']} -> {source['version']} "
+                           f"(pass --allow-downgrade to roll the engine back deliberately)")
+        return True, f"downgrade {installed['version']} -> {source['version']} (allowed)"
+    if current < parse_version(source["compatible_from"]):
+        return False, (f"engine {source['version']} can only update {source['compatible_from']} or newer; "
+                       f"installed is {installed['version']} (update through an intermediate release "
+                       f"or a patch chain)")
+    if target == current:
+        return True, f"same version ({source['version']})"
+    return True, f"upgrade {installed['version']} -> {source['version']}"
@@ -0,0 +1,450 @@
+"""
+SpecPilot Event Store
+
+Optional SQLite backend for the workspace logs (config option
+logging.event_store). Events are stored once, with typed columns, in
+.specpilot/workspace/<user>/logs/events.db, so consumers query them instead of
+re-parsing free-form text:
+
+    events        id, ts, user, emoji, event_type, mode, message
+                  indexed on (event_type, ts) and (user, ts)
+    transcripts   id, batch, seq, ts, user, emoji, mode, text
+                  one row per transcript cycle; a batch groups the cycles of one
+                  TRANSCRIPT_BATCH block
+    meta          schema version, export marks and import offsets
+
+ts is the log's 'YYYY-MM-DD HH:MM:SS' local time, so it sorts as text. mode
+is the mode active when the row was written: the one named by the user's
+latest [MODE_SWITCH] ("Switched to Pilot Mode" -> "Pilot"). Lines from old logs
+without a user field are stored with the workspace owner's name.
+
+The database runs in WAL mode, so readers never block the logger and
+concurrent sessions serialize only on the short write transactions.
+
+specpilot.log and specpilot_verbose.log become rendered exports. export()
+appends the rows added since the previous export in the usual text format, so
+text consumers and tools that tail the files keep working. Opening the store
+imports any text that was appended to the logs by other means: the existing
+logs when the store is first created, legacy logs moved in by
+migrate_logs_if_needed(), or entries the logger had to write as text while
+the database was unavailable. Imported entries count as already exported.
+
+    python3 -m specpilot.event_store --project . last GIT_COMMIT_SUCCESS
+    python3 -m specpilot.event_store --project . modes --since "2026-01-31 09:00:00"
+    python3 -m specpilot.event_store --project . export
+    python3 -m specpilot.event_store --project . events --type AI_ERROR --since "2026-01-31 00:00:00"
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from specpilot.log_index import LogEvent, fingerprint, format_event, iter_events, last_line_end
+
+DB_NAME = "events.db"
+SCHEMA_VERSION = 1
+MILESTONE_LOG = "specpilot.log"
+VERBOSE_LOG = "specpilot_verbose.log"
+BATCH_EVENT = "TRANSCRIPT_BATCH"
+MODE_EVENT = "MODE_SWITCH"
+BUSY_TIMEOUT_MS = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,
+    user TEXT NOT NULL,
+    emoji TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    mode TEXT,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_type_ts ON events (event_type, ts);
+CREATE INDEX IF NOT EXISTS events_user_ts ON events (user, ts);
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY,
+    batch INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    ts TEXT NOT NULL,
+    user TEXT NOT NULL,
+    emoji TEXT NOT NULL,
+    mode TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transcripts_ts ON transcripts (ts);
+CREATE INDEX IF NOT EXISTS transcripts_batch ON transcripts (batch, seq);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+EVENT_COLUMNS = "id, ts, user, emoji, event_type, mode, message"
+
+
+def mode_of(message: str) -> Optional[str]:
+    """The mode a MODE_SWITCH message switches to, if it names one."""
+    from specpilot.analytics import MODE_PATTERN
+    match = MODE_PATTERN.search(message)
+    return match.group(1).strip() if match else None
+
+
+def split_batch(body: str) -> List[str]:
+    """The transcript cycles of a TRANSCRIPT_BATCH body (cycles fenced by '---' lines)."""
+    cycles = []
+    current = []
+    for line in body.splitlines():
+        if line.strip() == "---":
+            if current:
+                cycles.append("\n".join(current))
+            current = []
+        else:
+            current.append(line)
+    if current and any(part.strip() for part in current):
+        cycles.append("\n".join(current))
+    return cycles
+
+
+def append_text(path: Path, text: str):
+    """Append to a text log as one write under the log helper's advisory lock."""
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        view = memoryview(text.encode("utf-8"))
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+class EventStore:
+    """SQLite event store for one user workspace."""
+
+    def __init__(self, logs_dir: Path, owner: Optional[str] = None, synchronous: str = "NORMAL"):
+        self.logs_dir = Path(logs_dir)
+        self.db_path = self.logs_dir / DB_NAME
+        # Logs live under workspace/<user>/logs, so the directory names their owner
+        self.owner = owner or self.logs_dir.parent.name
+        self.synchronous = synchronous
+        # Entries imported from the text logs when the store was opened, per log
+        self.imported: Dict[str, int] = {}
+        self._db = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """The connection, opened on first use (creating the schema and importing new text log entries)."""
+        if self._db is None:
+            self.logs_dir.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT_MS / 1000,
+                                 isolation_level=None, check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(f"PRAGMA synchronous={self.synchronous}")
+            db.executescript(SCHEMA)
+            db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            self._db = db
+            # Incremental and serialized by the write lock, so concurrent first opens import once
+            self.imported = self.import_logs()
+        return self._db
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _meta(self, key: str, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["value"]) if row else default
+
+    def _set_meta(self, key: str, value):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def current_mode(self, user: str, before: Optional[str] = None) -> Optional[str]:
+        """The mode of the user's latest MODE_SWITCH (at or before a timestamp)."""
+        query = "SELECT mode FROM events WHERE event_type = ? AND user = ? AND mode IS NOT NULL"
+        params: List = [MODE_EVENT, user]
+        if before is not None:
+            query += " AND ts <= ?"
+            params.append(before)
+        row = self.db.execute(query + " ORDER BY ts DESC, id DESC LIMIT 1", params).fetchone()
+        return row["mode"] if row else None
+
+    def add_event(self, ts: str, user: Optional[str], emoji: str, event_type: str, message: str) -> int:
+        """Insert one milestone event and return its id."""
+        user = user or self.owner
+        mode = mode_of(message) if event_type == MODE_EVENT else None
+        db = self.db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            mode = mode or self.current_mode(user, ts)
+            cursor = db.execute("INSERT INTO events (ts, user, emoji, event_type, mode, message) "
+                                "VALUES (?, ?, ?, ?, ?, ?)", (ts, user, emoji, event_type, mode, message))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return cursor.lastrowid
+
+    def add_transcripts(self, ts: str, user: Optional[str], emoji: str, cycles: Sequence[str]) -> int:
+        """Insert one transcript batch, a row per cycle; returns the batch number."""
+        user = user or self.owner
+        db = self.db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            mode = self.current_mode(user, ts)
+            batch = db.execute("SELECT COALESCE(MAX(batch), 0) + 1 FROM transcripts").fetchone()[0]
+            db.executemany("INSERT INTO transcripts (batch, seq, ts, user, emoji, mode, text) "
+                           "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           [(batch, seq, ts, user, emoji, mode, text) for seq, text in enumerate(cycles)])
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return batch
+
+    def import_logs(self) -> Dict[str, int]:
+        """
+        Import text appended to specpilot.log / specpilot_verbose.log since the last import.
+
+        Rows that were not exported yet are rendered after the imported text,
+        in the same transaction; the imported rows themselves count as already
+        present in the text logs. Returns the number of entries imported per log.
+        """
+        counts = {}
+        db = self.db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            pending_upto = {"events": self._max_id("events"), "transcripts": self._max_id("transcripts")}
+            modes: Dict[str, Optional[str]] = {}
+            for name in (MILESTONE_LOG, VERBOSE_LOG):
+                path = self.logs_dir / name
+                counts[name] = 0
+                if not path.exists():
+                    continue
+                position = self._meta(f"imported:{name}", {'offset': 0, 'fingerprint': None})
+                size = path.stat().st_size
+                offset = position['offset']
+                # A shrunk or rewritten log was rotated: start over on the new file
+                if size < offset or (offset and fingerprint(path, offset) != position['fingerprint']):
+                    offset = 0
+                end = last_line_end(path, offset, size)
+                for event in iter_events(path, offset, end):
+                    user = event.user or self.owner
+                    if user not in modes:
+                        modes[user] = self.current_mode(user)
+                    if event.event_type == BATCH_EVENT:
+                        batch = db.execute("SELECT COALESCE(MAX(batch), 0) + 1 FROM transcripts").fetchone()[0]
+                        db.executemany("INSERT INTO transcripts (batch, seq, ts, user, emoji, mode, text) "
+                                       "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                       [(batch, seq, event.timestamp, user, event.emoji, modes[user], text)
+                                        for seq, text in enumerate(split_batch(event.body))])
+                    else:
+                        if event.event_type == MODE_EVENT:
+                            modes[user] = mode_of(event.message) or modes[user]
+                        db.execute("INSERT INTO events (ts, user, emoji, event_type, mode, message) "
+                                   "VALUES (?, ?, ?, ?, ?, ?)",
+                                   (event.timestamp, user, event.emoji, event.event_type, modes[user],
+                                    event.message))
+                    counts[name] += 1
+                self._set_meta(f"imported:{name}", {'offset': end, 'fingerprint': fingerprint(path, end)})
+            self._export_pending(pending_upto)
+            self._set_meta("exported:events", self._max_id("events"))
+            self._set_meta("exported:transcripts", self._max_id("transcripts"))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return counts
+
+    def _max_id(self, table: str) -> int:
+        return self.db.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+
+    def export(self) -> Dict[str, int]:
+        """Append rows added since the previous export to the text logs; returns rows rendered per log."""
+        db = self.db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            counts = self._export_pending()
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return counts
+
+    def _export_pending(self, upto: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+        """Render unexported rows (up to the given ids per table) into the text logs."""
+        upto = upto or {"events": self._max_id("events"), "transcripts": self._max_id("transcripts")}
+        counts = {MILESTONE_LOG: 0, VERBOSE_LOG: 0}
+        since = self._meta("exported:events", 0)
+        rows = self.db.execute(f"SELECT {EVENT_COLUMNS} FROM events WHERE id > ? AND id <= ? ORDER BY id",
+                               (since, upto["events"])).fetchall()
+        if rows:
+            self._append_export(MILESTONE_LOG, "".join(format_event(self._event(row)) for row in rows))
+            self._set_meta("exported:events", rows[-1]["id"])
+            counts[MILESTONE_LOG] = len(rows)
+
+        since = self._meta("exported:transcripts", 0)
+        rows = self.db.execute("SELECT id, batch, ts, user, emoji, text FROM transcripts WHERE id > ? AND id <= ? "
+                               "ORDER BY batch, seq", (since, upto["transcripts"])).fetchall()
+        if rows:
+            self._append_export(VERBOSE_LOG, "".join(format_event(event) for event in self._batches(rows)))
+            self._set_meta("exported:transcripts", max(row["id"] for row in rows))
+            counts[VERBOSE_LOG] = len(rows)
+        return counts
+
+    def _append_export(self, name: str, text: str):
+        path = self.logs_dir / name
+        before = path.stat().st_size if path.exists() else 0
+        position = self._meta(f"imported:{name}", {'offset': 0, 'fingerprint': None})
+        append_text(path, text)
+        if position['offset'] == before:
+            # The rendered rows are the store's own: a later import must not read them back
+            end = before + len(text.encode("utf-8"))
+            self._set_meta(f"imported:{name}", {'offset': end, 'fingerprint': fingerprint(path, end)})
+
+    @staticmethod
+    def _event(row: sqlite3.Row) -> LogEvent:
+        # The row id stands in for the byte offset of a text log event
+        return LogEvent(offset=row["id"], timestamp=row["ts"], user=row["user"], emoji=row["emoji"],
+                        event_type=row["event_type"], message=row["message"], body="")
+
+    @staticmethod
+    def _batches(rows: Sequence[sqlite3.Row]) -> Iterator[LogEvent]:
+        """Group transcript rows (ordered by batch, seq) into TRANSCRIPT_BATCH events."""
+        group: List[sqlite3.Row] = []
+        for row in list(rows) + [None]:
+            if group and (row is None or row["batch"] != group[0]["batch"]):
+                first = group[0]
+                body = "---\n" + "\n---\n".join(item["text"] for item in group) + "\n---\n"
+                yield LogEvent(offset=first["batch"], timestamp=first["ts"], user=first["user"],
+                               emoji=first["emoji"], event_type=BATCH_EVENT, message="Session conversations",
+                               body=body)
+                group = []
+            if row is not None:
+                group.append(row)
+
+    def last(self, event_type: str, user: Optional[str] = None) -> Optional[LogEvent]:
+        """The most recent event of a type, straight from the (event_type, ts) index."""
+        query = f"SELECT {EVENT_COLUMNS} FROM events WHERE event_type = ?"
+        params: List = [event_type]
+        if user:
+            query += " AND user = ?"
+            params.append(user)
+        row = self.db.execute(query + " ORDER BY ts DESC, id DESC LIMIT 1", params).fetchone()
+        return self._event(row) if row else None
+
+    def events(self, since: Optional[str] = None, until: Optional[str] = None, event_type: Optional[str] = None,
+               user: Optional[str] = None) -> Iterator[LogEvent]:
+        """Events in time order, filtered by time range, type and user (each filter uses an index)."""
+        clauses = []
+        params: List = []
+        for clause, value in (("event_type = ?", event_type), ("user = ?", user),
+                              ("ts >= ?", since), ("ts <= ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        for row in self.db.execute(f"SELECT {EVENT_COLUMNS} FROM events{where} ORDER BY ts, id", params):
+            yield self._event(row)
+
+    def events_after_last(self, event_type: str) -> Iterator[LogEvent]:
+        """Events logged after the most recent event of a type (all events if there is none)."""
+        last = self.last(event_type)
+        if last is None:
+            return self.events()
+        return (event for event in self.events(since=last.timestamp)
+                if (event.timestamp, event.offset) > (last.timestamp, last.offset))
+
+    def transcripts(self, since: Optional[str] = None) -> Iterator[LogEvent]:
+        """Transcript batches at or after a timestamp, rendered as TRANSCRIPT_BATCH events."""
+        rows = self.db.execute("SELECT id, batch, ts, user, emoji, text FROM transcripts WHERE ts >= ? "
+                               "ORDER BY batch, seq", (since or "",)).fetchall()
+        return self._batches(rows)
+
+    def mode_distribution(self, since: Optional[str] = None, user: Optional[str] = None) -> Dict[str, int]:
+        """Number of switches into each mode since a timestamp (an index range scan over MODE_SWITCH)."""
+        query = "SELECT mode, COUNT(*) AS switches FROM events WHERE event_type = ? AND ts >= ?"
+        params: List = [MODE_EVENT, since or ""]
+        if user:
+            query += " AND user = ?"
+            params.append(user)
+        rows = self.db.execute(query + " AND mode IS NOT NULL GROUP BY mode ORDER BY switches DESC", params)
+        return {row["mode"]: row["switches"] for row in rows}
+
+    def counts_by_type(self, since: Optional[str] = None) -> Dict[str, int]:
+        """Event counts per type since a timestamp."""
+        rows = self.db.execute("SELECT event_type, COUNT(*) AS events FROM events WHERE ts >= ? "
+                               "GROUP BY event_type", (since or "",))
+        return {row["event_type"]: row["events"] for row in rows}
+
+
+def open_store(logs_dir: Path) -> Optional[EventStore]:
+    """The workspace's event store if it has one (the event_store backend is or was enabled), else None."""
+    logs_dir = Path(logs_dir)
+    return EventStore(logs_dir) if (logs_dir / DB_NAME).exists() else None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point for querying and exporting the event store."""
+    parser = argparse.ArgumentParser(description="Query and export the SpecPilot event store")
+    parser.add_argument('--project', default='.', help='Project root (default: current directory)')
+    parser.add_argument('--user', help='Username (default: from .specpilot.local)')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+
+    last = subparsers.add_parser('last', help='Print the most recent event of a type')
+    last.add_argument('event_type')
+    events = subparsers.add_parser('events', help='Print events, optionally filtered')
+    events.add_argument('--since', help="'YYYY-MM-DD HH:MM:SS'")
+    events.add_argument('--until', help="'YYYY-MM-DD HH:MM:SS'")
+    events.add_argument('--type', dest='event_type')
+    events.add_argument('--by', dest='by_user', help='Only events logged by this user')
+    modes = subparsers.add_parser('modes', help='Print the mode distribution (switches per mode) as JSON')
+    modes.add_argument('--since', help="'YYYY-MM-DD HH:MM:SS'")
+    stats = subparsers.add_parser('stats', help='Print event counts by type as JSON')
+    stats.add_argument('--since', help="'YYYY-MM-DD HH:MM:SS'")
+    subparsers.add_parser('export', help='Render rows added since the last export to the text logs')
+    subparsers.add_parser('import', help='Import text appended to the logs since the last import (also done on open)')
+
+    args = parser.parse_args(argv)
+    from specpilot.log_index import logs_dir_for
+    store = EventStore(logs_dir_for(Path(args.project), args.user))
+    try:
+        if args.action == 'last':
+            event = store.last(args.event_type)
+            if event is None:
+                return 1
+            sys.stdout.write(format_event(event))
+        elif args.action == 'events':
+            for event in store.events(args.since, args.until, args.event_type, args.by_user):
+                sys.stdout.write(format_event(event))
+        elif args.action == 'modes':
+            print(json.dumps(store.mode_distribution(args.since), indent=2))
+        elif args.action == 'stats':
+            print(json.dumps(store.counts_by_type(args.since), indent=2, sort_keys=True))
+        else:
+            if args.action == 'export':
+                counts = store.export()
+            else:
+                store.db  # opening the store runs the import
+                counts = store.imported
+            for name, count in counts.items():
+                print(f"{name}: {count} entries {args.action}ed")
+        return 0
+    except sqlite3.Error as e:
+        print(f"❌ Event store error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
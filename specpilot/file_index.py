@@ -0,0 +1,439 @@
+"""
+SpecPilot Changed-File Index
+
+Persistent file-state index used by Session Check and Deep Check to scope
+an audit to "files changed since the last commit" without walking and
+re-reading the whole project each time. Works the same in git and non-git
+directories.
+
+Index: .specpilot/workspace/<user>/cache/file_index.json
+    {
+      "version": 1,
+      "files": {"src/app.py": {"size": 10, "mtime_ns": 1699..., "digest": "ab12..." | null}},
+      "baseline": {"commit": "YYYY-MM-DD HH:MM:SS", "reconstructed": false, "files": {...}},
+      "watcher_pid": 1234 | null
+    }
+
+``files`` is the current state; ``baseline`` is the state recorded when the
+last [GIT_COMMIT_SUCCESS] was logged (``snapshot``). Digests are computed
+when a baseline is recorded and otherwise only for files whose size or
+mtime differ from it, so a file that is merely touched is not reported.
+Unchanged files keep their digest across snapshots and are never re-read.
+
+When no baseline exists for the latest commit, one is reconstructed from
+mtimes: files modified after the commit timestamp are treated as changed,
+which matches the protocol's original rule.
+
+Refreshing costs one stat per file. On Linux, ``watch`` keeps the index warm
+through inotify; while a watcher is running, queries read the index without
+walking the tree at all.
+
+Usage:
+    python3 -m specpilot.file_index --project . changed     # files changed since the last commit
+    python3 -m specpilot.file_index --project . snapshot    # record the baseline (after a commit)
+    python3 -m specpilot.file_index --project . watch &     # keep the index warm
+"""
+
+import argparse
+import json
+import os
+import select
+import signal
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from specpilot.analytics import COMMIT_EVENT, parse_timestamp
+from specpilot.manifest import hash_file
+
+INDEX_VERSION = 1
+INDEX_NAME = "file_index.json"
+IGNORED_DIRS = {".git", ".hg", ".svn", ".specpilot", "node_modules", "__pycache__", ".venv", "venv",
+                ".mypy_cache", ".pytest_cache", ".tox"}
+WATCH_DEBOUNCE_SECONDS = 0.2
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def scan_tree(root: Path, start: str = "") -> Dict[str, os.stat_result]:
+    """Return {relative_path: stat} for every file under root/start, skipping IGNORED_DIRS."""
+    root = Path(root)
+    found = {}
+    stack = [root / start if start else root]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORED_DIRS:
+                        stack.append(Path(entry.path))
+                elif entry.is_file(follow_symlinks=False):
+                    found[Path(entry.path).relative_to(root).as_posix()] = entry.stat(follow_symlinks=False)
+    return found
+
+
+def is_ignored(relative: str) -> bool:
+    """True when any component of a relative path is an ignored directory."""
+    return any(part in IGNORED_DIRS for part in relative.split("/"))
+
+
+def pid_alive(pid: Optional[int]) -> bool:
+    """True when a process with this pid exists."""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class FileIndex:
+    """Current and last-commit file state for one project."""
+
+    def __init__(self, project_root: Path, index_path: Path):
+        self.project_root = Path(project_root)
+        self.index_path = Path(index_path)
+        self.data = self._empty()
+
+    def _empty(self) -> Dict:
+        return {'version': INDEX_VERSION, 'files': {}, 'baseline': None, 'watcher_pid': None}
+
+    def load(self) -> "FileIndex":
+        """Load the stored index, starting fresh if it is missing or from another version."""
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self.data = data
+                return self
+        except (OSError, ValueError):
+            pass
+        self.data = self._empty()
+        return self
+
+    def save(self):
+        """Atomically write the index."""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+    def watcher_running(self) -> bool:
+        """True when a live watcher is keeping this index current."""
+        return pid_alive(self.data.get('watcher_pid'))
+
+    def _entry(self, relative: str, st: os.stat_result) -> Dict:
+        """Build an entry, keeping the known digest when the file's stat is unchanged."""
+        known = self.data['files'].get(relative)
+        digest = None
+        if known and known['size'] == st.st_size and known['mtime_ns'] == st.st_mtime_ns:
+            digest = known.get('digest')
+        return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'digest': digest}
+
+    def refresh(self):
+        """Re-stat the whole tree."""
+        self.data['files'] = {relative: self._entry(relative, st)
+                              for relative, st in scan_tree(self.project_root).items()}
+
+    def update_paths(self, paths: Iterable[str]):
+        """Re-stat only the given relative paths (files or directories)."""
+        files = self.data['files']
+        for relative in set(paths):
+            if is_ignored(relative):
+                continue
+            full = self.project_root / relative
+            prefix = relative + "/"
+            if full.is_dir() and not full.is_symlink():
+                found = scan_tree(self.project_root, relative)
+                for stale in [path for path in files if path.startswith(prefix) and path not in found]:
+                    del files[stale]
+                for child, st in found.items():
+                    files[child] = self._entry(child, st)
+                continue
+            try:
+                st = os.lstat(full)
+            except OSError:
+                files.pop(relative, None)
+                for stale in [path for path in files if path.startswith(prefix)]:
+                    del files[stale]
+                continue
+            if os.path.isfile(full) and not full.is_symlink():
+                files[relative] = self._entry(relative, st)
+
+    def digest(self, relative: str) -> Optional[str]:
+        """Return (and cache) the digest of a current file."""
+        entry = self.data['files'][relative]
+        if entry.get('digest') is None:
+            try:
+                entry['digest'] = hash_file(self.project_root / relative)
+            except OSError:
+                return None
+        return entry['digest']
+
+    def snapshot(self, commit_timestamp: Optional[str]):
+        """Record the current state, with digests, as the baseline for a commit."""
+        for relative in self.data['files']:
+            self.digest(relative)
+        self.data['baseline'] = {
+            'commit': commit_timestamp,
+            'reconstructed': False,
+            'files': {relative: dict(entry) for relative, entry in self.data['files'].items()}
+        }
+
+    def reconstruct_baseline(self, commit_timestamp: str):
+        """Derive a baseline from mtimes: files modified after the commit are assumed changed."""
+        cutoff_ns = int(parse_timestamp(commit_timestamp) * 1_000_000_000)
+        self.data['baseline'] = {
+            'commit': commit_timestamp,
+            'reconstructed': True,
+            'files': {relative: dict(entry) for relative, entry in self.data['files'].items()
+                      if entry['mtime_ns'] < cutoff_ns}
+        }
+
+    def changes(self) -> Dict[str, List[str]]:
+        """Diff the current state against the baseline: added, modified and removed paths."""
+        baseline = (self.data.get('baseline') or {}).get('files', {})
+        files = self.data['files']
+        added = []
+        modified = []
+        for relative, entry in files.items():
+            base = baseline.get(relative)
+            if base is None:
+                added.append(relative)
+            elif base['size'] != entry['size'] or base['mtime_ns'] != entry['mtime_ns']:
+                if base.get('digest') is None or self.digest(relative) != base['digest']:
+                    modified.append(relative)
+        removed = [relative for relative in baseline if relative not in files]
+        return {'added': sorted(added), 'modified': sorted(modified), 'removed': sorted(removed)}
+
+    def scope(self, commit_timestamp: Optional[str]) -> Dict:
+        """
+        Refresh (unless a watcher keeps the index warm) and return the changes since a commit.
+
+        A baseline recorded for an older commit is replaced by one reconstructed
+        from mtimes; without any commit every indexed file is in scope.
+        """
+        self.load()
+        if not self.watcher_running():
+            self.data['watcher_pid'] = None
+            self.refresh()
+        baseline = self.data.get('baseline')
+        if commit_timestamp is None:
+            self.data['baseline'] = None
+        elif not baseline or baseline.get('commit') != commit_timestamp:
+            self.reconstruct_baseline(commit_timestamp)
+        result = dict(self.changes(), commit=commit_timestamp,
+                      reconstructed=bool(self.data['baseline'] and self.data['baseline']['reconstructed']))
+        self.save()
+        return result
+
+
+class InotifyWatcher:
+    """Recursive inotify watch over a project tree (Linux only)."""
+
+    def __init__(self, root: Path):
+        import ctypes
+        self.root = Path(root)
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+
+    def add_tree(self, relative: str = ""):
+        """Watch a directory and all non-ignored directories below it."""
+        stack = [relative]
+        while stack:
+            current = stack.pop()
+            path = self.root / current if current else self.root
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(str(path)), WATCH_MASK)
+            if wd < 0:
+                continue
+            self.watches[wd] = current
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False) and entry.name not in IGNORED_DIRS:
+                            stack.append(f"{current}/{entry.name}" if current else entry.name)
+            except OSError:
+                continue
+
+    def read_events(self, timeout: Optional[float]) -> Optional[List[str]]:
+        """
+        Wait up to timeout for events and return the changed relative paths.
+
+        Returns None when the kernel queue overflowed and a full refresh is needed.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        buffer = os.read(self.fd, 64 * 1024)
+        paths = []
+        position = 0
+        while position < len(buffer):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, position)
+            position += EVENT_HEADER.size
+            name = buffer[position:position + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            position += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            directory = self.watches.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.watches[wd]
+                continue
+            if not name:
+                continue
+            if name in IGNORED_DIRS and mask & IN_ISDIR:
+                continue
+            relative = f"{directory}/{name}" if directory else name
+            paths.append(relative)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self.add_tree(relative)
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def watch(index: FileIndex, debounce: float = WATCH_DEBOUNCE_SECONDS):
+    """Keep the index current from inotify events until interrupted or terminated."""
+    signal.signal(signal.SIGTERM, _interrupt)
+    watcher = InotifyWatcher(index.project_root)
+    watcher.add_tree()
+    index.load()
+    index.refresh()
+    index.data['watcher_pid'] = os.getpid()
+    index.save()
+    try:
+        while True:
+            paths = watcher.read_events(None)
+            pending = set(paths) if paths is not None else None
+            # Coalesce bursts (saves, checkouts) into one index write
+            while paths != []:
+                paths = watcher.read_events(debounce)
+                if paths is None or pending is None:
+                    pending = None
+                else:
+                    pending.update(paths)
+            index.load()
+            if pending is None:
+                index.refresh()
+            else:
+                index.update_paths(pending)
+            index.data['watcher_pid'] = os.getpid()
+            index.save()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        index.load()
+        if index.data.get('watcher_pid') == os.getpid():
+            index.data['watcher_pid'] = None
+            index.save()
+
+
+def last_commit_timestamp(logs_dir: Path) -> Optional[str]:
+    """Timestamp of the last [GIT_COMMIT_SUCCESS] in the milestone log, via the event store or the log's index and segments."""
+    from specpilot.event_store import open_store
+    from specpilot.log_rotation import LogRotator
+    store = open_store(logs_dir)
+    if store is not None:
+        try:
+            event = store.last(COMMIT_EVENT)
+        finally:
+            store.close()
+        return event.timestamp if event else None
+    event = LogRotator(Path(logs_dir) / "specpilot.log").last(COMMIT_EVENT)
+    return event.timestamp if event else None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point used by Session Check and Deep Check."""
+    parser = argparse.ArgumentParser(description="Track project files changed since the last commit")
+    parser.add_argument('--project', default='.', help='Project root (default: current directory)')
+    parser.add_argument('--user', help='Username (default: from .specpilot.local)')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+
+    changed = subparsers.add_parser('changed', help='Print files changed since the last commit')
+    changed.add_argument('--json', action='store_true', help='Print added/modified/removed as JSON')
+    snapshot = subparsers.add_parser('snapshot', help='Record the current state as the last-commit baseline')
+    snapshot.add_argument('--commit', help="Commit timestamp 'YYYY-MM-DD HH:MM:SS' (default: from the log)")
+    subparsers.add_parser('refresh', help='Re-stat the project tree')
+    watch_parser = subparsers.add_parser('watch', help='Keep the index current with inotify (Linux)')
+    watch_parser.add_argument('--debounce', type=float, default=WATCH_DEBOUNCE_SECONDS,
+                              help=f'Seconds to coalesce bursts of events (default: {WATCH_DEBOUNCE_SECONDS})')
+    subparsers.add_parser('status', help='Print index statistics')
+
+    args = parser.parse_args(argv)
+    from specpilot.log_index import logs_dir_for
+    project_root = Path(args.project).resolve()
+    logs_dir = logs_dir_for(project_root, args.user)
+    index = FileIndex(project_root, logs_dir.parent / "cache" / INDEX_NAME)
+
+    if args.action == 'changed':
+        result = index.scope(last_commit_timestamp(logs_dir))
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            for relative in result['added'] + result['modified']:
+                print(relative)
+    elif args.action == 'snapshot':
+        index.load()
+        if not index.watcher_running():
+            index.refresh()
+        index.snapshot(args.commit or last_commit_timestamp(logs_dir))
+        index.save()
+    elif args.action == 'refresh':
+        index.load()
+        index.refresh()
+        index.save()
+    elif args.action == 'watch':
+        try:
+            watch(index, args.debounce)
+        except (OSError, AttributeError) as e:
+            print(f"inotify is not available: {e}", file=sys.stderr)
+            return 1
+    else:
+        index.load()
+        baseline = index.data.get('baseline') or {}
+        print(json.dumps({
+            'files': len(index.data['files']),
+            'baseline_commit': baseline.get('commit'),
+            'baseline_reconstructed': baseline.get('reconstructed'),
+            'watcher_running': index.watcher_running()
+        }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+SpecPilot Fleet Runner
+
+Runs one bootstrap command across many project directories on a bounded
+set of worker threads and collects a per-target result for a consolidated summary.
+
+Targets come from either a list file (one directory per line, ``#`` starts
+a comment) or a glob pattern such as ``projects/*``.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# How long abandoned targets get, after the rest of the fleet is done, to reach a deadline check and clean up
+ABANDON_GRACE_SECONDS = 5.0
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a target's per-target timeout expires before its changes are activated."""
+
+
+def resolve_targets(spec: str) -> List[Path]:
+    """Expand a list file or glob pattern into existing, de-duplicated directories."""
+    import glob
+    spec_path = Path(spec).expanduser()
+    if spec_path.is_file():
+        base = spec_path.parent
+        candidates = []
+        with open(spec_path, "r") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    candidate = Path(line).expanduser()
+                    candidates.append(candidate if candidate.is_absolute() else base / candidate)
+    else:
+        candidates = [Path(match) for match in sorted(glob.glob(str(spec_path)))]
+
+    targets = []
+    seen = set()
+    for candidate in candidates:
+        resolved = candidate.resolve()
+        if resolved.is_dir() and resolved not in seen:
+            seen.add(resolved)
+            targets.append(resolved)
+    return targets
+
+
+def default_workers() -> int:
+    """Default pool size: bounded so hundreds of targets do not oversubscribe disk I/O."""
+    return min(8, (os.cpu_count() or 1) * 2)
+
+
+def run_fleet(targets: List[Path], run_target: Callable[[Path, Optional[float]], Dict],
+              workers: int, timeout: Optional[float] = None) -> Dict:
+    """
+    Run run_target(target, deadline) for every target and summarize the results.
+
+    Each call receives an absolute time.monotonic() deadline (or None) that it is
+    expected to check before making changes live; DeadlineExceeded is reported as
+    a timeout and any other exception as an error for that target only.
+
+    The timeout is also enforced from outside: every target runs on its own
+    daemon thread, at most `workers` at a time, and a target still running at
+    its deadline (e.g. blocked on a hung mount) is reported as a timeout and
+    abandoned, so its slot goes to the next target. Its next deadline check
+    stops it before it activates anything (and lets it undo a partial init);
+    abandoned targets get ABANDON_GRACE_SECONDS at the end to get there, and
+    one still blocked after that is flagged as such in its result.
+    """
+    # Imported here so bootstrap start-up can use DeadlineExceeded without loading threading
+    import queue
+    import threading
+
+    def timed_out(target: Path, start: float) -> Dict:
+        return {'status': 'timeout', 'files_copied': 0, 'error': f"Exceeded {timeout}s timeout",
+                'target': str(target), 'duration_ms': round((time.monotonic() - start) * 1000, 1)}
+
+    def guarded(index: int, target: Path, start: float, deadline: Optional[float]):
+        try:
+            result = run_target(target, deadline)
+        except DeadlineExceeded:
+            result = timed_out(target, start)
+        except Exception as e:
+            result = {'status': 'error', 'files_copied': 0, 'error': str(e)}
+        result['target'] = str(target)
+        result['duration_ms'] = round((time.monotonic() - start) * 1000, 1)
+        finished.put((index, result))
+
+    start = time.monotonic()
+    finished = queue.Queue()
+    results: List[Optional[Dict]] = [None] * len(targets)
+    running: Dict[int, tuple] = {}
+    abandoned: Dict[int, threading.Thread] = {}
+    waiting = list(enumerate(targets))
+    waiting.reverse()
+    while waiting or running:
+        while waiting and len(running) < max(1, workers):
+            index, target = waiting.pop()
+            target_start = time.monotonic()
+            deadline = target_start + timeout if timeout else None
+            thread = threading.Thread(target=guarded, args=(index, target, target_start, deadline), daemon=True)
+            running[index] = (target, target_start, deadline, thread)
+            thread.start()
+
+        deadlines = [deadline for _, _, deadline, _ in running.values() if deadline is not None]
+        wait = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+        try:
+            index, result = finished.get(timeout=wait)
+            if index in running:
+                del running[index]
+                results[index] = result
+        except queue.Empty:
+            pass
+        now = time.monotonic()
+        for index, (target, target_start, deadline, thread) in list(running.items()):
+            if deadline is not None and now >= deadline:
+                del running[index]
+                results[index] = timed_out(target, target_start)
+                abandoned[index] = thread
+
+    grace_end = time.monotonic() + ABANDON_GRACE_SECONDS
+    for index, thread in abandoned.items():
+        thread.join(max(0.0, grace_end - time.monotonic()))
+        if thread.is_alive():
+            results[index]['error'] += "; still blocked, partial changes may remain"
+
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+
+    return {
+        'targets': len(targets),
+        'workers': workers,
+        'timeout': timeout,
+        'duration_ms': round((time.monotonic() - start) * 1000, 1),
+        'status_counts': counts,
+        'files_copied': sum(result.get('files_copied', 0) for result in results),
+        'results': results
+    }
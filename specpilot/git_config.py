@@ -0,0 +1,121 @@
+"""
+SpecPilot Git Config Reader
+
+Reads user.name straight from Git's config files, so the bootstrap can pick a
+default username without spawning `git config` (a subprocess costs more than
+the rest of a fast-mode start-up).
+
+Files are checked in Git's precedence order, highest first:
+    <repository>/.git/config            found by walking up from the project
+    $GIT_CONFIG_GLOBAL or ~/.gitconfig
+    $XDG_CONFIG_HOME/git/config         (~/.config/git/config)
+    $GIT_CONFIG_SYSTEM or /etc/gitconfig
+
+Worktrees and submodules (a .git file with "gitdir: ...") are followed to the
+shared config. [include] and [includeIf] sections are not expanded; a name
+set only through an include is not found and the caller's default applies.
+"""
+
+import os
+from pathlib import Path
+from typing import List, Optional
+
+
+def find_repository_config(start: Path) -> Optional[Path]:
+    """Locate the config file of the repository containing start, if any."""
+    directory = Path(start).resolve()
+    for candidate in [directory] + list(directory.parents):
+        dot_git = candidate / ".git"
+        if dot_git.is_dir():
+            return dot_git / "config"
+        if dot_git.is_file():
+            try:
+                with open(dot_git, "r") as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if not line.startswith("gitdir:"):
+                return None
+            git_dir = Path(line[len("gitdir:"):].strip())
+            if not git_dir.is_absolute():
+                git_dir = candidate / git_dir
+            # Linked worktrees keep the shared config in the common directory
+            commondir = git_dir / "commondir"
+            if commondir.is_file():
+                common = Path(commondir.read_text().strip())
+                git_dir = common if common.is_absolute() else git_dir / common
+            return git_dir / "config"
+    return None
+
+
+def config_files(start: Path) -> List[Path]:
+    """Config files that can define user.name, highest precedence first."""
+    home = Path(os.path.expanduser("~"))
+    xdg_home = os.environ.get("XDG_CONFIG_HOME") or str(home / ".config")
+    files = []
+    repository = find_repository_config(start)
+    if repository:
+        files.append(repository)
+    files.append(Path(os.environ.get("GIT_CONFIG_GLOBAL") or home / ".gitconfig"))
+    files.append(Path(xdg_home) / "git" / "config")
+    if not os.environ.get("GIT_CONFIG_NOSYSTEM"):
+        files.append(Path(os.environ.get("GIT_CONFIG_SYSTEM") or "/etc/gitconfig"))
+    return files
+
+
+def parse_value(raw: str) -> str:
+    """Decode a config value: quotes, backslash escapes and trailing comments."""
+    value = []
+    quoted = False
+    escapes = {"n": "\n", "t": "\t", "b": "\b", "\\": "\\", '"': '"'}
+    index = 0
+    while index < len(raw):
+        char = raw[index]
+        if char == "\\" and index + 1 < len(raw):
+            value.append(escapes.get(raw[index + 1], raw[index + 1]))
+            index += 2
+            continue
+        if char == '"':
+            quoted = not quoted
+        elif char in "#;" and not quoted:
+            break
+        else:
+            value.append(char)
+        index += 1
+    return "".join(value).strip()
+
+
+def read_config_value(path: Path, section: str, key: str) -> Optional[str]:
+    """Last value of section.key in one config file (sections without a subsection only)."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    current = None
+    found = None
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            header = line[1:line.find("]")] if "]" in line else line[1:]
+            current = header.strip().lower()
+            line = line[line.find("]") + 1:].strip() if "]" in line else ""
+            if not line:
+                continue
+        if current != section:
+            continue
+        name, _, raw = line.partition("=")
+        if name.strip().lower() == key:
+            found = parse_value(raw)
+    return found
+
+
+def read_git_user(start: Path) -> Optional[str]:
+    """user.name as Git would resolve it for a project directory, or None if unset."""
+    for path in config_files(start):
+        name = read_config_value(path, "user", "name")
+        if name:
+            return name
+    return None
@@ -0,0 +1,1884 @@
+"""
+SpecPilot Installer
+
+Implementation of bootstrap.py: installs the SpecPilot framework into a new
+or existing project, and updates, rolls back and configures existing ones.
+It lives in the package so its bytecode is cached; bootstrap.py itself is a
+small entry point, since a script run directly is recompiled on every call.
+
+Start-up is kept short for CI wrappers that call it thousands of times: only
+os, sys, time and pathlib load up front, and each command imports what it
+needs (shutil, json, argparse, the other specpilot modules) when it runs.
+Span timing is a no-op unless --trace, --trace-hook or --profile asks for
+it, and the fleet module loads only for fleet runs and deadline handling.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(text: str) -> int:
+    """'500M' -> 524288000; accepts a plain byte count or a K/M/G/T suffix (optionally followed by B)."""
+    value = str(text).strip().upper()
+    if value.endswith("B"):
+        value = value[:-1]
+    unit = value[-1:] if value[-1:] in SIZE_UNITS else ""
+    try:
+        number = float(value[:len(value) - len(unit)])
+    except ValueError:
+        raise ValueError(f"Invalid size {text!r} (expected e.g. 500M or 2G)")
+    if number < 0:
+        raise ValueError(f"Invalid size {text!r}")
+    return int(number * SIZE_UNITS[unit])
+
+
+class _NullSpan:
+    """Span stand-in while nothing records timings."""
+    status = "ok"
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _NullTracer:
+    """
+    Tracer stand-in until start_tracing() is called for --trace, --trace-hook or
+    --profile, so ordinary runs never import specpilot.instrumentation.
+    """
+    spans = ()
+
+    def span(self, name: str, **attrs) -> _NullSpan:
+        return _NullSpan()
+
+    def count(self, files: int = 0, bytes: int = 0):
+        pass
+
+
+class SpecPilotBootstrap:
+    """Main bootstrap class for installing SpecPilot framework."""
+    
+    def __init__(self, target_directory: str = None):
+        if target_directory:
+            self.project_root = Path(target_directory).resolve()
+        else:
+            self.project_root = Path.cwd()
+        
+        self.framework_root = Path(__file__).parent.parent
+        self.specpilot_dir = self.project_root / ".specpilot"
+        self.engine_dir = self.specpilot_dir / "engine"
+        # Alternative layout: the whole engine as one archive (see specpilot.engine_archive)
+        self.engine_archive = self.specpilot_dir / "engine.zip"
+        self.workspace_dir = self.specpilot_dir / "workspace"
+        self.backup_dir = self.specpilot_dir / "backups"
+        
+        # Run state, read back by fleet mode for its per-target summary
+        self.errors = []
+        self.files_copied = 0
+        self.deadline = None
+        self.source_manifest = None
+        self.force = False
+        self.quiet = False
+        # --engine-archive: install or update from a packaged engine archive
+        self.source_archive = None
+        # Fast-mode inputs from --answers, SPECPILOT_* variables or a batch line (see specpilot.answers)
+        self.answers = {}
+        # Timed spans per phase; a no-op until start_tracing() (--trace, --profile)
+        self.tracer = _NullTracer()
+        
+        # Colors for terminal output
+        self.colors = {
+            'reset': '\033[0m',
+            'bold': '\033[1m',
+            'red': '\033[91m',
+            'green': '\033[92m',
+            'yellow': '\033[93m',
+            'blue': '\033[94m',
+            'magenta': '\033[95m',
+            'cyan': '\033[96m'
+        }
+    
+    def start_tracing(self, hooks: Optional[List] = None):
+        """Record timed spans from now on and forward each to hooks (--trace, --trace-hook, --profile)."""
+        from specpilot.instrumentation import Tracer
+        self.tracer = Tracer(target=str(self.project_root), hooks=hooks)
+    
+    def print_banner(self):
+        """Display the SpecPilot welcome banner."""
+        banner = f"""
+{self.colors['bold']}{self.colors['blue']}
+╔══════════════════════════════════════════════════════════════╗
+║                    🚀 SpecPilot Framework                   ║
+║                                                              ║
+║              AI Speed. Engineered Discipline.               ║
+║                                                              ║
+║        Transforming AI coding from chaos to clarity         ║
+╚══════════════════════════════════════════════════════════════╝
+{self.colors['reset']}
+"""
+        print(banner)
+    
+    def print_step(self, step: str, message: str):
+        """Print a formatted step message."""
+        print(f"{self.colors['bold']}{self.colors['green']}✅ {step}{self.colors['reset']} {message}")
+    
+    def print_warning(self, message: str):
+        """Print a formatted warning message."""
+        print(f"{self.colors['bold']}{self.colors['yellow']}⚠️  {message}{self.colors['reset']}")
+    
+    def print_error(self, message: str):
+        """Print a formatted error message."""
+        self.errors.append(message)
+        print(f"{self.colors['bold']}{self.colors['red']}❌ {message}{self.colors['reset']}")
+    
+    def print_info(self, message: str):
+        """Print a formatted info message."""
+        print(f"{self.colors['cyan']}ℹ️  {message}{self.colors['reset']}")
+    
+    def count_written(self, *paths: Path):
+        """Add files written by the current phase to its span counters."""
+        for path in paths:
+            if path.exists():
+                self.tracer.count(files=1, bytes=path.stat().st_size)
+    
+    def validate_environment(self) -> bool:
+        """Validate the current environment for installation."""
+        print(f"{self.colors['bold']}🚦 Validating environment...{self.colors['reset']}")
+        
+        # Check Python version
+        if sys.version_info < (3, 7):
+            self.print_error("Python 3.7 or higher is required.")
+            return False
+        
+        # Check if .specpilot already exists
+        if self.specpilot_dir.exists() and not self.force:
+            if self.quiet:
+                self.print_error(".specpilot directory already exists (use --force to overwrite).")
+                return False
+            self.print_warning(".specpilot directory already exists.")
+            response = input("Overwrite existing installation? (y/N): ").strip().lower()
+            if response != 'y':
+                self.print_info("Installation cancelled.")
+                return False
+        
+        # Check if directory is writable
+        if not os.access(self.project_root, os.W_OK):
+            self.print_error("Target directory is not writable.")
+            return False
+        
+        self.print_step("Environment", "Validation passed")
+        return True
+    
+    def get_user_info(self) -> Dict[str, str]:
+        """Get user information interactively."""
+        print(f"\n{self.colors['bold']}👤 User Configuration{self.colors['reset']}")
+        
+        # Get username
+        git_user = self.get_git_user()
+        username = input(f"Username [{git_user}]: ").strip() or git_user
+        
+        # Get project title
+        project_title = input("Project title: ").strip()
+        if not project_title:
+            project_title = self.project_root.name
+        
+        # Get project description
+        project_desc = input("Project description (optional): ").strip()
+        
+        return {
+            'username': username,
+            'project_title': project_title,
+            'project_desc': project_desc
+        }
+    
+    def get_git_user(self) -> str:
+        """Get Git username from the repository and global config files (no git subprocess)."""
+        from specpilot.git_config import read_git_user
+        return read_git_user(self.project_root) or 'developer'
+    
+    def get_development_philosophy(self) -> str:
+        """Get user's development philosophy preference."""
+        print(f"\n{self.colors['bold']}🏗️  Development Philosophy{self.colors['reset']}")
+        print("Choose your development approach:")
+        print("1. 🥇 Enterprise Scale - Strict rules, security focus, TDD")
+        print("2. 🦄 Scalable MVP - Solid foundations, growth-oriented")
+        print("3. 🍄 Vibe Time - Minimal conventions, flexible approach")
+        
+        while True:
+            choice = input("Select (1-3) [2]: ").strip() or "2"
+            if choice in ['1', '2', '3']:
+                philosophies = {
+                    '1': 'enterprise',
+                    '2': 'scalable',
+                    '3': 'vibe'
+                }
+                return philosophies[choice]
+            print("Please select 1, 2, or 3.")
+    
+    def get_architecture_goal(self) -> str:
+        """Get user's architectural goal preference."""
+        print(f"\n{self.colors['bold']}🏛️  Architecture Goals{self.colors['reset']}")
+        print("Choose your primary architectural goal:")
+        print("1. 🥇 Enterprise Scale - High security and reliability from day one")
+        print("2. 🦄 Scalable MVP - Build a solid foundation that can grow")
+        print("3. 🍄 Vibe Time - No formal architecture, just get it working")
+        
+        while True:
+            choice = input("Select (1-3) [2]: ").strip() or "2"
+            if choice in ['1', '2', '3']:
+                goals = {
+                    '1': 'enterprise',
+                    '2': 'scalable',
+                    '3': 'vibe'
+                }
+                return goals[choice]
+            print("Please select 1, 2, or 3.")
+    
+    def get_notepad_preference(self) -> str:
+        """Get user's notepad summary preference."""
+        print(f"\n{self.colors['bold']}📝 Notepad Configuration{self.colors['reset']}")
+        print("How would you like your notepad summarized?")
+        print("1. one-line - Brief summary after each command")
+        print("2. command - Detailed command-style summary after each command")
+        print("3. none - No automatic summary")
+        
+        while True:
+            choice = input("Select (1-3) [1]: ").strip() or "1"
+            if choice in ['1', '2', '3']:
+                preferences = {
+                    '1': 'one-line',
+                    '2': 'command',
+                    '3': 'none'
+                }
+                return preferences[choice]
+            print("Please select 1, 2, or 3.")
+    
+    def get_commit_intelligence(self) -> bool:
+        """Get user's commit intelligence preference."""
+        print(f"\n{self.colors['bold']}🎁 Commit Intelligence{self.colors['reset']}")
+        print("Enable SpecPilot's intelligent commit analysis?")
+        print("This provides development intelligence scores and session analytics.")
+        
+        response = input("Enable commit intelligence? (Y/n): ").strip().lower()
+        return response != 'n'
+    
+    def create_backup(self) -> Optional[str]:
+        """Snapshot the current engine files into the deduplicated backup store."""
+        from specpilot.backup_store import BackupStore
+        from specpilot.engine_version import read_version_info
+        from specpilot.manifest import build_manifest, load_manifest
+        if self.uses_engine_archive():
+            # The archive is backed up as a single file
+            from specpilot.engine_archive import open_archive
+            try:
+                archive = open_archive(self.engine_archive)
+                snapshot_path = BackupStore(self.backup_dir).create_archive_snapshot(
+                    self.engine_archive, archive.version, len(archive.files))
+            except Exception as e:
+                self.print_error(f"Backup creation failed: {str(e)}")
+                return None
+            self.tracer.count(files=1, bytes=snapshot_path.stat().st_size)
+            self.print_step("Backup", f"Created: {snapshot_path.stem}")
+            return str(snapshot_path)
+        
+        if not self.engine_dir.exists():
+            self.print_error("No existing SpecPilot installation found to backup.")
+            return None
+        
+        try:
+            files = build_manifest(self.engine_dir, load_manifest(self.engine_dir))
+            info = read_version_info(self.engine_dir)
+            snapshot_path = BackupStore(self.backup_dir).create_snapshot(self.engine_dir, files,
+                                                                         info['version'] if info else None)
+            self.tracer.count(files=len(files), bytes=sum(entry['size'] for entry in files.values()))
+            self.print_step("Backup", f"Created: {snapshot_path.stem}")
+            return str(snapshot_path)
+        except Exception as e:
+            self.print_error(f"Backup creation failed: {str(e)}")
+            return None
+    
+    def list_backups(self) -> List[Dict]:
+        """List engine backups from the backup catalog, newest first."""
+        from specpilot.backup_store import BackupStore
+        return list(reversed(BackupStore(self.backup_dir).list_snapshots()))
+    
+    @staticmethod
+    def describe_backup(backup: Dict) -> str:
+        """One-line summary of a catalog entry: id, date, engine version, files and size."""
+        from datetime import datetime
+        from specpilot.instrumentation import format_bytes
+        details = [datetime.fromtimestamp(backup['created']).strftime("%Y-%m-%d %H:%M:%S")]
+        if backup.get('version'):
+            details.append(f"v{backup['version']}")
+        if backup.get('files') is not None:
+            details.append(f"{backup['files']} files")
+        if backup.get('size') is not None:
+            details.append(format_bytes(backup['size']))
+        return f"{backup['id']} ({', '.join(details)})"
+    
+    @staticmethod
+    def retention_policy(args) -> Dict:
+        """The cleanup_old_backups() arguments for --keep-backups, --keep-daily, --keep-weekly and --max-backup-bytes."""
+        return {
+            'keep_count': args.keep_backups,
+            'keep_daily': getattr(args, 'keep_daily', 0) or 0,
+            'keep_weekly': getattr(args, 'keep_weekly', 0) or 0,
+            'max_bytes': getattr(args, 'max_backup_bytes', None)
+        }
+    
+    @staticmethod
+    def describe_retention(policy: Dict) -> str:
+        """Human-readable form of a retention_policy() result."""
+        from specpilot.instrumentation import format_bytes
+        rules = [f"last {policy['keep_count']}"]
+        if policy.get('keep_daily'):
+            rules.append(f"{policy['keep_daily']} daily")
+        if policy.get('keep_weekly'):
+            rules.append(f"{policy['keep_weekly']} weekly")
+        text = "keep " + ", ".join(rules)
+        if policy.get('max_bytes') is not None:
+            text += f", at most {format_bytes(policy['max_bytes'])} in total"
+        return text
+    
+    def cleanup_old_backups(self, keep_count: int = 3, keep_daily: int = 0, keep_weekly: int = 0,
+                            max_bytes: Optional[int] = None):
+        """Remove the backups the retention policy does not keep (see backup_store.plan_retention)."""
+        from specpilot.backup_store import BackupStore
+        if not self.backup_dir.exists():
+            return
+            
+        try:
+            removed = BackupStore(self.backup_dir).prune(keep_count, keep_daily, keep_weekly, max_bytes)
+            self.tracer.count(files=len(removed))
+            if hasattr(self, 'verbose') and self.verbose:
+                for backup in removed:
+                    self.print_info(f"Removed old backup: {backup['id']}")
+        except Exception as e:
+            self.print_warning(f"Backup cleanup failed: {str(e)}")
+    
+    def uses_engine_archive(self) -> bool:
+        """True when the engine is installed as .specpilot/engine.zip instead of a directory."""
+        return self.engine_archive.is_file() and not self.engine_dir.exists()
+    
+    def install_engine_archive(self, archive_path: Path) -> bool:
+        """Verify an engine archive and install it as .specpilot/engine.zip with one sequential copy."""
+        import shutil
+        from specpilot.copy_engine import CopyEngine
+        from specpilot.engine_archive import ArchiveError, checksum_path, open_archive
+        archive_path = Path(archive_path)
+        try:
+            archive = open_archive(archive_path)
+            problems = archive.verify()
+        except (ArchiveError, OSError) as e:
+            self.print_error(f"Cannot read engine archive: {e}")
+            return False
+        if problems:
+            self.print_error(f"Engine archive failed verification: {problems[0]}")
+            return False
+        
+        self.specpilot_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.engine_archive.with_name(self.engine_archive.name + ".tmp")
+        CopyEngine().copy_file(archive_path, tmp_path)
+        self.check_deadline()
+        os.replace(tmp_path, self.engine_archive)
+        if checksum_path(archive_path).is_file():
+            shutil.copyfile(checksum_path(archive_path), checksum_path(self.engine_archive))
+        else:
+            checksum_path(self.engine_archive).unlink(missing_ok=True)
+        if self.engine_dir.exists():
+            # One layout at a time: the archive replaces an unpacked engine
+            shutil.rmtree(self.engine_dir)
+        self.files_copied = len(archive.files)
+        self.tracer.count(files=1, bytes=self.engine_archive.stat().st_size)
+        self.print_step("Framework", f"Engine archive {archive.version} installed ({len(archive.files)} files)")
+        self.refresh_prompt_bundles()
+        return True
+    
+    def run_archive_update(self, args) -> bool:
+        """Update an engine installed as an archive: one backup file, one archive write."""
+        from specpilot.engine_archive import ArchiveError, build_archive, checksum_path, open_archive
+        built = None
+        try:
+            with self.tracer.span("plan"):
+                source = self.source_archive
+                if source is None:
+                    # Package the framework's engine next to the live archive
+                    built = source = self.engine_archive.with_name(self.engine_archive.name + ".new")
+                    build_archive(self.framework_root / ".specpilot" / "engine", built,
+                                  files=self.load_source_manifest())
+                source_archive = open_archive(source)
+                current_archive = open_archive(self.engine_archive)
+                source_files = source_archive.digests()
+                current_files = current_archive.digests()
+                self.tracer.count(files=len(source_files))
+            changed = sorted(path for path, digest in source_files.items() if current_files.get(path) != digest)
+            removed = sorted(path for path in current_files if path not in source_files)
+            
+            if not changed and not removed:
+                self.print_step("Update", f"Engine archive already current (version {current_archive.version})")
+                self.refresh_prompt_bundles()
+                return True
+            if args.dry_run:
+                self.print_info("🔍 DRY RUN MODE - No files will be modified")
+                self.print_info(f"Would replace engine archive {current_archive.version} with "
+                                f"{source_archive.version}: {len(changed)} files added or updated, "
+                                f"{len(removed)} removed")
+                return True
+            
+            with self.tracer.span("backup"):
+                backup_path = self.create_backup()
+            if not backup_path:
+                self.print_error("Failed to create backup. Update cancelled.")
+                return False
+            
+            with self.tracer.span("update"):
+                updated = self.install_engine_archive(source)
+            if not updated:
+                self.print_error("Update failed. Rolling back...")
+                with self.tracer.span("rollback"):
+                    restored = self.rollback_update(backup_path)
+                if restored:
+                    self.print_info("Successfully rolled back to previous version.")
+                else:
+                    self.print_error("Rollback failed. Manual intervention required.")
+                return False
+            self.files_copied = len(changed)
+            
+            with self.tracer.span("cleanup", keep=args.keep_backups):
+                self.cleanup_old_backups(**self.retention_policy(args))
+            
+            self.print_step("Update", f"Engine archive updated to {source_archive.version} "
+                                      f"({len(changed)} files changed, {len(removed)} removed)")
+            self.print_info(f"Backup saved at: {backup_path}")
+            return True
+        except ArchiveError as e:
+            self.print_error(f"Engine update failed: {e}")
+            return False
+        finally:
+            if built is not None:
+                built.unlink(missing_ok=True)
+                checksum_path(built).unlink(missing_ok=True)
+    
+    def run_patch_update(self, args) -> bool:
+        """Update an engine directory with delta patches: one patch file, or the shortest chain in a directory."""
+        from specpilot.engine_patch import PatchError, compose_patches, find_chain, read_patch_index
+        from specpilot.engine_version import read_version_info
+        from specpilot.manifest import build_manifest, load_manifest
+        try:
+            with self.tracer.span("plan"):
+                installed = read_version_info(self.engine_dir)
+                if installed is None:
+                    self.print_error("The installed engine has no engine_version.json; run a full update instead.")
+                    return False
+                patch_path = Path(args.patch)
+                if patch_path.is_dir():
+                    chain = find_chain(patch_path, installed['version'])
+                else:
+                    chain = [read_patch_index(patch_path)]
+                    if chain[0]['from_version'] != installed['version']:
+                        raise PatchError(f"{patch_path.name} updates {chain[0]['from_version']}, "
+                                         f"but the installed engine is {installed['version']}")
+                if not chain:
+                    self.print_step("Update", f"Engine already at the newest patched version ({installed['version']})")
+                    return True
+                target_files = build_manifest(self.engine_dir, load_manifest(self.engine_dir))
+                result = compose_patches(chain, {relative: entry['digest'] for relative, entry in target_files.items()},
+                                         lambda relative: (self.engine_dir / relative).read_bytes())
+                self.tracer.count(files=len(result['write']), bytes=result['transferred'])
+            versions = " -> ".join([chain[0]['from_version']] + [index['to_version'] for index in chain])
+            
+            if args.dry_run:
+                self.print_info("🔍 DRY RUN MODE - No files will be modified")
+                self.print_info(f"Would apply {len(chain)} patches ({versions}): write {len(result['write'])} files, "
+                                f"remove {len(result['remove'])}, {result['transferred']} patch bytes")
+                return True
+            
+            with self.tracer.span("backup"):
+                backup_path = self.create_backup()
+            if not backup_path:
+                self.print_error("Failed to create backup. Update cancelled.")
+                return False
+            
+            with self.tracer.span("update"):
+                updated = self.apply_engine_patch(result, target_files)
+            if not updated:
+                self.print_error("Update failed. Rolling back...")
+                with self.tracer.span("rollback"):
+                    restored = self.rollback_update(backup_path)
+                if restored:
+                    self.print_info("Successfully rolled back to previous version.")
+                else:
+                    self.print_error("Rollback failed. Manual intervention required.")
+                return False
+            
+            with self.tracer.span("cleanup", keep=args.keep_backups):
+                self.cleanup_old_backups(**self.retention_policy(args))
+            
+            self.print_step("Update", f"Engine patched {versions} ({len(result['write'])} files written, "
+                                      f"{len(result['remove'])} removed, {result['transferred']} patch bytes)")
+            self.print_info(f"Backup saved at: {backup_path}")
+            return True
+        except PatchError as e:
+            self.print_error(f"Patch update failed: {e}")
+            return False
+    
+    def apply_engine_patch(self, result: Dict, target_files: Dict[str, Dict]) -> bool:
+        """Stage the files a composed patch chain writes, hardlink the rest, verify and swap in."""
+        import shutil
+        from specpilot.copy_engine import create_directories
+        from specpilot.fleet import DeadlineExceeded
+        from specpilot.manifest import MANIFEST_NAME, hash_file, save_manifest
+        from specpilot.staging import activate_staging, create_staging_dir, link_or_copy
+        try:
+            staging_dir = create_staging_dir(self.engine_dir)
+            try:
+                create_directories(staging_dir, result['digests'])
+                staged_files = {}
+                for relative, digest in result['digests'].items():
+                    if relative in result['write']:
+                        data, mtime_ns = result['write'][relative]
+                        (staging_dir / relative).write_bytes(data)
+                        os.utime(staging_dir / relative, ns=(mtime_ns, mtime_ns))
+                        staged_files[relative] = {'size': len(data), 'mtime_ns': mtime_ns, 'digest': digest}
+                    else:
+                        link_or_copy(self.engine_dir / relative, staging_dir / relative)
+                        staged_files[relative] = target_files[relative]
+                # Check what reached the disk, not only what was composed in memory
+                for relative in result['write']:
+                    if hash_file(staging_dir / relative) != result['digests'][relative]:
+                        raise ValueError(f"{relative} does not match its digest after writing")
+                
+                save_manifest(staging_dir, staged_files)
+                self.check_deadline()
+                activate_staging(staging_dir, self.engine_dir, list(result['write']) + [MANIFEST_NAME])
+            except Exception:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise
+            self.files_copied = len(result['write'])
+            self.tracer.count(files=len(result['write']),
+                              bytes=sum(len(data) for data, _ in result['write'].values()))
+            self.refresh_prompt_bundles()
+            return True
+            
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            self.print_error(f"Engine update failed: {str(e)}")
+            return False
+    
+    def check_version_compatibility(self, allow_downgrade: bool = False) -> bool:
+        """Check the source engine's engine_version.json against the installed engine's."""
+        from specpilot.engine_archive import open_archive
+        from specpilot.engine_version import check_compatibility, read_version_info
+        try:
+            installed = read_version_info(open_archive(self.engine_archive) if self.uses_engine_archive()
+                                          else self.engine_dir)
+            source = read_version_info(open_archive(self.source_archive) if self.source_archive
+                                       else self.framework_root / ".specpilot" / "engine")
+        except (OSError, ValueError) as e:
+            self.print_error(f"Cannot read engine version: {e}")
+            return False
+        compatible, reason = check_compatibility(installed, source, allow_downgrade)
+        if compatible:
+            self.print_info(f"Engine version: {reason}")
+        else:
+            self.print_error(f"Engine version: {reason}")
+        return compatible
+    
+    def check_deadline(self):
+        """Abort before activating changes once a fleet per-target timeout has passed."""
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            from specpilot.fleet import DeadlineExceeded
+            raise DeadlineExceeded(f"Timed out in {self.project_root}")
+    
+    def load_source_manifest(self) -> Dict[str, Dict]:
+        """Hash the framework's source engine once; fleet mode shares the result across targets."""
+        if self.source_manifest is None:
+            from specpilot.manifest import build_manifest, load_manifest
+            source_engine = self.framework_root / ".specpilot" / "engine"
+            self.source_manifest = build_manifest(source_engine, load_manifest(source_engine))
+        return self.source_manifest
+    
+    def plan_engine_update(self) -> Optional[Dict]:
+        """Compare the source and installed engine manifests and return the pending changes."""
+        from specpilot.manifest import build_manifest, diff_manifests, load_manifest
+        start = time.perf_counter()
+        source_engine = self.framework_root / ".specpilot" / "engine"
+        if not source_engine.exists():
+            self.print_error("Source engine files not found in current framework.")
+            return None
+        
+        source_files = self.load_source_manifest()
+        # The stored manifest acts as a stat cache: unchanged files are not re-hashed
+        target_files = build_manifest(self.engine_dir, load_manifest(self.engine_dir))
+        added, changed, removed = diff_manifests(source_files, target_files)
+        
+        return {
+            'source_engine': source_engine,
+            'source_files': source_files,
+            'target_files': target_files,
+            'added': added,
+            'changed': changed,
+            'removed': removed,
+            'scan_ms': (time.perf_counter() - start) * 1000
+        }
+    
+    def update_engine_files(self, dry_run: bool = False, plan: Optional[Dict] = None) -> bool:
+        """Update the engine files from the current framework, copying only what changed."""
+        import shutil
+        from specpilot.copy_engine import CopyEngine, create_directories
+        from specpilot.fleet import DeadlineExceeded
+        from specpilot.manifest import MANIFEST_NAME, hash_file, save_manifest
+        from specpilot.staging import activate_staging, create_staging_dir, link_or_copy
+        try:
+            start = time.perf_counter()
+            if dry_run:
+                self.print_info("🔍 DRY RUN MODE - No files will be modified")
+            
+            if plan is None:
+                plan = self.plan_engine_update()
+            if plan is None:
+                return False
+            
+            to_copy = plan['added'] + plan['changed']
+            removed = plan['removed']
+            
+            if dry_run:
+                self.print_info(f"Would add {len(plan['added'])}, update {len(plan['changed'])} "
+                                f"and remove {len(removed)} engine files:")
+                pending = [f"+ {path}" for path in plan['added']] + \
+                          [f"~ {path}" for path in plan['changed']] + \
+                          [f"- {path}" for path in removed]
+                for line in pending[:5]:  # Show first 5
+                    self.print_info(f"  {line}")
+                if len(pending) > 5:
+                    self.print_info(f"  ... and {len(pending) - 5} more files")
+                return True
+            
+            if not to_copy and not removed:
+                elapsed_ms = plan['scan_ms'] + (time.perf_counter() - start) * 1000
+                self.print_step("Update", f"Engine already current ({len(plan['source_files'])} files checked "
+                                          f"in {elapsed_ms:.1f} ms, 0 copied)")
+                # Refresh the stored manifest so later checks stay on the stat-only fast path
+                save_manifest(self.engine_dir, plan['target_files'])
+                self.refresh_prompt_bundles()
+                return True
+            
+            # Build the new engine in a staging directory and swap it in atomically.
+            # Unchanged files are hardlinked from the live engine, so only changed files are copied.
+            source_engine = plan['source_engine']
+            staging_dir = create_staging_dir(self.engine_dir)
+            try:
+                create_directories(staging_dir, plan['source_files'])
+                staged_files = {}
+                for relative, entry in plan['source_files'].items():
+                    if relative in plan['target_files'] and relative not in plan['changed']:
+                        # A hardlink (or copy2 fallback) keeps size and mtime, so the live entry still holds
+                        link_or_copy(self.engine_dir / relative, staging_dir / relative)
+                        staged_files[relative] = plan['target_files'][relative]
+                    else:
+                        # The copy engine keeps the source mtime, so the source entry describes the copy
+                        staged_files[relative] = entry
+                        if hasattr(self, 'verbose') and self.verbose:
+                            self.print_info(f"Updated: {self.engine_dir / relative}")
+                CopyEngine().copy_files(source_engine, staging_dir, {relative: None for relative in to_copy})
+                for relative in to_copy:
+                    if hash_file(staging_dir / relative) != staged_files[relative]['digest']:
+                        raise ValueError(f"{relative} changed while it was being copied; run the update again")
+                
+                if hasattr(self, 'verbose') and self.verbose:
+                    for relative in removed:
+                        self.print_info(f"Removed: {self.engine_dir / relative}")
+                
+                save_manifest(staging_dir, staged_files)
+                self.check_deadline()
+                activate_staging(staging_dir, self.engine_dir, to_copy + [MANIFEST_NAME])
+            except Exception:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise
+            self.files_copied = len(to_copy)
+            self.tracer.count(files=len(to_copy),
+                              bytes=sum(plan['source_files'][relative]['size'] for relative in to_copy))
+            
+            elapsed_ms = plan['scan_ms'] + (time.perf_counter() - start) * 1000
+            self.print_step("Update", f"Successfully updated {len(to_copy)} engine files, "
+                                      f"removed {len(removed)} ({elapsed_ms:.1f} ms)")
+            self.refresh_prompt_bundles()
+            return True
+            
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            self.print_error(f"Engine update failed: {str(e)}")
+            return False
+    
+    def rollback_update(self, backup_path: str) -> bool:
+        """Rollback to a previous backup."""
+        import shutil
+        from specpilot.backup_store import BackupStore
+        from specpilot.fleet import DeadlineExceeded
+        from specpilot.manifest import save_manifest
+        from specpilot.staging import activate_staging, create_staging_dir
+        try:
+            backup = Path(backup_path)
+            if not backup.exists():
+                self.print_error(f"Backup not found: {backup_path}")
+                return False
+            
+            is_archive_backup = backup.suffix == ".zip"
+            if self.uses_engine_archive():
+                if not is_archive_backup:
+                    self.print_error(f"{backup.stem} is an engine directory backup; this project uses engine.zip")
+                    return False
+                # Restoring an archive is the same single verified copy as installing one
+                if not self.install_engine_archive(backup):
+                    return False
+                self.print_step("Rollback", f"Successfully restored from backup: {backup.stem}")
+                return True
+            
+            # Restore into a staging directory, then swap it in atomically
+            staging_dir = create_staging_dir(self.engine_dir)
+            try:
+                files = BackupStore(self.backup_dir).materialize(backup, staging_dir)
+                save_manifest(staging_dir, files)
+                self.check_deadline()
+                activate_staging(staging_dir, self.engine_dir)
+            except Exception:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise
+            self.files_copied = len(files)
+            self.tracer.count(files=len(files), bytes=sum(entry['size'] for entry in files.values()))
+            self.print_step("Rollback", f"Successfully restored from backup: {backup.stem}")
+            self.refresh_prompt_bundles()
+            return True
+            
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            self.print_error(f"Rollback failed: {str(e)}")
+            return False
+    
+    def recover_interrupted_swap(self):
+        """Clean up staging directories left behind by an interrupted update or rollback."""
+        from specpilot.staging import recover_staging
+        for action in recover_staging(self.engine_dir):
+            self.print_warning(action)
+    
+    def create_directory_structure(self):
+        """Create the complete directory structure."""
+        print(f"\n{self.colors['bold']}📁 Creating directory structure...{self.colors['reset']}")
+        
+        directories = [
+            self.specpilot_dir,
+            self.workspace_dir,
+            self.project_root / "docs" / "plans",
+            self.project_root / "docs" / "specs",
+            self.project_root / "src",
+            self.project_root / "tests",
+        ]
+        if not self.source_archive:
+            directories.insert(1, self.engine_dir)
+        
+        for directory in directories:
+            directory.mkdir(parents=True, exist_ok=True)
+            self.print_step("Directory", f"Created {directory}")
+    
+    def copy_framework_files(self):
+        """Copy the SpecPilot framework files."""
+        from specpilot.copy_engine import copy_tree, manifest_from_stats
+        from specpilot.manifest import build_manifest, save_manifest
+        print(f"\n{self.colors['bold']}🔧 Installing SpecPilot framework...{self.colors['reset']}")
+        
+        if self.source_archive:
+            return self.install_engine_archive(self.source_archive)
+        
+        # Copy engine directory
+        if (self.framework_root / ".specpilot" / "engine").exists():
+            source_engine = self.framework_root / ".specpilot" / "engine"
+            stats, summary = copy_tree(source_engine, self.engine_dir)
+            # Copies keep the source size and mtime, so the walk's stats and the source digests make the manifest
+            source_files = self.load_source_manifest()
+            files = manifest_from_stats(stats, source_files) or build_manifest(self.engine_dir, source_files)
+            save_manifest(self.engine_dir, files)
+            self.files_copied = len(files)
+            self.tracer.count(files=summary['files'], bytes=summary['bytes'])
+            self.print_step("Framework", "Engine files copied")
+            self.refresh_prompt_bundles()
+        else:
+            self.print_error("SpecPilot engine not found in framework directory")
+            return False
+        
+        return True
+    
+    def refresh_prompt_bundles(self):
+        """Recompile the per-mode prompt bundles whose engine sources or override changed."""
+        try:
+            from specpilot.bundles import refresh_bundles
+            with self.tracer.span("bundles"):
+                rebuilt = refresh_bundles(self.specpilot_dir)
+                self.tracer.count(files=len(rebuilt))
+        except Exception as e:
+            self.print_warning(f"Could not compile prompt bundles: {str(e)}")
+            return
+        if rebuilt:
+            self.print_step("Bundles", f"Compiled {len(rebuilt)} mode bundles into .specpilot/bundles/")
+    
+    def create_user_workspace(self, username: str):
+        """Create user-specific workspace."""
+        print(f"\n{self.colors['bold']}👤 Setting up user workspace...{self.colors['reset']}")
+        
+        user_workspace = self.workspace_dir / username
+        user_workspace.mkdir(parents=True, exist_ok=True)
+        
+        # Create subdirectories
+        (user_workspace / "config").mkdir(exist_ok=True)
+        (user_workspace / "logs").mkdir(exist_ok=True)
+        (user_workspace / "notepad").mkdir(exist_ok=True)
+        
+        self.print_step("Workspace", f"Created for user '{username}'")
+        return user_workspace
+    
+    def create_config_files(self, user_workspace: Path, username: str, preferences: Dict):
+        """Create configuration files."""
+        import json
+        print(f"\n{self.colors['bold']}⚙️  Creating configuration files...{self.colors['reset']}")
+        
+        # Create .specpilot.local
+        local_config = {
+            "username": username,
+            "workspace_path": f".specpilot/workspace/{username}"
+        }
+        
+        with open(self.project_root / ".specpilot.local", "w") as f:
+            json.dump(local_config, f, indent=2)
+        
+        # Create user config
+        user_config = {
+            "_description": f"Project-specific configuration for {username}",
+            "logging": {
+                "verbose_mode": True,
+                "notepad_summary": preferences.get('notepad_summary', 'one-line'),
+                "track_model": True
+            },
+            "commitconfiguration": {
+                "commit_intelligence": preferences.get('commit_intelligence', True),
+                "session_analytics": True,
+                "frustration_scoring": True,
+                "productivity_metrics": True
+            }
+        }
+        
+        with open(user_workspace / "config" / "config.json", "w") as f:
+            json.dump(user_config, f, indent=2)
+        self.count_written(self.project_root / ".specpilot.local", user_workspace / "config" / "config.json")
+        
+        self.print_step("Configuration", "Files created")
+    
+    def create_documentation_templates(self, project_title: str, project_desc: str, philosophy: str, architecture: str):
+        """Render the project documentation from the engine templates in one pass."""
+        from specpilot.templates import render_documents
+        print(f"\n{self.colors['bold']}📚 Creating documentation templates...{self.colors['reset']}")
+        
+        # Render from the framework's own templates when available, so fleet installs share one compiled cache
+        template_dir = self.framework_root / ".specpilot" / "engine" / "templates"
+        if not template_dir.exists():
+            template_dir = self.engine_dir / "templates"
+        
+        context = {
+            'project_title': project_title,
+            'project_desc': project_desc,
+            'philosophy': philosophy,
+            'architecture': architecture
+        }
+        documents = {
+            "README.md": "readme",
+            "docs/plans/product_roadmap.md": "product_roadmap",
+            "docs/plans/architecture.md": "architecture",
+            "docs/plans/technical_roadmap.md": "technical_roadmap",
+            "docs/project_conventions.md": "project_conventions"
+        }
+        
+        for filepath, content in render_documents(template_dir, documents, context).items():
+            with open(self.project_root / filepath, "w") as f:
+                f.write(content)
+            self.count_written(self.project_root / filepath)
+        
+        self.print_step("Documentation", "Templates created")
+    
+    def create_notepad(self, user_workspace: Path):
+        """Create the user's notepad file."""
+        notepad_file = user_workspace / "notepad" / "note.md"
+        
+        notepad_content = """# Development Notes
+
+---
+
+## Ideas
+*Add your ideas here*
+
+## To Do List
+*Add your tasks here*
+
+## Decisions to Make
+*Add decisions that need to be made here*
+
+## Other Notes
+*Add other notes here*
+
+---
+_Use "Add to notepad:" to capture content | Use "Organize Notepad" to clean up_
+"""
+        
+        with open(notepad_file, "w") as f:
+            f.write(notepad_content)
+        self.count_written(notepad_file)
+        
+        self.print_step("Notepad", "Initialized")
+    
+    def create_gitignore(self):
+        """Create .gitignore file."""
+        gitignore_content = """# SpecPilot
+.specpilot.local
+.specpilot/bundles/
+
+# Python
+__pycache__/
+*.py[cod]
+*$py.class
+*.so
+.Python
+build/
+develop-eggs/
+dist/
+downloads/
+eggs/
+.eggs/
+lib/
+lib64/
+parts/
+sdist/
+var/
+wheels/
+*.egg-info/
+.installed.cfg
+*.egg
+
+# Virtual environments
+.env
+.venv
+env/
+venv/
+ENV/
+env.bak/
+venv.bak/
+
+# IDE
+.vscode/
+.idea/
+*.swp
+*.swo
+*~
+
+# OS
+.DS_Store
+.DS_Store?
+._*
+.Spotlight-V100
+.Trashes
+ehthumbs.db
+Thumbs.db
+"""
+        
+        with open(self.project_root / ".gitignore", "w") as f:
+            f.write(gitignore_content)
+        self.count_written(self.project_root / ".gitignore")
+        
+        self.print_step("Files", ".gitignore created (useful even without Git)")
+    
+    def create_requirements_txt(self):
+        """Create requirements.txt file."""
+        requirements_content = """# Project dependencies
+# Add your Python package requirements here
+"""
+        
+        with open(self.project_root / "requirements.txt", "w") as f:
+            f.write(requirements_content)
+        self.count_written(self.project_root / "requirements.txt")
+        
+        self.print_step("Dependencies", "requirements.txt created")
+    
+    def run_interactive_mode(self):
+        """Run the interactive bootstrap mode."""
+        print(f"{self.colors['bold']}🌱 Interactive Bootstrap Mode{self.colors['reset']}")
+        
+        # Validate environment
+        with self.tracer.span("validate"):
+            valid = self.validate_environment()
+        if not valid:
+            return False
+        
+        # Get user information
+        user_info = self.get_user_info()
+        philosophy = self.get_development_philosophy()
+        architecture = self.get_architecture_goal()
+        notepad_pref = self.get_notepad_preference()
+        commit_intel = self.get_commit_intelligence()
+        
+        preferences = {
+            'notepad_summary': notepad_pref,
+            'commit_intelligence': commit_intel,
+            'philosophy': philosophy,
+            'architecture': architecture
+        }
+        
+        # Show installation plan
+        print(f"\n{self.colors['bold']}📋 Installation Plan{self.colors['reset']}")
+        print(f"Project: {user_info['project_title']}")
+        print(f"Username: {user_info['username']}")
+        print(f"Philosophy: {philosophy.title()}")
+        print(f"Architecture: {architecture.title()}")
+        print(f"Notepad: {notepad_pref}")
+        print(f"Commit Intelligence: {'Yes' if commit_intel else 'No'}")
+        
+        response = input("\nProceed with installation? (Y/n): ").strip().lower()
+        if response == 'n':
+            self.print_info("Installation cancelled.")
+            return False
+        
+        # Execute installation
+        return self.execute_installation(user_info, preferences)
+    
+    def run_fast_mode(self, project_title: Optional[str] = None):
+        """Run the fast bootstrap mode from self.answers, with defaults for anything not answered."""
+        from specpilot.answers import DEFAULT_ANSWERS
+        print(f"{self.colors['bold']}⚡ Fast Bootstrap Mode{self.colors['reset']}")
+        
+        # Validate environment
+        with self.tracer.span("validate"):
+            valid = self.validate_environment()
+        if not valid:
+            return False
+        
+        answers = dict(DEFAULT_ANSWERS, **self.answers)
+        project_title = project_title or answers.get('title') or self.project_root.name
+        username = answers.get('username') or self.get_git_user()
+        user_info = {
+            'username': username,
+            'project_title': project_title,
+            'project_desc': answers.get('description') or f"A {project_title} project built with SpecPilot framework."
+        }
+        
+        preferences = {
+            'notepad_summary': answers['notepad'],
+            'commit_intelligence': answers['commit_intelligence'],
+            'philosophy': answers['philosophy'],
+            'architecture': answers['architecture']
+        }
+        
+        print(f"Using {'answers' if self.answers else 'defaults'}:")
+        print(f"  Project: {project_title}")
+        print(f"  Username: {username}")
+        print(f"  Philosophy: {answers['philosophy'].title()}")
+        print(f"  Architecture: {answers['architecture'].title()}")
+        
+        # Execute installation
+        return self.execute_installation(user_info, preferences)
+    
+    def run_update_mode(self, args) -> bool:
+        """Run the bootstrap update mode."""
+        print(f"{self.colors['bold']}🔄 Bootstrap Update Mode{self.colors['reset']}")
+        
+        # Finish or discard any swap a previous run did not complete
+        self.recover_interrupted_swap()
+        
+        # Check if SpecPilot is already installed
+        if not self.specpilot_dir.exists():
+            self.print_error("No SpecPilot installation found in this project.")
+            self.print_info("Use 'init' command to install SpecPilot first.")
+            return False
+        
+        archive_layout = self.uses_engine_archive()
+        if not self.engine_dir.exists() and not archive_layout:
+            self.print_error("SpecPilot engine directory not found.")
+            return False
+        if self.source_archive and not archive_layout:
+            self.print_error("This project uses an engine directory; reinstall with "
+                             "'init --force --engine-archive' to switch to an engine archive.")
+            return False
+        patch = getattr(args, 'patch', None)
+        if patch and archive_layout:
+            self.print_error("--patch updates an engine directory; update engine.zip with --engine-archive instead.")
+            return False
+        
+        # Set verbose mode if requested
+        self.verbose = args.verbose
+        
+        # Check version compatibility (a patch chain starts from the installed version by construction)
+        if not patch and not self.check_version_compatibility(getattr(args, 'allow_downgrade', False)):
+            self.print_error("Version compatibility check failed.")
+            return False
+        
+        # Show update plan
+        print(f"\n{self.colors['bold']}📋 Update Plan{self.colors['reset']}")
+        print(f"Project: {self.project_root.name}")
+        print(f"Current Engine: {self.engine_archive if archive_layout else self.engine_dir}")
+        print(f"Source Engine: {patch or self.source_archive or self.framework_root / '.specpilot' / 'engine'}")
+        print(f"Mode: {'DRY RUN' if args.dry_run else 'LIVE UPDATE'}")
+        print(f"Backup Retention: {self.describe_retention(self.retention_policy(args)).capitalize()}")
+        
+        if not args.force:
+            response = input("\nProceed with update? (Y/n): ").strip().lower()
+            if response == 'n':
+                self.print_info("Update cancelled.")
+                return False
+        
+        if archive_layout:
+            return self.run_archive_update(args)
+        if patch:
+            return self.run_patch_update(args)
+        
+        # Compare manifests first so an already-current engine costs no backup or copies
+        with self.tracer.span("plan"):
+            plan = self.plan_engine_update()
+            if plan is not None:
+                self.tracer.count(files=len(plan['source_files']))
+        if plan is None:
+            return False
+        
+        if not (plan['added'] or plan['changed'] or plan['removed']):
+            with self.tracer.span("update", dry_run=args.dry_run):
+                return self.update_engine_files(args.dry_run, plan)
+        
+        # Create backup before update
+        with self.tracer.span("backup"):
+            backup_path = self.create_backup()
+        if not backup_path:
+            self.print_error("Failed to create backup. Update cancelled.")
+            return False
+        
+        # Perform the update
+        with self.tracer.span("update", dry_run=args.dry_run):
+            updated = self.update_engine_files(args.dry_run, plan)
+        if not updated:
+            self.print_error("Update failed. Rolling back...")
+            with self.tracer.span("rollback"):
+                restored = self.rollback_update(backup_path)
+            if restored:
+                self.print_info("Successfully rolled back to previous version.")
+            else:
+                self.print_error("Rollback failed. Manual intervention required.")
+            return False
+        
+        # Cleanup old backups
+        with self.tracer.span("cleanup", keep=args.keep_backups):
+            self.cleanup_old_backups(**self.retention_policy(args))
+        
+        if args.dry_run:
+            self.print_info("🔍 DRY RUN COMPLETE - No changes were made")
+        else:
+            self.print_step("Update", "SpecPilot framework updated successfully!")
+            self.print_info(f"Backup saved at: {backup_path}")
+            self.print_info("Your project workspace and configuration are preserved.")
+        
+        return True
+    
+    def run_rollback_mode(self, args) -> bool:
+        """Run the rollback mode to restore from a backup."""
+        print(f"{self.colors['bold']}⏪ Rollback Mode{self.colors['reset']}")
+        
+        # Finish or discard any swap a previous run did not complete
+        self.recover_interrupted_swap()
+        
+        if not self.backup_dir.exists():
+            self.print_error("No backups found.")
+            return False
+        
+        if getattr(args, 'backup', None):
+            # Look the backup up in the catalog by id, engine version or time
+            from specpilot.backup_store import BackupStore
+            selected_backup = BackupStore(self.backup_dir).find_snapshot(args.backup)
+            if selected_backup is None:
+                self.print_error(f"No backup matches '{args.backup}' (use a backup id, engine version or date/time).")
+                return False
+            self.print_info(f"Selected backup: {self.describe_backup(selected_backup)}")
+            return self.confirm_and_rollback(selected_backup, args)
+        
+        # List available backups (newest first)
+        backups = self.list_backups()
+        
+        if not backups:
+            self.print_error("No engine backups found.")
+            return False
+        
+        print(f"\n{self.colors['bold']}📋 Available Backups{self.colors['reset']}")
+        for i, backup in enumerate(backups):
+            print(f"{i+1}. {self.describe_backup(backup)}")
+        
+        if not args.force:
+            choice = input(f"\nSelect backup to restore (1-{len(backups)}): ").strip()
+            try:
+                choice_idx = int(choice) - 1
+                if 0 <= choice_idx < len(backups):
+                    selected_backup = backups[choice_idx]
+                else:
+                    self.print_error("Invalid selection.")
+                    return False
+            except ValueError:
+                self.print_error("Invalid input. Please enter a number.")
+                return False
+        else:
+            # Use most recent backup
+            selected_backup = backups[0]
+            self.print_info(f"Auto-selected most recent backup: {selected_backup['id']}")
+        
+        return self.confirm_and_rollback(selected_backup, args)
+    
+    def confirm_and_rollback(self, selected_backup: Dict, args) -> bool:
+        """Confirm (unless --force) and restore the selected backup."""
+        if not selected_backup['path'].exists():
+            self.print_error(f"Backup {selected_backup['id']} is in the backup catalog but missing on disk.")
+            return False
+        
+        # Confirm rollback
+        if not args.force:
+            response = input(f"\nRestore from {selected_backup['id']}? This will overwrite current engine. (y/N): ").strip().lower()
+            if response != 'y':
+                self.print_info("Rollback cancelled.")
+                return False
+        
+        # Perform rollback
+        with self.tracer.span("rollback", backup=selected_backup['id']):
+            restored = self.rollback_update(str(selected_backup['path']))
+        if restored:
+            self.print_step("Rollback", "Successfully restored from backup!")
+            return True
+        else:
+            self.print_error("Rollback failed.")
+            return False
+    
+    def run_cleanup_backups_mode(self, args) -> bool:
+        """Run the backup cleanup mode."""
+        print(f"{self.colors['bold']}🧹 Backup Cleanup Mode{self.colors['reset']}")
+        
+        if not self.backup_dir.exists():
+            self.print_info("No backup directory found.")
+            return True
+        
+        # Count current backups
+        backups = self.list_backups()
+        
+        if not backups:
+            self.print_info("No backups to clean up.")
+            return True
+        
+        from specpilot.backup_store import plan_retention
+        from specpilot.instrumentation import format_bytes
+        policy = self.retention_policy(args)
+        doomed = plan_retention(list(reversed(backups)), **policy)
+        print(f"Found {len(backups)} backups ({format_bytes(sum(b.get('size') or 0 for b in backups))}).")
+        print(f"Retention: {self.describe_retention(policy)}")
+        if not doomed:
+            self.print_info("Nothing to remove.")
+            return True
+        for backup in doomed:
+            print(f"  - {self.describe_backup(backup)}")
+        
+        if not args.force:
+            response = input(f"Remove {len(doomed)} old backups? (y/N): ").strip().lower()
+            if response != 'y':
+                self.print_info("Cleanup cancelled.")
+                return True
+        
+        # Perform cleanup
+        with self.tracer.span("cleanup", keep=args.keep_backups):
+            self.cleanup_old_backups(**self.retention_policy(args))
+        
+        # Count remaining backups
+        remaining = self.list_backups()
+        
+        self.print_step("Cleanup", f"Successfully cleaned up backups. {len(remaining)} backups remaining.")
+        return True
+    
+    def run_config_mode(self, args) -> bool:
+        """Show the configuration layers or the resolved effective configuration."""
+        import json
+        from specpilot.config import ConfigResolver
+        action = args.subcommand or 'show'
+        if action != 'show':
+            self.print_error(f"Unknown config action: {action} (expected: show)")
+            return False
+        
+        resolver = ConfigResolver(self.project_root)
+        config = resolver.resolve()
+        
+        if args.resolved or args.json:
+            print(json.dumps(config, indent=2))
+        else:
+            print(f"{self.colors['bold']}⚙️  Configuration for {resolver.username}{self.colors['reset']}")
+            for name, path in resolver.layers:
+                state = "found" if path.exists() else "missing"
+                print(f"  {name:<8} {path.relative_to(self.project_root)} ({state})")
+            print()
+            sources = resolver.sources()
+            for option, value in sorted(resolver.get_all().items()):
+                print(f"  {option:<42} {json.dumps(value):<12} [{sources.get(option, 'default')}]")
+        
+        for error in resolver.errors:
+            print(f"⚠️  {error}", file=sys.stderr)
+        return not resolver.errors
+    
+    @staticmethod
+    def run_fleet_mode(args, hooks: Optional[List] = None, answers: Optional[Dict] = None) -> bool:
+        """Run init/update/rollback across many projects and print a JSON summary."""
+        import argparse
+        import contextlib
+        import json
+        from specpilot.fleet import DeadlineExceeded, default_workers, resolve_targets, run_fleet
+        hooks = hooks or []
+        targets = resolve_targets(args.target_directory)
+        if not targets:
+            print(f"❌ No target directories matched: {args.target_directory}")
+            return False
+        
+        # Hash the source engine once and share it with every worker
+        source_manifest = SpecPilotBootstrap().load_source_manifest()
+        workers = args.workers or default_workers()
+        target_args = argparse.Namespace(**vars(args))
+        target_args.force = True
+        target_args.verbose = False
+        
+        spans = []
+        
+        def run_target(target: Path, deadline: Optional[float]) -> Dict:
+            bootstrap = SpecPilotBootstrap(str(target))
+            bootstrap.force = True
+            bootstrap.deadline = deadline
+            bootstrap.source_manifest = source_manifest
+            bootstrap.answers = dict(answers or {})
+            bootstrap.source_archive = args.engine_archive
+            # Every target's tracer feeds the same sink and collectors
+            if hooks or args.profile:
+                bootstrap.start_tracing(hooks)
+            # An init that times out must not leave a half-installed project behind
+            existing = set(os.listdir(target)) if args.fleet_action == 'init' else None
+            
+            try:
+                with bootstrap.tracer.span(args.fleet_action) as span:
+                    if args.fleet_action == 'update':
+                        success = bootstrap.run_update_mode(target_args)
+                    elif args.fleet_action == 'rollback':
+                        success = bootstrap.run_rollback_mode(target_args)
+                    else:
+                        success = bootstrap.run_fast_mode(args.title or bootstrap.answers.get('title') or target.name)
+                    if not success:
+                        span.status = "failed"
+            except DeadlineExceeded:
+                if existing is not None:
+                    import shutil
+                    for name in set(os.listdir(target)) - existing:
+                        path = target / name
+                        if path.is_dir() and not path.is_symlink():
+                            shutil.rmtree(path, ignore_errors=True)
+                        else:
+                            path.unlink(missing_ok=True)
+                raise
+            finally:
+                spans.extend(bootstrap.tracer.spans)
+            
+            result = {
+                'status': 'ok' if success else 'failed',
+                'files_copied': bootstrap.files_copied
+            }
+            if bootstrap.errors:
+                result['error'] = bootstrap.errors[-1]
+            return result
+        
+        # Per-target progress output would interleave across threads; only the summary is printed
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            summary = run_fleet(targets, run_target, workers, args.timeout)
+        summary['action'] = args.fleet_action
+        
+        if not args.quiet:
+            print(json.dumps(summary, indent=2))
+        if args.profile:
+            from specpilot.instrumentation import summarize_phases
+            print(summarize_phases(spans), end="", file=sys.stderr if args.quiet else sys.stdout)
+        return all(result['status'] == 'ok' for result in summary['results'])
+    
+    @staticmethod
+    def run_package_mode(args) -> bool:
+        """Package the framework's engine as a single versioned, checksummed archive."""
+        from specpilot.engine_archive import ArchiveError, build_archive, read_checksum
+        output = Path(args.target_directory)
+        if output.is_dir():
+            output = output / "specpilot-engine.zip"
+        bootstrap = SpecPilotBootstrap()
+        source_engine = bootstrap.framework_root / ".specpilot" / "engine"
+        try:
+            index = build_archive(source_engine, output, args.compression, files=bootstrap.load_source_manifest())
+        except (ArchiveError, OSError) as e:
+            print(f"❌ Packaging failed: {e}", file=sys.stderr)
+            return False
+        if not args.quiet:
+            print(f"📦 {output}: engine {index['version']}, {len(index['files'])} files, "
+                  f"{output.stat().st_size} bytes ({args.compression}), sha256 {read_checksum(output)}")
+        return True
+    
+    @staticmethod
+    def run_batch_mode(args, hooks: Optional[List] = None, answers: Optional[Dict] = None) -> bool:
+        """Provision one project per NDJSON line from a file or stdin, printing one JSON result per line."""
+        import contextlib
+        import json
+        from specpilot.answers import iter_batch
+        stream = sys.stdin if args.target_directory == '-' else open(args.target_directory, "r", encoding="utf-8")
+        # Hash the source engine once; every project in the batch reuses it
+        source_manifest = SpecPilotBootstrap().load_source_manifest()
+        # --title and --answers are defaults here; each line overrides them for its project
+        base = dict(answers or {}, **({'title': args.title} if args.title else {}))
+        results = sys.stdout
+        spans = []
+        all_ok = True
+        
+        with stream:
+            for line_number, record, error in iter_batch(stream):
+                start = time.perf_counter()
+                result = {'line': line_number}
+                if error:
+                    result.update({'status': 'invalid', 'errors': [error]})
+                else:
+                    target = Path(record.pop('target')).expanduser().resolve()
+                    bootstrap = SpecPilotBootstrap(str(target))
+                    bootstrap.force = record.pop('force', args.force)
+                    bootstrap.quiet = True
+                    bootstrap.source_manifest = source_manifest
+                    bootstrap.answers = dict(base, **record)
+                    bootstrap.source_archive = args.engine_archive
+                    if hooks or args.profile:
+                        bootstrap.start_tracing(hooks)
+                    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                        if not target.is_dir():
+                            bootstrap.errors.append(f"Target directory does not exist: {target}")
+                            success = False
+                        else:
+                            with bootstrap.tracer.span('init') as span:
+                                success = bootstrap.run_fast_mode()
+                                if not success:
+                                    span.status = "failed"
+                    spans.extend(bootstrap.tracer.spans)
+                    result.update({
+                        'target': str(target),
+                        'status': 'ok' if success else 'failed',
+                        'files_copied': bootstrap.files_copied,
+                        'errors': bootstrap.errors
+                    })
+                result['duration_ms'] = round((time.perf_counter() - start) * 1000, 1)
+                all_ok = all_ok and result['status'] == 'ok'
+                # One line per request, flushed so a driving process can stream results
+                results.write(json.dumps(result) + "\n")
+                results.flush()
+        
+        if args.profile:
+            from specpilot.instrumentation import summarize_phases
+            print(summarize_phases(spans), end="", file=sys.stderr)
+        return all_ok
+    
+    def execute_installation(self, user_info: Dict[str, str], preferences: Dict) -> bool:
+        """Execute the complete installation process."""
+        from specpilot.fleet import DeadlineExceeded
+        try:
+            # Create directory structure
+            with self.tracer.span("directories"):
+                self.create_directory_structure()
+            
+            # Copy framework files
+            self.check_deadline()
+            with self.tracer.span("copy"):
+                copied = self.copy_framework_files()
+            if not copied:
+                return False
+            self.check_deadline()
+            
+            with self.tracer.span("config"):
+                # Create user workspace
+                user_workspace = self.create_user_workspace(user_info['username'])
+                
+                # Create configuration files
+                self.create_config_files(user_workspace, user_info['username'], preferences)
+            
+            with self.tracer.span("templates"):
+                # Create documentation templates
+                self.create_documentation_templates(
+                    user_info['project_title'],
+                    user_info['project_desc'],
+                    preferences.get('philosophy', 'scalable'),    # Default for fast mode
+                    preferences.get('architecture', 'scalable')   # Default for fast mode
+                )
+                
+                # Create notepad
+                self.create_notepad(user_workspace)
+            self.check_deadline()
+            
+            # Create project files
+            with self.tracer.span("project_files"):
+                self.create_gitignore()
+                self.create_requirements_txt()
+            
+            # Success message
+            print(f"\n{self.colors['bold']}{self.colors['green']}🎉 SpecPilot installation complete!{self.colors['reset']}")
+            print(f"\nNext steps:")
+            print(f"1. Open Cursor IDE in this project")
+            print(f"2. Create a new mode with SpecPilot instructions")
+            print(f"3. Say 'Enter Pilot Mode' to begin guided development")
+            print(f"\nYour workspace is ready at: .specpilot/workspace/{user_info['username']}/")
+            print(f"\nOptional: Run 'git init' if you want version control for this project")
+            
+            return True
+            
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            self.print_error(f"Installation failed: {str(e)}")
+            return False
+    
+    @staticmethod
+    def run():
+        """Main entry point for the bootstrap script."""
+        import argparse
+        parser = argparse.ArgumentParser(
+            description="SpecPilot Framework Bootstrap Script",
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            epilog="""
+Examples:
+  python3 bootstrap.py /path/to/project                    # Interactive mode
+  python3 bootstrap.py /path/to/project --fast --title "My Project"  # Fast mode
+  python3 bootstrap.py /path/to/project init               # Interactive mode (explicit)
+  python3 bootstrap.py /path/to/project update             # Update framework
+  python3 bootstrap.py /path/to/project update --dry-run   # Simulate update
+  python3 bootstrap.py /path/to/project update --verbose   # Verbose update
+  python3 bootstrap.py /path/to/project rollback           # Rollback to backup
+  python3 bootstrap.py /path/to/project cleanup-backups    # Clean old backups
+  python3 bootstrap.py /path/to/project rollback --force --backup 1.2.0   # Restore the newest 1.2.0 backup
+  python3 bootstrap.py /path/to/project cleanup-backups --keep-daily 7 --keep-weekly 4 --max-backup-bytes 500M
+  python3 bootstrap.py /path/to/project config show --resolved   # Print the effective config
+  python3 bootstrap.py "projects/*" fleet --fleet-action update --workers 8   # Update many projects
+  python3 bootstrap.py targets.txt fleet --fleet-action init --timeout 60     # Install into a list of projects
+  python3 bootstrap.py /path/to/project --fast --title "My Project" --json   # CI: no banner, JSON result
+  python3 bootstrap.py /path/to/project update --force --profile             # Per-phase timing table
+  python3 bootstrap.py /path/to/project --answers answers.json               # Non-interactive install
+  python3 bootstrap.py - batch < projects.ndjson                             # One install per NDJSON line
+  python3 bootstrap.py dist/engine.zip package                               # Package the engine as one archive
+  python3 bootstrap.py /path/to/project --fast --title "My Project" --engine-archive dist/engine.zip
+  python3 bootstrap.py "projects/*" fleet --trace spans.jsonl                # Timed spans as JSON Lines
+  python3 bootstrap.py /path/to/project update --force --patch dist/patches/  # Apply engine delta patches
+
+Note: The target directory does not need to be a Git repository.
+SpecPilot will work in any writable directory.
+            """
+        )
+        
+        parser.add_argument(
+            'target_directory',
+            type=str,
+            help='Target directory where SpecPilot should be installed '
+                 '(for fleet: a file listing directories, or a glob pattern; for batch: an NDJSON file, or - for stdin; '
+                 'for package: the archive to write)'
+        )
+        
+        parser.add_argument(
+            'command',
+            nargs='?',
+            default='init',
+            choices=['init', 'update', 'rollback', 'cleanup-backups', 'fleet', 'batch', 'config', 'package'],
+            help='Bootstrap command (init, update, rollback, cleanup-backups, fleet, batch, config, package, '
+                 'optional, defaults to init)'
+        )
+        
+        parser.add_argument(
+            'subcommand',
+            nargs='?',
+            help='Action for the config command (show, the default)'
+        )
+        
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help='Run in fast mode (non-interactive)'
+        )
+        
+        parser.add_argument(
+            '--title',
+            type=str,
+            help='Project title for fast mode'
+        )
+        
+        parser.add_argument(
+            '--answers',
+            metavar='FILE',
+            help='Install non-interactively from a JSON or YAML answers file (implies --fast)'
+        )
+        
+        parser.add_argument(
+            '--verbose',
+            action='store_true',
+            help='Enable verbose output for update operations'
+        )
+        
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Simulate update without making changes (update mode only)'
+        )
+        
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Skip confirmation prompts (use with caution)'
+        )
+        
+        parser.add_argument(
+            '--allow-downgrade',
+            action='store_true',
+            help='Let update install an older engine version than the installed one'
+        )
+        
+        parser.add_argument(
+            '--keep-backups',
+            type=int,
+            default=3,
+            help='Number of backups to keep (default: 3)'
+        )
+        
+        parser.add_argument(
+            '--keep-daily',
+            type=int,
+            default=0,
+            metavar='N',
+            help='Also keep the newest backup of each of the last N days with backups'
+        )
+        
+        parser.add_argument(
+            '--keep-weekly',
+            type=int,
+            default=0,
+            metavar='N',
+            help='Also keep the newest backup of each of the last N weeks with backups'
+        )
+        
+        parser.add_argument(
+            '--max-backup-bytes',
+            type=parse_size,
+            metavar='SIZE',
+            help='Drop the oldest kept backups beyond this total engine size, e.g. 500M (the newest is always kept)'
+        )
+        
+        parser.add_argument(
+            '--backup',
+            metavar='SELECTOR',
+            help='rollback: restore this backup: an id, an engine version or a date/time (newest at or before it)'
+        )
+        
+        parser.add_argument(
+            '--resolved',
+            action='store_true',
+            help='config show: print the merged effective configuration as JSON'
+        )
+        
+        parser.add_argument(
+            '--quiet',
+            action='store_true',
+            help='No banner or progress output; errors go to stderr (non-interactive commands only)'
+        )
+        
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Like --quiet, but print a JSON result (status, files copied, errors, duration)'
+        )
+        
+        parser.add_argument(
+            '--engine-archive',
+            metavar='ZIP',
+            help='init/update: install the engine as .specpilot/engine.zip from this packaged archive'
+        )
+        
+        parser.add_argument(
+            '--patch',
+            metavar='PATH',
+            help='update: apply this engine delta patch, or the shortest patch chain in this directory'
+        )
+        
+        parser.add_argument(
+            '--compression',
+            choices=['stored', 'deflate', 'zstd'],
+            default='stored',
+            help='package: member compression (default: stored, readable in place; zstd needs zstandard)'
+        )
+        
+        parser.add_argument(
+            '--trace',
+            metavar='PATH',
+            help='Append a JSON Lines record per timed phase to PATH ("-" for stdout)'
+        )
+        
+        parser.add_argument(
+            '--trace-hook',
+            action='append',
+            metavar='MODULE:FUNCTION',
+            help='Also pass every timed phase to this callable (repeatable)'
+        )
+        
+        parser.add_argument(
+            '--profile',
+            action='store_true',
+            help='Print a per-phase timing table when done (to stderr with --quiet/--json)'
+        )
+        
+        parser.add_argument(
+            '--fleet-action',
+            choices=['init', 'update', 'rollback'],
+            default='update',
+            help='Command to run on every fleet target (default: update; init runs in fast mode)'
+        )
+        
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of parallel fleet workers (default: min(8, 2 x CPUs))'
+        )
+        
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            help='Per-target timeout in seconds for fleet mode'
+        )
+        
+        args = parser.parse_args()
+        start = time.perf_counter()
+        
+        hooks = []
+        if args.trace or args.trace_hook:
+            from specpilot.instrumentation import build_hooks
+            try:
+                hooks = build_hooks(args.trace, args.trace_hook)
+            except (ImportError, AttributeError, OSError, ValueError) as e:
+                print(f"❌ Could not set up tracing: {e}", file=sys.stderr)
+                sys.exit(2)
+        
+        # Fast mode, fleet init and batch take their inputs from SPECPILOT_* variables and --answers
+        answers = {}
+        if args.fast or args.answers or args.command in ('fleet', 'batch'):
+            from specpilot.answers import AnswerError, resolve_answers
+            try:
+                answers = resolve_answers(args.answers)
+            except AnswerError as e:
+                print(f"❌ {e}", file=sys.stderr)
+                sys.exit(2)
+        
+        if args.command == 'package':
+            sys.exit(0 if SpecPilotBootstrap.run_package_mode(args) else 1)
+        
+        if args.engine_archive:
+            args.engine_archive = str(Path(args.engine_archive).resolve())
+        if args.patch:
+            args.patch = str(Path(args.patch).resolve())
+        
+        if args.command == 'fleet':
+            sys.exit(0 if SpecPilotBootstrap.run_fleet_mode(args, hooks, answers) else 1)
+        
+        if args.command == 'batch':
+            try:
+                sys.exit(0 if SpecPilotBootstrap.run_batch_mode(args, hooks, answers) else 1)
+            except OSError as e:
+                print(f"❌ Cannot read batch input: {e}", file=sys.stderr)
+                sys.exit(1)
+        
+        # Validate target directory
+        target_path = Path(args.target_directory).resolve()
+        if not target_path.exists():
+            print(f"❌ Target directory does not exist: {target_path}", file=sys.stderr)
+            sys.exit(1)
+        
+        if not target_path.is_dir():
+            print(f"❌ Target must be a directory: {target_path}", file=sys.stderr)
+            sys.exit(1)
+        
+        args.fast = args.fast or bool(args.answers)
+        if args.command == 'init' and args.fast and not (args.title or answers.get('title')):
+            print("❌ --title (or a title in --answers or SPECPILOT_TITLE) is required for fast mode", file=sys.stderr)
+            sys.exit(1)
+        
+        # Initialize bootstrap with target directory
+        bootstrap = SpecPilotBootstrap(str(target_path))
+        bootstrap.force = args.force
+        bootstrap.quiet = args.quiet or args.json
+        if hooks or args.profile:
+            bootstrap.start_tracing(hooks)
+        bootstrap.answers = answers
+        bootstrap.source_archive = args.engine_archive
+        
+        # Config output is meant to be read (or piped), so it skips the banner
+        if args.command == 'config':
+            sys.exit(0 if bootstrap.run_config_mode(args) else 1)
+        
+        if not bootstrap.quiet:
+            bootstrap.print_banner()
+            success = bootstrap.run_command(args)
+        else:
+            # Prompts would be invisible with progress output muted
+            interactive = (not args.fast) if args.command == 'init' else not args.force
+            if interactive:
+                print(f"❌ --quiet/--json need a non-interactive run: use "
+                      f"{'--fast' if args.command == 'init' else '--force'}", file=sys.stderr)
+                sys.exit(2)
+            import contextlib
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                success = bootstrap.run_command(args)
+            if args.json:
+                import json
+                print(json.dumps({
+                    'command': args.command,
+                    'target': str(target_path),
+                    'status': 'ok' if success else 'failed',
+                    'files_copied': bootstrap.files_copied,
+                    'errors': bootstrap.errors,
+                    'duration_ms': round((time.perf_counter() - start) * 1000, 1)
+                }, indent=2))
+            else:
+                for error in bootstrap.errors:
+                    print(f"❌ {error}", file=sys.stderr)
+        
+        if args.profile:
+            from specpilot.instrumentation import render_profile
+            print("\n" + render_profile(bootstrap.tracer.spans), end="",
+                  file=sys.stderr if bootstrap.quiet else sys.stdout)
+        
+        if not success:
+            sys.exit(1)
+    
+    def run_command(self, args) -> bool:
+        """Route a parsed command line to its mode, timed as one root span."""
+        with self.tracer.span(args.command) as span:
+            if args.command == 'update':
+                success = self.run_update_mode(args)
+            elif args.command == 'rollback':
+                success = self.run_rollback_mode(args)
+            elif args.command == 'cleanup-backups':
+                success = self.run_cleanup_backups_mode(args)
+            elif args.fast:
+                success = self.run_fast_mode(args.title)
+            else:
+                success = self.run_interactive_mode()
+            if not success:
+                span.status = "failed"
+        return success
+
+
+if __name__ == "__main__":
+    SpecPilotBootstrap.run() 
\ No newline at end of file
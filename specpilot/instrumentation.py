@@ -0,0 +1,216 @@
+"""
+SpecPilot Instrumentation
+
+Timed spans for the phases of an install, update or rollback, so the time a
+fleet spends per project can be broken down instead of read off coloured
+progress text.
+
+    tracer = Tracer(target="/path/to/project")
+    with tracer.span("copy"):
+        ...
+        tracer.count(files=41, bytes=183204)   # adds to the innermost open span
+
+Every finished span is passed to each hook as a dict:
+
+    {"type": "span", "id": 2, "parent_id": 1, "name": "copy", "parent": "init", "target": "...",
+     "start": 1767225600.123, "duration_ms": 12.4, "status": "ok" | "failed" | "error",
+     "files": 41, "bytes": 183204, "attrs": {...}}
+
+"error" means the phase raised; "failed" is set by the caller (span.status)
+when it returned unsuccessfully. Ids are unique per tracer.
+
+Hooks are plain callables. JsonLinesSink writes one JSON object per line to
+a file or stdout; any other collector can be attached with Tracer.add_hook()
+or, from the command line, with --trace-hook module:function. A failing hook
+is disabled with a warning instead of failing the install.
+
+render_profile() turns the recorded spans into a per-phase timing table
+(--profile); summarize_phases() aggregates them across fleet targets.
+"""
+
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+Hook = Callable[[Dict], None]
+
+
+class JsonLinesSink:
+    """Hook that writes spans as JSON Lines to a path, or to stdout for "-"."""
+
+    def __init__(self, destination: str):
+        import threading
+        self._lock = threading.Lock()
+        if destination == "-":
+            # Bound now, so spans still reach stdout when progress output is muted later
+            self._stream = sys.stdout
+            self._owned = False
+        else:
+            self._stream = open(destination, "a", encoding="utf-8")
+            self._owned = True
+
+    def __call__(self, span: Dict):
+        import json
+        line = json.dumps(span, separators=(",", ":"), ensure_ascii=False) + "\n"
+        with self._lock:
+            self._stream.write(line)
+            self._stream.flush()
+
+    def close(self):
+        if self._owned:
+            self._stream.close()
+
+
+def build_hooks(trace: Optional[str] = None, hook_specs: Optional[List[str]] = None) -> List[Hook]:
+    """Hooks for the --trace destination and each --trace-hook."""
+    hooks = [JsonLinesSink(trace)] if trace else []
+    hooks.extend(load_hook(spec) for spec in hook_specs or [])
+    return hooks
+
+
+def load_hook(spec: str) -> Hook:
+    """Import a hook given as "package.module:function"."""
+    import importlib
+    module_name, _, attribute = spec.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"Trace hook must look like module:function (got {spec!r})")
+    hook = getattr(importlib.import_module(module_name), attribute)
+    if not callable(hook):
+        raise ValueError(f"Trace hook {spec} is not callable")
+    return hook
+
+
+class _Span:
+    """An open span; becomes a dict when it finishes."""
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.files = 0
+        self.bytes = 0
+        self.parent = None
+        self.id = None
+        self.status = "ok"
+
+    def __enter__(self) -> "_Span":
+        self.parent = self.tracer._stack[-1] if self.tracer._stack else None
+        self.tracer._next_id += 1
+        self.id = self.tracer._next_id
+        self.tracer._stack.append(self)
+        self.start = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        self.tracer._stack.pop()
+        record = {
+            "type": "span",
+            "id": self.id,
+            "parent_id": self.parent.id if self.parent else None,
+            "name": self.name,
+            "parent": self.parent.name if self.parent else None,
+            "target": self.tracer.target,
+            "start": round(self.start, 6),
+            "duration_ms": round(duration_ms, 3),
+            "status": "error" if exc_type else self.status,
+            "files": self.files,
+            "bytes": self.bytes,
+            "attrs": self.attrs
+        }
+        if exc_type:
+            record["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer._finish(record)
+        return False
+
+
+class Tracer:
+    """Records spans for one target and forwards each finished span to the hooks."""
+
+    def __init__(self, target: Optional[str] = None, hooks: Optional[List[Hook]] = None):
+        self.target = target
+        self.hooks = list(hooks or [])
+        self.spans: List[Dict] = []
+        self._stack: List[_Span] = []
+        self._next_id = 0
+
+    def add_hook(self, hook: Hook):
+        """Forward every span finished from now on to hook(span_dict)."""
+        self.hooks.append(hook)
+
+    def span(self, name: str, **attrs) -> _Span:
+        """Context manager timing one phase; nested spans record their parent."""
+        return _Span(self, name, attrs)
+
+    def count(self, files: int = 0, bytes: int = 0):
+        """Add to the file and byte counters of the innermost open span (no-op outside a span)."""
+        if self._stack:
+            self._stack[-1].files += files
+            self._stack[-1].bytes += bytes
+
+    def _finish(self, record: Dict):
+        self.spans.append(record)
+        for hook in list(self.hooks):
+            try:
+                hook(record)
+            except Exception as e:
+                self.hooks.remove(hook)
+                print(f"⚠️  Trace hook {getattr(hook, '__name__', hook)!s} disabled: {e}", file=sys.stderr)
+
+
+def format_bytes(count: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if count < 1024 or unit == "GB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+
+def render_profile(spans: List[Dict]) -> str:
+    """Per-phase timing table; nested phases are indented under their parent."""
+    if not spans:
+        return "No timed phases recorded.\n"
+    roots = [span for span in spans if span["parent_id"] is None]
+    total_ms = sum(span["duration_ms"] for span in roots) or 1.0
+    children: Dict[int, List[Dict]] = {}
+    for span in spans:
+        children.setdefault(span["parent_id"], []).append(span)
+
+    lines = [f"{'phase':<28} {'ms':>10} {'%':>6} {'files':>7} {'bytes':>10}  status"]
+
+    def add(span: Dict, depth: int):
+        name = "  " * depth + span["name"]
+        lines.append(f"{name:<28} {span['duration_ms']:>10.1f} {span['duration_ms'] / total_ms * 100:>5.1f}% "
+                     f"{span['files']:>7} {format_bytes(span['bytes']):>10}  {span['status']}")
+        # Spans finish child-first, so order children by start time
+        for child in sorted(children.get(span["id"], []), key=lambda s: s["start"]):
+            add(child, depth + 1)
+
+    for root in sorted(roots, key=lambda s: s["start"]):
+        add(root, 0)
+    return "\n".join(lines) + "\n"
+
+
+def summarize_phases(spans: List[Dict]) -> str:
+    """Per-phase totals over many targets: count, total/mean/max ms, files and bytes."""
+    if not spans:
+        return "No timed phases recorded.\n"
+    phases: Dict[str, Dict] = {}
+    for span in spans:
+        phase = phases.setdefault(span["name"], {"count": 0, "total": 0.0, "max": 0.0, "files": 0,
+                                                 "bytes": 0, "errors": 0})
+        phase["count"] += 1
+        phase["total"] += span["duration_ms"]
+        phase["max"] = max(phase["max"], span["duration_ms"])
+        phase["files"] += span["files"]
+        phase["bytes"] += span["bytes"]
+        phase["errors"] += span["status"] != "ok"
+
+    lines = [f"{'phase':<16} {'count':>6} {'total ms':>11} {'mean ms':>9} {'max ms':>9} "
+             f"{'files':>8} {'bytes':>10} {'errors':>7}"]
+    for name, phase in sorted(phases.items(), key=lambda item: -item[1]["total"]):
+        lines.append(f"{name:<16} {phase['count']:>6} {phase['total']:>11.1f} {phase['total'] / phase['count']:>9.1f} "
+                     f"{phase['max']:>9.1f} {phase['files']:>8} {format_bytes(phase['bytes']):>10} "
+                     f"{phase['errors']:>7}")
+    return "\n".join(lines) + "\n"
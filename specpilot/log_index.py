@@ -0,0 +1,350 @@
+"""
+SpecPilot Log Parser and Offset Index
+
+Streaming parser for specpilot.log / specpilot_verbose.log and a sidecar
+index that turns "find the last [GIT_COMMIT_SUCCESS]" or "events since the
+last commit" into a seek plus a tail read.
+
+Event lines follow the Log Helper format; older entries without the user
+field are accepted too:
+    YYYY-MM-DD HH:MM:SS - user - emoji - [EVENT] - message
+    YYYY-MM-DD HH:MM:SS - emoji - [EVENT] - message
+
+Any following lines that are not themselves event lines (for example the
+fenced USER/CURSOR sections of a TRANSCRIPT_BATCH) form the event's body.
+
+The index is stored next to the log as ``<log>.idx`` (JSON) and holds:
+    - byte offsets of every event, grouped by event type
+    - a sparse timeline of (offset, latest timestamp seen before offset)
+    - the offset up to which the log has been indexed, so refreshes only
+      parse newly appended bytes
+
+The index covers the live log only. The CLI queries go through
+log_rotation.LogRotator, which answers from this index first and falls back
+to the rotated segments (newest first) when the live log has no match;
+``stats`` counts the live log.
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+EVENT_LINE = re.compile(
+    rb"^(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - (?P<head>.*?) - \[(?P<event>[^\]]+)\](?: - (?P<message>.*))?$"
+)
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+TIMELINE_STRIDE = 256
+FINGERPRINT_BYTES = 256
+
+
+class LogEvent(NamedTuple):
+    """One parsed log event and its byte position in the file."""
+    offset: int
+    timestamp: str
+    user: Optional[str]
+    emoji: str
+    event_type: str
+    message: str
+    body: str
+
+
+def parse_event_line(line: bytes) -> Optional[Dict[str, Optional[str]]]:
+    """Parse an event header line, or return None for body/continuation lines."""
+    match = EVENT_LINE.match(line.rstrip(b"\r\n"))
+    if not match:
+        return None
+    head = match.group("head").decode("utf-8", "replace").split(" - ")
+    user, emoji = (head[0], head[-1]) if len(head) > 1 else (None, head[0])
+    return {
+        'timestamp': match.group("ts").decode("ascii"),
+        'user': user,
+        'emoji': emoji,
+        'event_type': match.group("event").decode("utf-8", "replace"),
+        'message': (match.group("message") or b"").decode("utf-8", "replace")
+    }
+
+
+def iter_events(path: Path, start: int = 0, end: Optional[int] = None,
+                include_body: bool = True) -> Iterator[LogEvent]:
+    """
+    Yield events from path starting at byte offset start (which must be a line start).
+
+    Memory use is bounded by a single event's body; with include_body=False
+    bodies are skipped entirely and memory stays constant. A missing log (a
+    fresh workspace, or just after rotation) has no events.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        f.seek(start)
+        yield from iter_stream_events(f, start, end, include_body)
+
+
+def iter_stream_events(stream: BinaryIO, offset: int = 0, end: Optional[int] = None,
+                       include_body: bool = True) -> Iterator[LogEvent]:
+    """Yield events from an open binary stream (e.g. a decompressing reader) positioned at offset."""
+    current = None
+    body = []
+    for line in stream:
+        if end is not None and offset >= end:
+            break
+        header = parse_event_line(line)
+        if header is not None:
+            if current is not None:
+                yield LogEvent(body="".join(body), **current)
+            current = dict(header, offset=offset)
+            body = []
+        elif current is not None and include_body:
+            body.append(line.decode("utf-8", "replace"))
+        offset += len(line)
+    if current is not None:
+        yield LogEvent(body="".join(body), **current)
+
+
+def last_line_end(path: Path, start: int, size: int) -> int:
+    """Return the offset just past the last newline in path[start:size], or start if there is none."""
+    with open(path, "rb") as f:
+        position = size
+        while position > start:
+            step = min(4096, position - start)
+            f.seek(position - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                return position - step + newline + 1
+            position -= step
+    return start
+
+
+def fingerprint(path: Path, length: int) -> str:
+    """Hash the first bytes of a log to detect that it was replaced or rewritten."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read(min(length, FINGERPRINT_BYTES))).hexdigest()
+
+
+class LogIndex:
+    """Sidecar offset index for one log file."""
+
+    def __init__(self, log_path: Path):
+        self.log_path = Path(log_path)
+        self.index_path = self.log_path.with_name(self.log_path.name + INDEX_SUFFIX)
+        self.data = self._empty()
+
+    def _empty(self) -> Dict:
+        return {
+            'version': INDEX_VERSION,
+            'fingerprint': None,
+            'indexed_to': 0,
+            'event_count': 0,
+            'max_timestamp': "",
+            'events': {},
+            'timeline': []
+        }
+
+    def load(self):
+        """Load the stored index, starting fresh if it is missing or from another version."""
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self.data = data
+                return
+        except (OSError, ValueError):
+            pass
+        self.data = self._empty()
+
+    def save(self):
+        """Atomically write the index next to the log."""
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+    def refresh(self) -> "LogIndex":
+        """Bring the index up to date, parsing only bytes appended since the last refresh."""
+        self.load()
+        if not self.log_path.exists():
+            self.data = self._empty()
+            return self
+
+        size = self.log_path.stat().st_size
+        # An append-only log never shrinks and never changes the prefix that was already indexed
+        indexed_to = self.data['indexed_to']
+        if size < indexed_to or (indexed_to and fingerprint(self.log_path, indexed_to) != self.data['fingerprint']):
+            self.data = self._empty()
+        if size == self.data['indexed_to']:
+            return self
+
+        # Only index up to the last complete line; a partial trailing write is picked up next time
+        end = last_line_end(self.log_path, self.data['indexed_to'], size)
+        events = self.data['events']
+        count = self.data['event_count']
+        max_timestamp = self.data['max_timestamp']
+        for event in iter_events(self.log_path, self.data['indexed_to'], end, include_body=False):
+            if count % TIMELINE_STRIDE == 0:
+                self.data['timeline'].append([event.offset, max_timestamp])
+            events.setdefault(event.event_type, []).append(event.offset)
+            if event.timestamp > max_timestamp:
+                max_timestamp = event.timestamp
+            count += 1
+
+        self.data.update(fingerprint=fingerprint(self.log_path, end), indexed_to=end,
+                         event_count=count, max_timestamp=max_timestamp)
+        self.save()
+        return self
+
+    def offsets(self, event_type: str) -> List[int]:
+        """Byte offsets of every event of a type, in file order."""
+        return self.data['events'].get(event_type, [])
+
+    def event_at(self, offset: int) -> Optional[LogEvent]:
+        """Read the single event starting at offset."""
+        return next(iter_events(self.log_path, offset), None)
+
+    def last(self, event_type: str) -> Optional[LogEvent]:
+        """Return the most recent event of a type without scanning the log."""
+        offsets = self.offsets(event_type)
+        return self.event_at(offsets[-1]) if offsets else None
+
+    def events_from(self, offset: int, include_body: bool = True) -> Iterator[LogEvent]:
+        """Stream events from an offset to the end of the log."""
+        return iter_events(self.log_path, offset, include_body=include_body)
+
+    def events_after_last(self, event_type: str, include_body: bool = True) -> Iterator[LogEvent]:
+        """Stream events after the most recent event of a type (the whole log if there is none)."""
+        offsets = self.offsets(event_type)
+        if not offsets:
+            return self.events_from(0, include_body)
+        events = self.events_from(offsets[-1], include_body)
+        next(events, None)
+        return events
+
+    def events_since(self, timestamp: str, include_body: bool = True) -> Iterator[LogEvent]:
+        """
+        Stream events with a timestamp >= the given 'YYYY-MM-DD HH:MM:SS'.
+
+        Timestamps in real logs are not strictly ordered, so the seek uses the
+        latest timestamp seen before each timeline checkpoint: everything before
+        the chosen checkpoint is guaranteed to be older than the requested time.
+        """
+        timeline = self.data['timeline']
+        seen_before = [entry[1] for entry in timeline]
+        position = bisect.bisect_left(seen_before, timestamp)
+        start = timeline[position - 1][0] if position > 0 else 0
+        return (event for event in iter_events(self.log_path, start, include_body=include_body)
+                if event.timestamp >= timestamp)
+
+
+def logs_dir_for(project_root: Path, username: Optional[str] = None) -> Path:
+    """Return a user's logs directory, reading the username from .specpilot.local if needed."""
+    if not username:
+        from specpilot.logging import resolve_username
+        username = resolve_username(project_root)
+    return Path(project_root) / ".specpilot" / "workspace" / username / "logs"
+
+
+def format_event(event: LogEvent) -> str:
+    """Render an event back in log format."""
+    user = f"{event.user} - " if event.user else ""
+    return f"{event.timestamp} - {user}{event.emoji} - [{event.event_type}] - {event.message}\n{event.body}"
+
+
+def query_store(store, args) -> int:
+    """Answer a milestone query from the workspace event store (indexed SQL instead of the offset index)."""
+    if args.action == 'last':
+        event = store.last(args.event_type)
+        if event is None:
+            return 1
+        events = [event]
+    elif args.action == 'after-last':
+        events = store.events_after_last(args.event_type)
+    elif args.action == 'since':
+        events = store.events(since=args.timestamp)
+    elif args.action == 'since-last-commit':
+        events = store.events_after_last("GIT_COMMIT_SUCCESS")
+    else:
+        counts = store.counts_by_type()
+        print(json.dumps({'events': sum(counts.values()), 'by_type': counts}, indent=2, sort_keys=True))
+        return 0
+    for event in events:
+        sys.stdout.write(format_event(event))
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point used by Commit Mode and Session Check."""
+    parser = argparse.ArgumentParser(description="Query SpecPilot logs through the offset index")
+    parser.add_argument('--project', default='.', help='Project root (default: current directory)')
+    parser.add_argument('--user', help='Username (default: from .specpilot.local)')
+    parser.add_argument('--log', choices=['milestone', 'verbose'], default='milestone',
+                        help='Which log to query (default: milestone)')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+
+    last = subparsers.add_parser('last', help='Print the most recent event of a type')
+    last.add_argument('event_type')
+
+    after = subparsers.add_parser('after-last', help='Print events after the most recent event of a type')
+    after.add_argument('event_type')
+
+    since = subparsers.add_parser('since', help='Print events at or after a timestamp')
+    since.add_argument('timestamp', help="'YYYY-MM-DD HH:MM:SS'")
+
+    subparsers.add_parser('since-last-commit',
+                          help='Print events logged after the last [GIT_COMMIT_SUCCESS] in the milestone log')
+    subparsers.add_parser('stats', help='Print event counts by type')
+
+    args = parser.parse_args(argv)
+    logs_dir = logs_dir_for(Path(args.project), args.user)
+    from specpilot.event_store import open_store
+    store = open_store(logs_dir)
+    if store is not None:
+        try:
+            if args.log == 'milestone':
+                return query_store(store, args)
+            # The verbose log is a rendered export in the sqlite backend; bring it up to date first
+            store.export()
+        finally:
+            store.close()
+    # Rotated segments are part of the history, so queries read through the
+    # rotator; it answers from the live log's index whenever it can
+    from specpilot.log_rotation import LogRotator
+    log_name = "specpilot.log" if args.log == 'milestone' else "specpilot_verbose.log"
+    rotator = LogRotator(logs_dir / log_name)
+
+    if args.action == 'last':
+        event = rotator.last(args.event_type)
+        if event is None:
+            return 1
+        sys.stdout.write(format_event(event))
+    elif args.action == 'after-last':
+        for event in rotator.events_after_last(args.event_type):
+            sys.stdout.write(format_event(event))
+    elif args.action == 'since':
+        for event in rotator.events_since(args.timestamp):
+            sys.stdout.write(format_event(event))
+    elif args.action == 'since-last-commit':
+        if args.log == 'milestone':
+            events = rotator.events_after_last("GIT_COMMIT_SUCCESS")
+        else:
+            commit = LogRotator(logs_dir / "specpilot.log").last("GIT_COMMIT_SUCCESS")
+            events = rotator.events_since(commit.timestamp) if commit else rotator.iter_events()
+        for event in events:
+            sys.stdout.write(format_event(event))
+    else:
+        index = LogIndex(rotator.log_path).refresh()
+        counts = {event_type: len(offsets) for event_type, offsets in index.data['events'].items()}
+        print(json.dumps({'events': index.data['event_count'], 'by_type': counts}, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+"""
+SpecPilot Log Rotation
+
+Size/age-based rotation of workspace logs into compressed, immutable
+segments, plus a segment manifest so readers can skip whole segments that
+fall outside the time window they need.
+
+Files next to each log (e.g. specpilot_verbose.log):
+    specpilot_verbose.log.1.gz              Oldest segment
+    specpilot_verbose.log.2.zst             Newer segments get higher numbers,
+                                            so rotation never renames old ones
+    specpilot_verbose.log.segments.json     Segment manifest
+
+Each manifest entry records the segment's file name, compression, event
+count, byte sizes and the earliest/latest event timestamps it contains.
+
+Segments are compressed with zstd when the optional ``zstandard`` package is
+installed, and with gzip otherwise. Rotation renames the live log under the
+same advisory lock the log helper takes for each write; the helper notices
+the new inode and reopens, so no entries are lost.
+
+Readers that need history (the log_index CLI, analytics, the file index's
+last-commit lookup) go through LogRotator.last / events_after_last /
+events_since, which consult the live log's offset index first and only
+decompress segments, newest first, when the live log has no match.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from specpilot.log_index import LogEvent, LogIndex, iter_events, iter_stream_events, parse_event_line
+
+MANIFEST_SUFFIX = ".segments.json"
+ROTATING_SUFFIX = ".rotating"
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+COMPRESSION_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+
+
+def default_compression() -> str:
+    """Prefer zstd when available, otherwise gzip."""
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def open_segment(path: Path, compression: str):
+    """Open a segment for streaming decompression."""
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"Reading {path.name} requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return gzip.open(path, "rb")
+
+
+class _LineReader:
+    """Line iterator over a binary stream that only supports read()."""
+
+    def __init__(self, stream, chunk_size: int = 1024 * 1024):
+        self.stream = stream
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        pending = b""
+        while True:
+            chunk = self.stream.read(self.chunk_size)
+            if not chunk:
+                break
+            pending += chunk
+            lines = pending.split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line + b"\n"
+        if pending:
+            yield pending
+
+
+class LogRotator:
+    """Rotates one log file and reads back across its segments."""
+
+    def __init__(self, log_path: Path, compression: Optional[str] = None):
+        self.log_path = Path(log_path)
+        self.manifest_path = self.log_path.with_name(self.log_path.name + MANIFEST_SUFFIX)
+        self.rotating_path = self.log_path.with_name(self.log_path.name + ROTATING_SUFFIX)
+        self.compression = compression or default_compression()
+        if self.compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unsupported compression: {self.compression}")
+        if self.compression == "zstd" and zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+
+    def load_manifest(self) -> List[Dict]:
+        """Return the segment list, oldest first."""
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f).get("segments", [])
+        except (OSError, ValueError):
+            return []
+
+    def save_manifest(self, segments: List[Dict]):
+        """Atomically write the segment list."""
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"version": 1, "segments": segments}, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def first_timestamp(self) -> Optional[str]:
+        """Timestamp of the first event in the live log, if any."""
+        if not self.log_path.exists():
+            return None
+        event = next(iter_events(self.log_path, include_body=False), None)
+        return event.timestamp if event else None
+
+    def needs_rotation(self, max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                       max_age_days: Optional[float] = None) -> bool:
+        """True when the live log exceeds the size limit or its oldest event is too old."""
+        if not self.log_path.exists():
+            return False
+        if max_bytes and self.log_path.stat().st_size >= max_bytes:
+            return True
+        if max_age_days:
+            first = self.first_timestamp()
+            cutoff = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - max_age_days * 86400))
+            return first is not None and first < cutoff
+        return False
+
+    def rotate(self) -> Optional[Dict]:
+        """
+        Move the live log aside and compress it into the next segment.
+
+        A leftover ``.rotating`` file from an interrupted run is compressed first.
+        Returns the new manifest entry, or None if there was nothing to rotate.
+        """
+        if not self.rotating_path.exists():
+            if not self.log_path.exists() or self.log_path.stat().st_size == 0:
+                return None
+            self._detach_live_log()
+        return self._compress_rotating()
+
+    def _detach_live_log(self):
+        """Rename the live log under its write lock so writers reopen a fresh file."""
+        fd = os.open(self.log_path, os.O_RDONLY)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            os.rename(self.log_path, self.rotating_path)
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _compress_rotating(self) -> Dict:
+        """Compress the detached log into a numbered segment and record it in the manifest."""
+        segments = self.load_manifest()
+        sequence = segments[-1]["sequence"] + 1 if segments else 1
+        name = f"{self.log_path.name}.{sequence}{COMPRESSION_SUFFIXES[self.compression]}"
+        segment_path = self.log_path.with_name(name)
+        tmp_path = segment_path.with_name(name + ".tmp")
+
+        first_ts = None
+        last_ts = None
+        events = 0
+        raw_bytes = 0
+        with open(self.rotating_path, "rb") as source, open(tmp_path, "wb") as raw_target:
+            if self.compression == "zstd":
+                target = zstandard.ZstdCompressor(level=10).stream_writer(raw_target, closefd=False)
+            else:
+                target = gzip.GzipFile(fileobj=raw_target, mode="wb", compresslevel=6)
+            try:
+                for line in source:
+                    target.write(line)
+                    raw_bytes += len(line)
+                    header = parse_event_line(line)
+                    if header is None:
+                        continue
+                    events += 1
+                    timestamp = header['timestamp']
+                    if first_ts is None or timestamp < first_ts:
+                        first_ts = timestamp
+                    if last_ts is None or timestamp > last_ts:
+                        last_ts = timestamp
+            finally:
+                target.close()
+            raw_target.flush()
+            os.fsync(raw_target.fileno())
+        os.replace(tmp_path, segment_path)
+
+        entry = {
+            "sequence": sequence,
+            "file": name,
+            "compression": self.compression,
+            "first_timestamp": first_ts,
+            "last_timestamp": last_ts,
+            "events": events,
+            "raw_bytes": raw_bytes,
+            "compressed_bytes": segment_path.stat().st_size,
+            "rotated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+        segments.append(entry)
+        self.save_manifest(segments)
+        self.rotating_path.unlink()
+        return entry
+
+    def iter_events(self, since: Optional[str] = None, until: Optional[str] = None,
+                    include_body: bool = True, include_live: bool = True) -> Iterator[LogEvent]:
+        """
+        Stream events across segments and the live log within [since, until].
+
+        Segments whose recorded time range lies entirely outside the window are
+        skipped without being opened; the rest are decompressed as a stream.
+        include_live=False stops after the rotated-out events.
+        """
+        def in_window(event: LogEvent) -> bool:
+            return (since is None or event.timestamp >= since) and (until is None or event.timestamp <= until)
+
+        for segment, read in self.archived():
+            if segment is not None:
+                if segment["last_timestamp"] is None:
+                    continue
+                if since is not None and segment["last_timestamp"] < since:
+                    continue
+                if until is not None and segment["first_timestamp"] > until:
+                    continue
+            for event in read(include_body):
+                if in_window(event):
+                    yield event
+
+        if include_live:
+            for event in iter_events(self.log_path, include_body=include_body):
+                if in_window(event):
+                    yield event
+
+    def segment_events(self, segment: Dict, include_body: bool = True, start: int = 0) -> Iterator[LogEvent]:
+        """
+        Stream the events of one manifest segment from a line start.
+
+        Offsets are positions in the decompressed text, i.e. in the log the
+        segment was before rotation.
+        """
+        with open_segment(self.log_path.with_name(segment["file"]), segment["compression"]) as stream:
+            if start:
+                stream.seek(start)
+            yield from iter_stream_events(_LineReader(stream), start, include_body=include_body)
+
+    def latest_sequence(self) -> int:
+        """Sequence of the newest rotated-out log; a pending .rotating file counts as the next segment."""
+        segments = self.load_manifest()
+        newest = segments[-1]["sequence"] if segments else 0
+        return newest + 1 if self.rotating_path.exists() else newest
+
+    def rotated_since(self, sequence: int) -> List[Tuple[int, Callable[[bool, int], Iterator[LogEvent]]]]:
+        """
+        Logs rotated out after segment `sequence`, oldest first, as (sequence, read) pairs.
+
+        read(include_body, start) streams events from a byte offset of the
+        log as it was before rotation, so a reader that checkpointed an offset
+        in the live log can finish it after the log has been rotated away.
+        """
+        segments = self.load_manifest()
+        sources = [(segment["sequence"],
+                    lambda include_body, start, segment=segment: self.segment_events(segment, include_body, start))
+                   for segment in segments if segment["sequence"] > sequence]
+        pending = (segments[-1]["sequence"] if segments else 0) + 1
+        if self.rotating_path.exists() and pending > sequence:
+            sources.append((pending, lambda include_body, start: iter_events(self.rotating_path, start,
+                                                                             include_body=include_body)))
+        return sources
+
+    def archived(self) -> List[Tuple[Optional[Dict], Callable[[bool], Iterator[LogEvent]]]]:
+        """
+        Everything rotated out of the live log, oldest first, as (segment, read) pairs.
+
+        read(include_body) streams that source's events. The segment is the
+        manifest entry, or None for a log caught between rename and
+        compression (the .rotating file).
+        """
+        sources = [(segment, lambda include_body, segment=segment: self.segment_events(segment, include_body))
+                   for segment in self.load_manifest() if segment.get("events")]
+        if self.rotating_path.exists():
+            sources.append((None, lambda include_body: iter_events(self.rotating_path, include_body=include_body)))
+        return sources
+
+    def last_archived(self, event_type: str) -> Tuple[Optional[int], Optional[LogEvent]]:
+        """
+        Find the most recent rotated-out event of a type, newest source first.
+
+        Returns (position in archived(), event), or (None, None) if no segment
+        has one. Only the sources newer than the match are decompressed.
+        """
+        sources = self.archived()
+        for position in range(len(sources) - 1, -1, -1):
+            found = None
+            for event in sources[position][1](True):
+                if event.event_type == event_type:
+                    found = event
+            if found is not None:
+                return position, found
+        return None, None
+
+    def last(self, event_type: str) -> Optional[LogEvent]:
+        """Most recent event of a type: the live log's index first, then the segments."""
+        event = LogIndex(self.log_path).refresh().last(event_type)
+        if event is None:
+            event = self.last_archived(event_type)[1]
+        return event
+
+    def events_after_last(self, event_type: str, include_body: bool = True) -> Iterator[LogEvent]:
+        """Stream events after the most recent event of a type, across segments (everything if none)."""
+        index = LogIndex(self.log_path).refresh()
+        if index.offsets(event_type):
+            yield from index.events_after_last(event_type, include_body)
+            return
+        sources = self.archived()
+        position, found = self.last_archived(event_type)
+        if found is not None:
+            yield from (event for event in sources[position][1](include_body) if event.offset > found.offset)
+            sources = sources[position + 1:]
+        for _, read in sources:
+            yield from read(include_body)
+        yield from index.events_from(0, include_body)
+
+    def events_since(self, timestamp: str, include_body: bool = True) -> Iterator[LogEvent]:
+        """Stream events at or after a timestamp: matching segments, then the live log through its index."""
+        yield from self.iter_events(since=timestamp, include_body=include_body, include_live=False)
+        yield from LogIndex(self.log_path).refresh().events_since(timestamp, include_body)
+
+
+def rotate_logs(logs_dir: Path, max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                max_age_days: Optional[float] = None, compression: Optional[str] = None,
+                force: bool = False) -> List[Dict]:
+    """Rotate every *.log in a logs directory that crossed a threshold; returns new segments."""
+    rotated = []
+    for log_path in sorted(Path(logs_dir).glob("*.log")):
+        rotator = LogRotator(log_path, compression)
+        if force or rotator.rotating_path.exists() or rotator.needs_rotation(max_bytes, max_age_days):
+            entry = rotator.rotate()
+            if entry:
+                rotated.append(dict(entry, log=log_path.name))
+    return rotated
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point for rotating a user's logs."""
+    parser = argparse.ArgumentParser(description="Rotate and compress SpecPilot workspace logs")
+    parser.add_argument('--project', default='.', help='Project root (default: current directory)')
+    parser.add_argument('--user', help='Username (default: from .specpilot.local)')
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                        help=f'Rotate logs at or above this size (default: {DEFAULT_MAX_BYTES})')
+    parser.add_argument('--max-age-days', type=float, help='Rotate logs whose oldest entry is older than this')
+    parser.add_argument('--compression', choices=sorted(COMPRESSION_SUFFIXES),
+                        help='Segment compression (default: zstd if installed, else gzip)')
+    parser.add_argument('--force', action='store_true', help='Rotate regardless of thresholds')
+    args = parser.parse_args(argv)
+
+    from specpilot.log_index import logs_dir_for
+    logs_dir = logs_dir_for(Path(args.project), args.user)
+    for entry in rotate_logs(logs_dir, args.max_bytes, args.max_age_days, args.compression, args.force):
+        print(f"Rotated {entry['log']} -> {entry['file']} ({entry['events']} events, "
+              f"{entry['raw_bytes']} -> {entry['compressed_bytes']} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
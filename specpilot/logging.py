@@ -0,0 +1,436 @@
+"""
+SpecPilot Log Helper
+
+Reference implementation of the Log Helper interface described in
+.specpilot/engine/commands/log_helper.md and reference/logging_rules.md.
+
+Each log keeps one persistent append-mode file descriptor. Every write is a
+single os.write() under an fcntl advisory lock, so concurrent sessions can
+append to the same file without interleaving lines; if log rotation moved
+the file away, the descriptor is reopened. Milestones are written
+immediately; transcripts are buffered and written as one TRANSCRIPT_BATCH
+block when the batch reaches a size (UTF-8 bytes) or age threshold, on flush()
+or at exit; the age threshold is enforced by a daemon timer, so a batch is
+written on time even if nothing else is logged.
+
+With the "sqlite" backend (config option logging.event_store, or
+backend="sqlite") milestones and transcript cycles are written as rows of the
+workspace's event store (see specpilot.event_store) instead. The text logs are
+then rendered from the store on flush() and close(). If the database cannot
+be written, the entry goes to the text log, and the store imports it from
+there later.
+
+Usage:
+    from specpilot.logging import log_milestone, log_verbose
+    log_milestone("🚀", "MODE_SWITCH", "Switched to Pilot Mode")
+    log_verbose("USER: Enter Pilot Mode\\n---\\nCURSOR: [Response content]")
+
+Command line (run from the framework root, or with it on PYTHONPATH):
+    python3 -m specpilot.logging --project . milestone 🚀 MODE_SWITCH "Switched to Pilot Mode"
+    echo "USER: ..." | python3 -m specpilot.logging --project . verbose
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes still go through O_APPEND, just unlocked
+    fcntl = None
+
+MILESTONE_LOG = "specpilot.log"
+VERBOSE_LOG = "specpilot_verbose.log"
+LEGACY_USERS = ("cursor",)
+
+FSYNC_NEVER = "never"
+FSYNC_BATCH = "batch"
+FSYNC_ALWAYS = "always"
+FSYNC_POLICIES = (FSYNC_NEVER, FSYNC_BATCH, FSYNC_ALWAYS)
+
+DEFAULT_BATCH_BYTES = 64 * 1024
+DEFAULT_BATCH_SECONDS = 5.0
+
+BACKEND_TEXT = "text"
+BACKEND_SQLITE = "sqlite"
+BACKENDS = (BACKEND_TEXT, BACKEND_SQLITE)
+
+
+def resolve_username(project_root: Path) -> str:
+    """Read the current user from .specpilot.local, falling back to 'developer'."""
+    try:
+        with open(Path(project_root) / ".specpilot.local", "r") as f:
+            return json.load(f).get("username") or "developer"
+    except (OSError, ValueError):
+        return "developer"
+
+
+def resolve_backend(project_root: Path, username: str) -> str:
+    """"sqlite" when the logging.event_store option is enabled, otherwise "text"."""
+    try:
+        from specpilot.config import ConfigResolver
+        enabled = ConfigResolver(project_root, username).get("logging.event_store", False)
+    except (OSError, ValueError):
+        return BACKEND_TEXT
+    return BACKEND_SQLITE if enabled is True else BACKEND_TEXT
+
+
+def format_timestamp(when: Optional[float] = None) -> str:
+    """Format a log timestamp as YYYY-MM-DD HH:MM:SS in local time."""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(when))
+
+
+class SpecPilotLogger:
+    """Append-only milestone and transcript logger for one user workspace."""
+
+    def __init__(self, project_root: Optional[str] = None, username: Optional[str] = None,
+                 fsync_policy: str = FSYNC_NEVER, batch_bytes: int = DEFAULT_BATCH_BYTES,
+                 batch_seconds: float = DEFAULT_BATCH_SECONDS, backend: Optional[str] = None):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"fsync_policy must be one of {', '.join(FSYNC_POLICIES)}")
+        if backend is not None and backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {', '.join(BACKENDS)}")
+
+        self.project_root = Path(project_root).resolve() if project_root else Path.cwd()
+        self.username = username or resolve_username(self.project_root)
+        self.workspace_dir = self.project_root / ".specpilot" / "workspace"
+        self.logs_dir = self.workspace_dir / self.username / "logs"
+        self.milestone_path = self.logs_dir / MILESTONE_LOG
+        self.verbose_path = self.logs_dir / VERBOSE_LOG
+
+        self.fsync_policy = fsync_policy
+        self.batch_bytes = batch_bytes
+        self.batch_seconds = batch_seconds
+        self.backend = backend or resolve_backend(self.project_root, self.username)
+        self._store = None
+
+        self._fds = {}
+        self._pending = []
+        self._pending_bytes = 0
+        self._pending_since = None
+        self._pending_emoji = "📝"
+        self._timer = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _fd(self, path: Path) -> int:
+        """Return the persistent append descriptor for a log, opening it on first use."""
+        fd = self._fds.get(path)
+        if fd is None:
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self._fds[path] = fd
+        return fd
+
+    def _locked_fd(self, path: Path) -> int:
+        """Return the log's descriptor with the write lock held, reopening it if the log was rotated."""
+        while True:
+            fd = self._fd(path)
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                current = os.stat(path)
+                if current.st_ino == os.fstat(fd).st_ino:
+                    return fd
+            except FileNotFoundError:
+                pass
+            # Log rotation renamed the file we hold open; switch to the new live log
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+            del self._fds[path]
+
+    def _append(self, path: Path, text: str, sync: bool):
+        """Append text to a log as one locked write."""
+        data = text.encode("utf-8")
+        fd = self._locked_fd(path)
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+            if sync:
+                os.fsync(fd)
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _write(self, path: Path, text: str, sync: bool) -> bool:
+        """Append text, reporting a failure to whichever log can still be written."""
+        try:
+            self._append(path, text, sync)
+            return True
+        except OSError as e:
+            fallback = self.verbose_path if path == self.milestone_path else self.milestone_path
+            try:
+                self._append(fallback, self.format_milestone(
+                    "⚠️", "AI_ERROR", f"Logging failure at {path}: {e}"), sync)
+            except OSError:
+                pass
+            return False
+
+    @property
+    def store(self):
+        """The workspace's event store (sqlite backend), opened on first use."""
+        if self._store is None:
+            from specpilot.event_store import EventStore
+            self._store = EventStore(self.logs_dir, self.username,
+                                     synchronous="FULL" if self.fsync_policy == FSYNC_ALWAYS else "NORMAL")
+        return self._store
+
+    def _store_write(self, write, path: Path, text: str, sync: bool) -> bool:
+        """Write through the event store; on a database error keep the entry in the text log instead."""
+        import sqlite3
+        try:
+            write(self.store)
+            return True
+        except sqlite3.Error as e:
+            self._write(path, text, sync)
+            self._write(self.milestone_path, self.format_milestone(
+                "⚠️", "AI_ERROR", f"Event store failure at {self.store.db_path}: {e}"), sync)
+            return False
+
+    def _export(self):
+        """Render rows added to the event store since the last export into the text logs."""
+        import sqlite3
+        try:
+            self.store.export()
+        except (sqlite3.Error, OSError):
+            pass
+
+    def format_milestone(self, event_emoji: str, event_type: str, message: str,
+                         when: Optional[float] = None) -> str:
+        """Format one milestone line in the canonical log format."""
+        return f"{format_timestamp(when)} - {self.username} - {event_emoji} - [{event_type}] - {message}\n"
+
+    def ensure_logs_directory(self) -> bool:
+        """Create the user's logs directory; returns True (and logs LOG_DIR_CREATED) if it was missing."""
+        if self.logs_dir.is_dir():
+            return False
+        self.logs_dir.mkdir(parents=True, exist_ok=True)
+        self.log_milestone("📁", "LOG_DIR_CREATED", f"Created {self.logs_dir.relative_to(self.project_root)}")
+        return True
+
+    def log_milestone(self, event_emoji: str, event_type: str, message: str) -> bool:
+        """Append one milestone line to specpilot.log immediately."""
+        with self._lock:
+            if not self.logs_dir.is_dir():
+                self.logs_dir.mkdir(parents=True, exist_ok=True)
+            when = time.time()
+            line = self.format_milestone(event_emoji, event_type, message, when)
+            sync = self.fsync_policy == FSYNC_ALWAYS
+            if self.backend == BACKEND_SQLITE:
+                ok = self._store_write(lambda store: store.add_event(
+                    format_timestamp(when), self.username, event_emoji, event_type, message),
+                    self.milestone_path, line, sync)
+            else:
+                ok = self._write(self.milestone_path, line, sync)
+            self._flush_if_due()
+            return ok
+
+    def log_verbose(self, transcript_data: str, mode_emoji: Optional[str] = None) -> bool:
+        """Queue one transcript cycle; the batch is written once it is large or old enough."""
+        with self._lock:
+            if mode_emoji:
+                self._pending_emoji = mode_emoji
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+            cycle = transcript_data.strip("\n")
+            self._pending.append(cycle)
+            self._pending_bytes += len(cycle.encode("utf-8"))
+            ok = self._flush_if_due()
+            if self._pending and self._timer is None:
+                self._timer = threading.Timer(self.batch_seconds, self._flush_on_timer, (self._pending_since,))
+                self._timer.daemon = True
+                self._timer.start()
+            return ok
+
+    def _flush_on_timer(self, batch_started: float):
+        """Timer callback: write the batch that started at batch_started once it reached the age threshold."""
+        with self._lock:
+            if self._pending_since == batch_started:
+                self._timer = None
+                self._flush_pending()
+
+    def _flush_if_due(self) -> bool:
+        """Write the pending batch if it crossed the size or age threshold."""
+        if not self._pending:
+            return True
+        too_big = self._pending_bytes >= self.batch_bytes
+        too_old = time.monotonic() - self._pending_since >= self.batch_seconds
+        if too_big or too_old:
+            return self._flush_pending()
+        return True
+
+    def _flush_pending(self) -> bool:
+        """Write all pending transcript cycles as one TRANSCRIPT_BATCH block."""
+        if not self._pending:
+            return True
+        if not self.logs_dir.is_dir():
+            self.logs_dir.mkdir(parents=True, exist_ok=True)
+        when = time.time()
+        cycles = self._pending
+        emoji = self._pending_emoji
+        block = self.format_milestone(emoji, "TRANSCRIPT_BATCH", "Session conversations", when)
+        block += "---\n" + "\n---\n".join(cycles) + "\n---\n"
+        self._pending = []
+        self._pending_bytes = 0
+        self._pending_since = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        sync = self.fsync_policy != FSYNC_NEVER
+        if self.backend == BACKEND_SQLITE:
+            return self._store_write(lambda store: store.add_transcripts(
+                format_timestamp(when), self.username, emoji, cycles), self.verbose_path, block, sync)
+        return self._write(self.verbose_path, block, sync)
+
+    def flush(self) -> bool:
+        """Write any pending transcript batch now (e.g. right before a commit)."""
+        with self._lock:
+            ok = self._flush_pending()
+            if self.backend == BACKEND_SQLITE:
+                self._export()
+            return ok
+
+    def close(self):
+        """Flush pending transcripts and close the log descriptors."""
+        with self._lock:
+            self._flush_pending()
+            if self.backend == BACKEND_SQLITE and self._store is not None:
+                self._export()
+                self._store.close()
+                self._store = None
+            for fd in self._fds.values():
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+            self._fds = {}
+
+    def migrate_logs_if_needed(self, source_users: Sequence[str] = LEGACY_USERS) -> List[str]:
+        """
+        Move logs left under legacy workspaces (e.g. ``cursor/`` or the
+        non-namespaced ``workspace/logs/``) into the current user's logs.
+
+        Old content is appended to the current user's files so nothing is
+        overwritten. Returns the migrated source paths.
+        """
+        sources = [self.workspace_dir / "logs"]
+        sources += [self.workspace_dir / user / "logs" for user in source_users if user != self.username]
+
+        migrated = []
+        for source_dir in sources:
+            if not source_dir.is_dir() or source_dir == self.logs_dir:
+                continue
+            for name in (MILESTONE_LOG, VERBOSE_LOG):
+                source = source_dir / name
+                if not source.is_file():
+                    continue
+                try:
+                    with self._lock:
+                        self.logs_dir.mkdir(parents=True, exist_ok=True)
+                        content = source.read_text(encoding="utf-8")
+                        if content and not content.endswith("\n"):
+                            content += "\n"
+                        self._append(self.logs_dir / name, content, self.fsync_policy != FSYNC_NEVER)
+                        source.unlink()
+                except OSError as e:
+                    self.log_milestone("⚠️", "AI_ERROR", f"Log migration failed for {source}: {e}")
+                    continue
+                migrated.append(str(source))
+                self.log_milestone("📦", "LOGS_MIGRATED",
+                                   f"{source.relative_to(self.project_root)} -> "
+                                   f"{(self.logs_dir / name).relative_to(self.project_root)}")
+        if migrated and self.backend == BACKEND_SQLITE:
+            # The migrated text was appended to the text logs; bring it into the store
+            import sqlite3
+            try:
+                with self._lock:
+                    self.store.import_logs()
+            except sqlite3.Error as e:
+                self.log_milestone("⚠️", "AI_ERROR", f"Event store import failed after log migration: {e}")
+        return migrated
+
+
+_loggers: Dict[Path, SpecPilotLogger] = {}
+
+
+def get_logger(project_root: Optional[str] = None, **options) -> SpecPilotLogger:
+    """Return the shared logger for a project, creating it on first use."""
+    root = Path(project_root).resolve() if project_root else Path.cwd()
+    logger = _loggers.get(root)
+    if logger is None:
+        logger = SpecPilotLogger(str(root), **options)
+        _loggers[root] = logger
+    return logger
+
+
+def log_milestone(event_emoji: str, event_type: str, message: str) -> bool:
+    """Append a milestone to the current project's specpilot.log."""
+    return get_logger().log_milestone(event_emoji, event_type, message)
+
+
+def log_verbose(transcript_data: str, mode_emoji: Optional[str] = None) -> bool:
+    """Queue a transcript cycle for the current project's specpilot_verbose.log."""
+    return get_logger().log_verbose(transcript_data, mode_emoji)
+
+
+def ensure_logs_directory() -> bool:
+    """Create the current user's logs directory if it is missing."""
+    return get_logger().ensure_logs_directory()
+
+
+def migrate_logs_if_needed() -> List[str]:
+    """Move legacy logs into the current user's workspace."""
+    return get_logger().migrate_logs_if_needed()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point for agents and shell scripts."""
+    parser = argparse.ArgumentParser(description="SpecPilot log helper")
+    parser.add_argument('--project', default='.', help='Project root (default: current directory)')
+    parser.add_argument('--user', help='Username (default: from .specpilot.local)')
+    parser.add_argument('--fsync', choices=FSYNC_POLICIES, default=FSYNC_NEVER,
+                        help='When to fsync log writes (default: never)')
+    parser.add_argument('--backend', choices=BACKENDS,
+                        help='Log storage (default: sqlite if logging.event_store is enabled, else text)')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+
+    milestone = subparsers.add_parser('milestone', help='Append a milestone event')
+    milestone.add_argument('emoji')
+    milestone.add_argument('event_type')
+    milestone.add_argument('message')
+
+    verbose = subparsers.add_parser('verbose', help='Append a transcript batch read from stdin')
+    verbose.add_argument('--emoji', default='📝', help='Mode emoji for the batch header')
+
+    subparsers.add_parser('ensure-dir', help='Create the logs directory if missing')
+    subparsers.add_parser('migrate', help='Move legacy logs into the current user workspace')
+
+    args = parser.parse_args(argv)
+    logger = SpecPilotLogger(args.project, username=args.user, fsync_policy=args.fsync, backend=args.backend)
+
+    if args.action == 'milestone':
+        ok = logger.log_milestone(args.emoji, args.event_type, args.message)
+    elif args.action == 'verbose':
+        ok = logger.log_verbose(sys.stdin.read(), args.emoji) and logger.flush()
+    elif args.action == 'ensure-dir':
+        logger.ensure_logs_directory()
+        ok = True
+    else:
+        for source in logger.migrate_logs_if_needed():
+            print(f"Migrated {source}")
+        ok = True
+
+    logger.close()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
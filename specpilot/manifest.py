@@ -0,0 +1,116 @@
+"""
+SpecPilot Engine Manifest
+
+Content-addressed manifest of an engine tree. Each entry maps a relative
+POSIX path to its size, modification time and SHA-256 digest so that
+updates can copy only what actually changed.
+
+Manifest layout (.specpilot/engine/.manifest.json):
+    {
+      "version": 1,
+      "algorithm": "sha256",
+      "files": {
+        "protocols/pilot.md": {"size": 1234, "mtime_ns": 1699..., "digest": "ab12..."}
+      }
+    }
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_TMP_NAME = MANIFEST_NAME + ".tmp"
+MANIFEST_VERSION = 1
+HASH_ALGORITHM = "sha256"
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    """Return the hex digest of a file, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_engine_files(root: Path):
+    """Yield (relative_path, os.stat_result) for every file under root."""
+    root = Path(root)
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                elif entry.is_file(follow_symlinks=False):
+                    relative = Path(entry.path).relative_to(root).as_posix()
+                    # The manifest and a temp file a crashed save_manifest() left behind are not engine files
+                    if relative in (MANIFEST_NAME, MANIFEST_TMP_NAME):
+                        continue
+                    yield relative, entry.stat(follow_symlinks=False)
+
+
+def build_manifest(root: Path, previous: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+    """
+    Build the file map for a tree.
+
+    Files whose size and mtime match an entry in ``previous`` reuse its digest
+    instead of being re-hashed, so refreshing a known tree costs one stat per file.
+    """
+    previous = previous or {}
+    files = {}
+    for relative, st in iter_engine_files(root):
+        known = previous.get(relative)
+        if known and known.get("size") == st.st_size and known.get("mtime_ns") == st.st_mtime_ns:
+            digest = known["digest"]
+        else:
+            digest = hash_file(Path(root) / relative)
+        files[relative] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "digest": digest,
+        }
+    return files
+
+
+def load_manifest(root: Path) -> Dict[str, Dict]:
+    """Load the stored file map for a tree, or an empty map if missing or unreadable."""
+    manifest_path = Path(root) / MANIFEST_NAME
+    try:
+        with open(manifest_path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION or data.get("algorithm") != HASH_ALGORITHM:
+        return {}
+    return data.get("files", {})
+
+
+def save_manifest(root: Path, files: Dict[str, Dict]):
+    """Atomically write the file map for a tree."""
+    manifest_path = Path(root) / MANIFEST_NAME
+    tmp_path = manifest_path.with_name(MANIFEST_TMP_NAME)
+    data = {
+        "version": MANIFEST_VERSION,
+        "algorithm": HASH_ALGORITHM,
+        "files": dict(sorted(files.items())),
+    }
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def diff_manifests(source: Dict[str, Dict], target: Dict[str, Dict]) -> Tuple[List[str], List[str], List[str]]:
+    """Return (added, changed, removed) paths needed to turn target into source."""
+    added = sorted(path for path in source if path not in target)
+    changed = sorted(
+        path for path, entry in source.items()
+        if path in target and target[path]["digest"] != entry["digest"]
+    )
+    removed = sorted(path for path in target if path not in source)
+    return added, changed, removed
@@ -0,0 +1,155 @@
+"""
+SpecPilot Staged Engine Swap
+
+Builds a replacement engine in a sibling staging directory and activates it
+with a single rename, so an interrupted update or rollback never leaves a
+half-written engine behind.
+
+Directory names used next to .specpilot/engine:
+    engine.staging-<token>    New engine being built (incomplete until swapped)
+    engine.retired-<token>    Previous engine, removed once the swap succeeded
+
+On Linux the swap uses renameat2(RENAME_EXCHANGE), which atomically trades
+the two directories. Elsewhere it falls back to renaming the live engine to
+a retired name and the staging directory into place; recover_staging()
+repairs the short window between those two renames on the next run.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+STAGING_PREFIX = "engine.staging-"
+RETIRED_PREFIX = "engine.retired-"
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+
+
+def create_staging_dir(engine_dir: Path) -> Path:
+    """Create an empty staging directory on the same filesystem as the engine."""
+    engine_dir = Path(engine_dir)
+    engine_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging_dir = Path(tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=engine_dir.parent))
+    # mkdtemp creates 0700 directories; keep the live engine's permissions instead
+    mode = engine_dir.stat().st_mode & 0o7777 if engine_dir.exists() else 0o755
+    os.chmod(staging_dir, mode)
+    return staging_dir
+
+
+def link_or_copy(source: Path, target: Path):
+    """Hardlink source to target, falling back to a metadata-preserving copy."""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def fsync_path(path: Path):
+    """Flush a file or directory to stable storage where the platform allows it."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def fsync_tree(root: Path, written: Optional[Iterable[str]] = None):
+    """
+    Flush a staged tree: the given files (all files when None), then every directory.
+
+    Hardlinked files were already durable in the live engine, so callers only
+    need to pass the files they actually wrote.
+    """
+    root = Path(root)
+    directories = [root]
+    for current, dirnames, filenames in os.walk(root):
+        directories.extend(Path(current) / name for name in dirnames)
+        if written is None:
+            for name in filenames:
+                fsync_path(Path(current) / name)
+    if written is not None:
+        for relative in written:
+            fsync_path(root / relative)
+    for directory in reversed(directories):
+        fsync_path(directory)
+
+
+def exchange_dirs(first: Path, second: Path) -> bool:
+    """Atomically swap two paths with renameat2(RENAME_EXCHANGE); False if unsupported."""
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        renameat2 = libc.renameat2
+    except (ImportError, OSError, AttributeError):
+        return False
+
+    result = renameat2(AT_FDCWD, os.fsencode(str(first)), AT_FDCWD, os.fsencode(str(second)), RENAME_EXCHANGE)
+    return result == 0
+
+
+def activate_staging(staging_dir: Path, engine_dir: Path, written: Optional[Iterable[str]] = None):
+    """Make a fully built staging directory the live engine and discard the old one."""
+    staging_dir = Path(staging_dir)
+    engine_dir = Path(engine_dir)
+    fsync_tree(staging_dir, written)
+
+    if not engine_dir.exists():
+        os.rename(staging_dir, engine_dir)
+        fsync_path(engine_dir.parent)
+        return
+
+    retired_dir = Path(tempfile.mkdtemp(prefix=RETIRED_PREFIX, dir=engine_dir.parent))
+    if exchange_dirs(staging_dir, engine_dir):
+        # The staging path now holds the previous engine
+        os.rmdir(retired_dir)
+        os.rename(staging_dir, retired_dir)
+    else:
+        os.rmdir(retired_dir)
+        os.rename(engine_dir, retired_dir)
+        os.rename(staging_dir, engine_dir)
+    fsync_path(engine_dir.parent)
+    shutil.rmtree(retired_dir, ignore_errors=True)
+
+
+def recover_staging(engine_dir: Path) -> List[str]:
+    """
+    Clean up after an interrupted swap and return a description of each action.
+
+    Staging directories are always incomplete leftovers and are deleted. A
+    retired engine is restored only when the live engine is missing, which
+    happens if the process died between the two fallback renames.
+    """
+    engine_dir = Path(engine_dir)
+    parent = engine_dir.parent
+    actions = []
+    if not parent.exists():
+        return actions
+
+    retired = []
+    for item in parent.iterdir():
+        if not item.is_dir():
+            continue
+        if item.name.startswith(STAGING_PREFIX):
+            shutil.rmtree(item, ignore_errors=True)
+            actions.append(f"Removed orphaned staging directory: {item.name}")
+        elif item.name.startswith(RETIRED_PREFIX):
+            retired.append(item)
+
+    if retired and not engine_dir.exists():
+        retired.sort(key=lambda item: item.stat().st_mtime)
+        restored = retired.pop()
+        os.rename(restored, engine_dir)
+        fsync_path(parent)
+        actions.append(f"Restored engine from interrupted swap: {restored.name}")
+
+    for item in retired:
+        shutil.rmtree(item, ignore_errors=True)
+        actions.append(f"Removed retired engine: {item.name}")
+    return actions
@@ -0,0 +1,397 @@
+"""
+SpecPilot Team Analytics
+
+Batch analytics over the milestone logs of every user workspace in one or
+more projects, as used by Run Strategic Analysis.
+
+Events are loaded once into columnar arrays (stdlib ``array``), with users,
+projects (by resolved path), modes and event types dictionary-encoded as
+integer ids. When NumPy is installed the metrics are computed in vectorized
+whole-column passes: np.diff for idle gaps, np.isin for event flags,
+np.bincount for per-stream sums and minimum/maximum.reduceat over the rows
+sorted by stream. Without NumPy the same aggregates are computed by row loops
+over the arrays in pure Python.
+
+Columns (one entry per milestone event, grouped per project/user stream in
+log order):
+    ts          float64   epoch seconds
+    project     uint32    index into the project dictionary
+    user        uint32    index into the user dictionary
+    event       uint32    index into the event-type dictionary
+    mode        uint32    Mode active after the event (index into the mode dictionary)
+
+Exports:
+    CSV     one summary row per project/user plus an "*" total row
+    Binary  "SPA1" magic, 4-byte little-endian header length, JSON header
+            (dictionaries, row count, column types), then each column's raw bytes
+
+Usage:
+    python3 -m specpilot.team_analytics "projects/*" --csv team.csv --binary team.spa
+"""
+
+import argparse
+import csv
+import json
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from specpilot.analytics import (COMMIT_EVENT, CORRECTION_EVENTS, IDLE_GAP_SECONDS, MODE_PATTERN, is_proposal,
+                                 parse_timestamp)
+from specpilot.log_rotation import LogRotator
+
+BINARY_MAGIC = b"SPA1"
+COLUMN_TYPES = {"ts": "d", "project": "I", "user": "I", "event": "I", "mode": "I"}
+NO_MODE = "None"
+
+
+def project_key(project_root: Path) -> str:
+    """Key a project by its resolved path, so two checkouts with the same directory name stay apart."""
+    return str(Path(project_root).resolve())
+
+
+class EventColumns:
+    """Dictionary-encoded, columnar store of milestone events."""
+
+    def __init__(self):
+        self.columns = {name: array(code) for name, code in COLUMN_TYPES.items()}
+        self.dictionaries = {"project": [], "user": [], "event": [], "mode": [NO_MODE]}
+        self._lookup = {name: {value: i for i, value in enumerate(values)}
+                        for name, values in self.dictionaries.items()}
+
+    def __len__(self) -> int:
+        return len(self.columns["ts"])
+
+    def encode(self, name: str, value: str) -> int:
+        """Return the integer id for a dictionary value, adding it if new."""
+        lookup = self._lookup[name]
+        code = lookup.get(value)
+        if code is None:
+            code = len(self.dictionaries[name])
+            self.dictionaries[name].append(value)
+            lookup[value] = code
+        return code
+
+    def load_log(self, project: str, user: str, log_path: Path):
+        """Append every milestone event of one user's log (including rotated segments)."""
+        project_id = self.encode("project", project)
+        user_id = self.encode("user", user)
+        mode_id = 0
+        columns = self.columns
+        for event in LogRotator(log_path).iter_events(include_body=False):
+            try:
+                ts = parse_timestamp(event.timestamp)
+            except ValueError:
+                continue
+            if event.event_type == "MODE_SWITCH":
+                match = MODE_PATTERN.search(event.message)
+                if match:
+                    mode_id = self.encode("mode", match.group(1).strip())
+            columns["ts"].append(ts)
+            columns["project"].append(project_id)
+            columns["user"].append(user_id)
+            columns["event"].append(self.encode("event", event.event_type))
+            columns["mode"].append(mode_id)
+
+    def load_project(self, project_root: Path):
+        """Load every user workspace log under a project."""
+        workspace = Path(project_root) / ".specpilot" / "workspace"
+        if not workspace.is_dir():
+            return
+        for log_path in sorted(workspace.glob("*/logs/specpilot.log")):
+            self.load_log(project_key(project_root), log_path.parent.parent.name, log_path)
+
+    def write_binary(self, path: Path):
+        """Write the columns in the compact SPA1 binary format."""
+        header = json.dumps({
+            "rows": len(self),
+            "columns": [[name, code] for name, code in COLUMN_TYPES.items()],
+            "dictionaries": self.dictionaries,
+            "byteorder": sys.byteorder
+        }).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(BINARY_MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            for name in COLUMN_TYPES:
+                self.columns[name].tofile(f)
+
+    @classmethod
+    def read_binary(cls, path: Path) -> "EventColumns":
+        """Load columns previously written with write_binary."""
+        store = cls()
+        with open(path, "rb") as f:
+            if f.read(4) != BINARY_MAGIC:
+                raise ValueError(f"{path} is not a SpecPilot analytics file")
+            (length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(length).decode("utf-8"))
+            for name, code in header["columns"]:
+                column = array(code)
+                column.fromfile(f, header["rows"])
+                if header["byteorder"] != sys.byteorder:
+                    column.byteswap()
+                store.columns[name] = column
+        store.dictionaries = header["dictionaries"]
+        store._lookup = {name: {value: i for i, value in enumerate(values)}
+                         for name, values in store.dictionaries.items()}
+        return store
+
+
+def group_sum(keys: array, weights: Optional[array], groups: int) -> List[float]:
+    """Sum weights (or count rows when None) per integer key, in pure Python."""
+    totals = [0.0] * groups
+    if weights is None:
+        for key in keys:
+            totals[key] += 1
+    else:
+        for key, weight in zip(keys, weights):
+            totals[key] += weight
+    return totals
+
+
+def event_ids(store: EventColumns) -> Dict[str, object]:
+    """Event-type ids of the proposal, correction, commit and plan-iteration events."""
+    ids = {name: i for i, name in enumerate(store.dictionaries["event"])}
+    return {
+        "proposal": sorted(i for name, i in ids.items() if is_proposal(name)),
+        "correction": sorted(ids[name] for name in CORRECTION_EVENTS if name in ids),
+        "commit": ids.get(COMMIT_EVENT),
+        "iteration": ids.get("PLAN_ITERATION")
+    }
+
+
+def stream_stats_numpy(store: EventColumns) -> Dict[str, List]:
+    """Per-stream aggregates of a non-empty store in whole-column NumPy passes (see stream_stats_python)."""
+    columns = store.columns
+    users = len(store.dictionaries["user"])
+    modes = len(store.dictionaries["mode"])
+    streams = len(store.dictionaries["project"]) * users
+    ts = numpy.frombuffer(columns["ts"], dtype=numpy.float64)
+    event = numpy.frombuffer(columns["event"], dtype=numpy.uint32)
+    stream = (numpy.frombuffer(columns["project"], dtype=numpy.uint32).astype(numpy.int64) * users
+              + numpy.frombuffer(columns["user"], dtype=numpy.uint32))
+    ids = event_ids(store)
+
+    # Time until the next event of the same stream; rows of a stream are contiguous and in log order
+    delta = numpy.diff(ts)
+    gap = numpy.zeros(len(ts))
+    gap[:-1] = numpy.where((stream[1:] == stream[:-1]) & (delta >= 0) & (delta <= IDLE_GAP_SECONDS), delta, 0.0)
+
+    def count(mask) -> List[float]:
+        return numpy.bincount(stream, weights=mask.astype(numpy.float64), minlength=streams).tolist()
+
+    stream_mode = stream * modes + numpy.frombuffer(columns["mode"], dtype=numpy.uint32)
+    order = numpy.argsort(stream, kind="stable")
+    sorted_stream = stream[order]
+    starts = numpy.flatnonzero(numpy.r_[True, sorted_stream[1:] != sorted_stream[:-1]])
+    present = sorted_stream[starts].tolist()
+    first = numpy.minimum.reduceat(ts[order], starts).tolist()
+    last = numpy.maximum.reduceat(ts[order], starts).tolist()
+
+    # Commit intervals: sort commits by (stream, time), diff within a stream, then take each stream's median
+    commit_mask = event == ids["commit"] if ids["commit"] is not None else numpy.zeros(len(ts), dtype=bool)
+    commit_stream = stream[commit_mask]
+    commit_ts = ts[commit_mask]
+    by_time = numpy.lexsort((commit_ts, commit_stream))
+    commit_stream = commit_stream[by_time]
+    commit_ts = commit_ts[by_time]
+    same = commit_stream[1:] == commit_stream[:-1]
+    intervals = numpy.diff(commit_ts)[same]
+    interval_stream = commit_stream[1:][same]
+    by_interval = numpy.lexsort((intervals, interval_stream))
+    intervals = intervals[by_interval]
+    interval_counts = numpy.bincount(interval_stream[by_interval], minlength=streams)
+    has_intervals = interval_counts > 0
+    median_index = numpy.cumsum(interval_counts) - interval_counts + interval_counts // 2
+    medians = numpy.full(streams, numpy.nan)
+    medians[has_intervals] = intervals[median_index[has_intervals]]
+
+    return {
+        "present": present,
+        "first": dict(zip(present, first)),
+        "last": dict(zip(present, last)),
+        "events": numpy.bincount(stream, minlength=streams).tolist(),
+        "active_seconds": numpy.bincount(stream, weights=gap, minlength=streams).tolist(),
+        "mode_seconds": numpy.bincount(stream_mode, weights=gap, minlength=streams * modes).tolist(),
+        "proposals": count(numpy.isin(event, ids["proposal"])),
+        "corrections": count(numpy.isin(event, ids["correction"])),
+        "iterations": count(event == ids["iteration"]) if ids["iteration"] is not None else [0.0] * streams,
+        "commits": numpy.bincount(commit_stream, minlength=streams).tolist(),
+        "median_commit_interval": [None if numpy.isnan(m) else float(m) for m in medians.tolist()]
+    }
+
+
+def stream_stats_python(store: EventColumns) -> Dict[str, List]:
+    """
+    Per-stream aggregates when NumPy is not installed.
+
+    Every list is indexed by stream id (project * users + user); first/last are
+    keyed by the ids of streams that have events, listed in "present".
+    """
+    columns = store.columns
+    rows = len(store)
+    ts, project, user, event, mode = (columns[name] for name in ("ts", "project", "user", "event", "mode"))
+    users = len(store.dictionaries["user"])
+    modes = len(store.dictionaries["mode"])
+    streams = len(store.dictionaries["project"]) * users
+    ids = event_ids(store)
+
+    stream = array("I", (p * users + u for p, u in zip(project, user)))
+    gap = array("d", [0.0]) * rows
+    for i in range(rows - 1):
+        if stream[i] == stream[i + 1]:
+            delta = ts[i + 1] - ts[i]
+            if 0 <= delta <= IDLE_GAP_SECONDS:
+                gap[i] = delta
+
+    def count(event_set) -> List[float]:
+        return group_sum(stream, array("d", (1.0 if e in event_set else 0.0 for e in event)), streams)
+
+    first_ts = {}
+    last_ts = {}
+    commit_times = {}
+    for i in range(rows):
+        s = stream[i]
+        first_ts[s] = min(first_ts.get(s, ts[i]), ts[i])
+        last_ts[s] = max(last_ts.get(s, ts[i]), ts[i])
+        if event[i] == ids["commit"]:
+            commit_times.setdefault(s, []).append(ts[i])
+
+    commits = [0] * streams
+    medians = [None] * streams
+    for s, times in commit_times.items():
+        times.sort()
+        intervals = sorted(b - a for a, b in zip(times, times[1:]))
+        commits[s] = len(times)
+        medians[s] = intervals[len(intervals) // 2] if intervals else None
+
+    return {
+        "present": sorted(first_ts),
+        "first": first_ts,
+        "last": last_ts,
+        "events": group_sum(stream, None, streams),
+        "active_seconds": group_sum(stream, gap, streams),
+        "mode_seconds": group_sum(array("I", (s * modes + m for s, m in zip(stream, mode))), gap, streams * modes),
+        "proposals": count(set(ids["proposal"])),
+        "corrections": count(set(ids["correction"])),
+        "iterations": count({ids["iteration"]}),
+        "commits": commits,
+        "median_commit_interval": medians
+    }
+
+
+def summarize(store: EventColumns) -> List[Dict]:
+    """Compute per project/user mode-time distribution, iterations, commit cadence and error rates."""
+    if not len(store):
+        return []
+    stats = stream_stats_numpy(store) if numpy is not None else stream_stats_python(store)
+    users = len(store.dictionaries["user"])
+    modes = len(store.dictionaries["mode"])
+
+    summary = []
+    for s in stats["present"]:
+        median = stats["median_commit_interval"][s]
+        active = stats["active_seconds"][s]
+        mode_seconds = stats["mode_seconds"][s * modes:(s + 1) * modes]
+        proposals = stats["proposals"][s]
+        corrections = stats["corrections"][s]
+        summary.append({
+            "project": store.dictionaries["project"][s // users],
+            "user": store.dictionaries["user"][s % users],
+            "events": int(stats["events"][s]),
+            "first_event": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stats["first"][s])),
+            "last_event": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stats["last"][s])),
+            "active_hours": round(active / 3600, 2),
+            "commits": int(stats["commits"][s]),
+            "median_commit_interval_hours": round(median / 3600, 2) if median is not None else None,
+            "iterations": int(stats["iterations"][s]),
+            "proposals": int(proposals),
+            "corrections": int(corrections),
+            "error_rate": round(corrections / proposals, 3) if proposals else 0.0,
+            "mode_share": {
+                store.dictionaries["mode"][m]: round(100 * mode_seconds[m] / active, 1)
+                for m in range(modes) if active and mode_seconds[m]
+            }
+        })
+    return summary
+
+
+def total_row(summary: List[Dict]) -> Dict:
+    """Aggregate per-stream rows into a team-wide total."""
+    active = sum(row["active_hours"] for row in summary)
+    mode_hours = {}
+    for row in summary:
+        for mode, share in row["mode_share"].items():
+            mode_hours[mode] = mode_hours.get(mode, 0) + row["active_hours"] * share / 100
+    proposals = sum(row["proposals"] for row in summary)
+    corrections = sum(row["corrections"] for row in summary)
+    return {
+        "project": "*",
+        "user": "*",
+        "events": sum(row["events"] for row in summary),
+        "first_event": min((row["first_event"] for row in summary), default=None),
+        "last_event": max((row["last_event"] for row in summary), default=None),
+        "active_hours": round(active, 2),
+        "commits": sum(row["commits"] for row in summary),
+        "median_commit_interval_hours": None,
+        "iterations": sum(row["iterations"] for row in summary),
+        "proposals": proposals,
+        "corrections": corrections,
+        "error_rate": round(corrections / proposals, 3) if proposals else 0.0,
+        "mode_share": {mode: round(100 * hours / active, 1) for mode, hours in mode_hours.items()} if active else {}
+    }
+
+
+def write_csv(summary: List[Dict], path: Path):
+    """Write the summary with one mode_<Mode>_pct column per mode seen."""
+    modes = sorted({mode for row in summary for mode in row["mode_share"]})
+    fields = ["project", "user", "events", "first_event", "last_event", "active_hours", "commits",
+              "median_commit_interval_hours", "iterations", "proposals", "corrections", "error_rate"]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(fields + [f"mode_{mode}_pct" for mode in modes])
+        for row in summary:
+            writer.writerow([row[field] for field in fields] + [row["mode_share"].get(mode, 0) for mode in modes])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point for team-wide log analytics."""
+    parser = argparse.ArgumentParser(description="Analyze SpecPilot logs across users and projects")
+    parser.add_argument('projects', nargs='*', default=['.'],
+                        help='Project directories, glob patterns or list files (default: current directory)')
+    parser.add_argument('--from-binary', help='Load columns from a previous --binary export instead of logs')
+    parser.add_argument('--csv', help='Write the summary table to this CSV file')
+    parser.add_argument('--binary', help='Write the event columns to this compact binary file')
+    args = parser.parse_args(argv)
+
+    if args.from_binary:
+        store = EventColumns.read_binary(Path(args.from_binary))
+    else:
+        from specpilot.fleet import resolve_targets
+        store = EventColumns()
+        for spec in args.projects:
+            for project_root in resolve_targets(spec):
+                store.load_project(project_root)
+
+    summary = summarize(store)
+    summary.append(total_row(summary))
+
+    if args.binary:
+        store.write_binary(Path(args.binary))
+    if args.csv:
+        write_csv(summary, Path(args.csv))
+    if not args.csv:
+        print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+SpecPilot Template Engine
+
+Small Markdown-friendly template language for .specpilot/engine/templates/,
+used to render the project documents in one pass from the bootstrap answers.
+
+Syntax:
+    {{ name }}                      Variable (undefined names are an error)
+    {{ name | title }}              Filters: title, upper, lower
+    {% if philosophy == "enterprise" %} ... {% elif ... %} ... {% else %} ... {% endif %}
+    {% include "partials/file.md" %}
+
+Conditions may use names, string literals, ==, !=, in, not, and, or,
+parentheses and [...] lists. A tag alone on its line removes the whole line,
+so block tags do not leave blank lines in the rendered Markdown.
+
+Each template is parsed once and compiled to a Python function; compiled
+templates are cached per template directory (and invalidated when a file's
+size or mtime changes), so rendering the same templates for many projects,
+as fleet mode does, never re-parses them.
+"""
+
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+TAG_PATTERN = re.compile(
+    r"^[ \t]*\{%\s*(?P<line_tag>.+?)\s*%\}[ \t]*(?:\n|$)"
+    r"|\{\{\s*(?P<var>.+?)\s*\}\}"
+    r"|\{%\s*(?P<tag>.+?)\s*%\}",
+    re.MULTILINE
+)
+CONDITION_TOKEN = re.compile(r'\s*(?:(?P<string>"[^"\\]*"|\'[^\'\\]*\')|(?P<op>==|!=|\(|\)|\[|\]|,)'
+                             r'|(?P<name>[A-Za-z_][A-Za-z0-9_]*))')
+KEYWORDS = {"and", "or", "not", "in"}
+FILTERS = {"title": str.title, "upper": str.upper, "lower": str.lower}
+MAX_INCLUDE_DEPTH = 16
+
+
+class TemplateError(Exception):
+    """Raised for template syntax errors and undefined variables."""
+
+
+def compile_condition(expression: str, template: str) -> str:
+    """Translate a restricted condition into a Python expression over the context."""
+    parts = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = CONDITION_TOKEN.match(expression, position)
+        if not match or match.end() == position:
+            raise TemplateError(f"{template}: invalid condition: {expression}")
+        position = match.end()
+        if match.group("string"):
+            parts.append(match.group("string"))
+        elif match.group("op"):
+            parts.append(match.group("op"))
+        elif match.group("name") in KEYWORDS:
+            parts.append(f" {match.group('name')} ")
+        else:
+            parts.append(f"_get({match.group('name')!r})")
+    return "".join(parts)
+
+
+def compile_source(name: str, source: str) -> str:
+    """Translate template source into the Python source of a render function."""
+    lines = ["def render(_ctx, _include, _depth):",
+             "    _out = []",
+             "    _append = _out.append",
+             "    def _get(key):",
+             "        if key not in _ctx:",
+             f"            raise _TemplateError({name!r} + ': undefined variable ' + repr(key))",
+             "        return _ctx[key]"]
+    indent = 1
+    stack = []
+
+    def emit(code: str):
+        lines.append("    " * indent + code)
+
+    position = 0
+    for match in TAG_PATTERN.finditer(source):
+        if match.start() > position:
+            emit(f"_append({source[position:match.start()]!r})")
+        position = match.end()
+
+        if match.group("var") is not None:
+            expression, *filters = [part.strip() for part in match.group("var").split("|")]
+            if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", expression):
+                raise TemplateError(f"{name}: invalid variable: {expression}")
+            value = f"str(_get({expression!r}))"
+            for filter_name in filters:
+                if filter_name not in FILTERS:
+                    raise TemplateError(f"{name}: unknown filter: {filter_name}")
+                value = f"_filters[{filter_name!r}]({value})"
+            emit(f"_append({value})")
+            continue
+
+        tag = (match.group("line_tag") or match.group("tag")).strip()
+        keyword, _, argument = tag.partition(" ")
+        if keyword == "if":
+            emit(f"if {compile_condition(argument, name)}:")
+            stack.append("if")
+            indent += 1
+            emit("pass")
+        elif keyword == "elif":
+            if not stack or stack[-1] != "if":
+                raise TemplateError(f"{name}: elif without if")
+            indent -= 1
+            emit(f"elif {compile_condition(argument, name)}:")
+            indent += 1
+            emit("pass")
+        elif keyword == "else":
+            if not stack or stack[-1] != "if":
+                raise TemplateError(f"{name}: else without if")
+            stack[-1] = "else"
+            indent -= 1
+            emit("else:")
+            indent += 1
+            emit("pass")
+        elif keyword == "endif":
+            if not stack:
+                raise TemplateError(f"{name}: endif without if")
+            stack.pop()
+            indent -= 1
+        elif keyword == "include":
+            target = argument.strip()
+            if len(target) < 2 or target[0] not in "\"'" or target[-1] != target[0]:
+                raise TemplateError(f"{name}: include needs a quoted template name")
+            emit(f"_append(_include({target[1:-1]!r}, _ctx, _depth + 1))")
+        else:
+            raise TemplateError(f"{name}: unknown tag: {keyword}")
+
+    if stack:
+        raise TemplateError(f"{name}: missing endif")
+    if position < len(source):
+        emit(f"_append({source[position:]!r})")
+    lines.append("    return ''.join(_out)")
+    return "\n".join(lines) + "\n"
+
+
+class TemplateEngine:
+    """Compiles and renders the templates of one directory."""
+
+    def __init__(self, template_dir: Path):
+        self.template_dir = Path(template_dir)
+        self._compiled: Dict[str, Tuple[Tuple[int, int], Callable]] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, name: str) -> Path:
+        """Resolve a template name ('readme' or 'partials/x.md') to a file in the directory."""
+        relative = name if name.endswith(".md") else f"{name}.md"
+        path = (self.template_dir / relative).resolve()
+        if self.template_dir.resolve() not in path.parents:
+            raise TemplateError(f"Template outside {self.template_dir}: {name}")
+        return path
+
+    def compiled(self, name: str) -> Callable:
+        """Return the compiled render function for a template, compiling it at most once per change."""
+        path = self.path_for(name)
+        try:
+            st = path.stat()
+        except OSError:
+            raise TemplateError(f"Template not found: {name}")
+        key = (st.st_size, st.st_mtime_ns)
+        cached = self._compiled.get(name)
+        if cached and cached[0] == key:
+            return cached[1]
+        with self._lock:
+            cached = self._compiled.get(name)
+            if cached and cached[0] == key:
+                return cached[1]
+            source = path.read_text(encoding="utf-8")
+            namespace = {"_TemplateError": TemplateError, "_filters": FILTERS}
+            exec(compile(compile_source(name, source), str(path), "exec"), namespace)
+            self._compiled[name] = (key, namespace["render"])
+            return namespace["render"]
+
+    def _include(self, name: str, context: Dict, depth: int) -> str:
+        if depth > MAX_INCLUDE_DEPTH:
+            raise TemplateError(f"Include depth exceeded at {name}")
+        return self.compiled(name)(context, self._include, depth)
+
+    def render(self, name: str, context: Dict) -> str:
+        """Render one template with a context of variables."""
+        return self._include(name, context, 0)
+
+    def render_all(self, documents: Dict[str, str], context: Dict) -> Dict[str, str]:
+        """Render {output_path: template_name} with one shared context; returns {output_path: text}."""
+        return {output: self.render(name, context) for output, name in documents.items()}
+
+
+_engines: Dict[str, TemplateEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_template_engine(template_dir: Path) -> TemplateEngine:
+    """Return the shared engine (and compiled-template cache) for a template directory."""
+    key = str(Path(template_dir).resolve())
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = TemplateEngine(Path(template_dir))
+        return engine
+
+
+def render_documents(template_dir: Path, documents: Dict[str, str], context: Dict) -> Dict[str, str]:
+    """Render several templates in one pass through the shared cache."""
+    return get_template_engine(template_dir).render_all(documents, context)
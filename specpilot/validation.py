@@ -0,0 +1,367 @@
+"""
+SpecPilot Validation Rules
+
+Deterministic implementation of the mechanical checks from
+reference/validation_framework.md and commands/deep_check.md, so a deep check
+only hands the semantic analysis (architecture alignment, roadmap sync) to
+the agent.
+
+Rules come in two kinds:
+    file rules      run once per matching file; registered with @file_rule and
+                    called as rule(relative_path, text) -> [(line, message)], or
+                    with reads_text=False as rule(relative_path, path) so the
+                    rule reads the file itself (the credentials rule mmaps
+                    large files instead of decoding them)
+    project rules   run once per check; registered with @project_rule and called
+                    as rule(project_root, files) -> [(path, line, message)]
+
+The tree is walked once. File rules run in a process pool over batches of
+paths; each file is read at most once and every text rule sees the same text.
+Extra rules can be dropped into .specpilot/workspace/config/rules/*.py and use
+the same decorators; they are loaded in the parent and in every worker.
+
+Report (JSON, or Markdown for coverage_history.md):
+    {"status": "PASS" | "FAIL", "summary": {"CRITICAL": n, "WARN": n, "INCOMPLETE": n},
+     "findings": [{"rule", "severity", "path", "line", "message"}], "semantic_checks": [...]}
+
+Usage:
+    python3 -m specpilot.validation --project .              # Markdown report
+    python3 -m specpilot.validation --project . --json       # machine-readable report
+    python3 -m specpilot.validation --project . --incremental --append-history
+                                                             # re-check changed files only, log the delta
+
+Incremental runs cache per-file results; see specpilot/validation_cache.py.
+"""
+
+import argparse
+import fnmatch
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from specpilot.file_index import scan_tree
+from specpilot.secret_scan import CODE_PATTERNS, finding_message, is_binary, scan_file
+
+CRITICAL = "CRITICAL"
+WARN = "WARN"
+INCOMPLETE = "INCOMPLETE"
+SEVERITIES = (CRITICAL, WARN, INCOMPLETE)
+RULESET_VERSION = 3
+PLUGIN_DIR = Path(".specpilot") / "workspace" / "config" / "rules"
+BATCH_SIZE = 64
+INLINE_THRESHOLD = 256
+SNIFF_BYTES = 8192
+
+FOUNDATION_DOCS = (
+    "docs/plans/product_roadmap.md",
+    "docs/plans/technical_roadmap.md",
+    "docs/plans/architecture.md",
+    "docs/project_conventions.md"
+)
+README_SECTIONS = ("Getting Started", "Project Structure")
+SEMANTIC_CHECKS = (
+    "Semantic sync of product_roadmap.md, technical_roadmap.md and architecture.md",
+    "Component implementation and interface compliance with architecture.md",
+    "Security, data flow and integration patterns as architected",
+    "Architecture comprehensiveness against the technical roadmap"
+)
+
+
+class Finding(NamedTuple):
+    """One rule violation."""
+    rule: str
+    severity: str
+    path: str
+    line: Optional[int]
+    message: str
+
+
+class Rule(NamedTuple):
+    """A registered rule and where it applies."""
+    id: str
+    severity: str
+    description: str
+    patterns: Tuple[str, ...]
+    check: Callable
+    reads_text: bool = True
+
+
+FILE_RULES: Dict[str, Rule] = {}
+PROJECT_RULES: Dict[str, Rule] = {}
+
+
+def file_rule(rule_id: str, severity: str, description: str, patterns: Sequence[str] = ("*",),
+              reads_text: bool = True):
+    """
+    Register a per-file rule: check(relative_path, text) -> iterable of (line, message).
+
+    With reads_text=False the rule is called with the file's absolute Path instead of its text.
+    """
+    def register(check):
+        FILE_RULES[rule_id] = Rule(rule_id, severity, description, tuple(patterns), check, reads_text)
+        return check
+    return register
+
+
+def project_rule(rule_id: str, severity: str, description: str):
+    """Register a whole-project rule: check(project_root, files) -> iterable of (path, line, message)."""
+    def register(check):
+        PROJECT_RULES[rule_id] = Rule(rule_id, severity, description, (), check)
+        return check
+    return register
+
+
+def rule_applies(rule: Rule, relative: str) -> bool:
+    return any(fnmatch.fnmatchcase(relative, pattern) for pattern in rule.patterns)
+
+
+# --- Built-in file rules -------------------------------------------------
+
+@file_rule("credentials-in-code", CRITICAL, "Credentials stored in code", patterns=CODE_PATTERNS,
+           reads_text=False)
+def check_credentials(relative: str, path: Path):
+    # Byte regex over the file, memory-mapped from MMAP_THRESHOLD up, so large files are never decoded
+    for number, kind in scan_file(path):
+        yield number, finding_message(kind)
+
+
+@file_rule("test-file-naming", WARN, "Test files are named test_[feature_name].py", patterns=("tests/*.py",))
+def check_test_naming(relative: str, text: str):
+    name = relative.rsplit("/", 1)[-1]
+    if relative.startswith("tests/data/") or name in ("__init__.py", "conftest.py"):
+        return
+    if not name.startswith("test_"):
+        yield None, f"Test file should be named test_[feature_name].py: {name}"
+
+
+@file_rule("spec-file-naming", WARN, "Specification files are named spec_[feature_name].md",
+           patterns=("docs/specs/*",))
+def check_spec_naming(relative: str, text: str):
+    name = relative.rsplit("/", 1)[-1]
+    if not (name.startswith("spec_") and name.endswith(".md")):
+        yield None, f"Specification should be named spec_[feature_name].md: {name}"
+
+
+# --- Built-in project rules ----------------------------------------------
+
+@project_rule("foundation-docs", INCOMPLETE, "Foundation documents exist")
+def check_foundation_docs(project_root: Path, files: List[str]):
+    present = set(files)
+    for doc in FOUNDATION_DOCS:
+        if doc not in present:
+            yield doc, None, "Foundation document is missing"
+
+
+@project_rule("readme-sections", WARN, "README.md has the required sections")
+def check_readme_sections(project_root: Path, files: List[str]):
+    readme = Path(project_root) / "README.md"
+    if not readme.is_file():
+        yield "README.md", None, "README.md is missing"
+        return
+    headings = {re.sub(r"[^a-z ]", "", line.lstrip("#").lower()).strip()
+                for line in readme.read_text(encoding="utf-8", errors="replace").splitlines()
+                if line.startswith("#")}
+    for section in README_SECTIONS:
+        if section.lower() not in headings:
+            yield "README.md", None, f"Missing required section: {section}"
+
+
+@project_rule("unfilled-templates", INCOMPLETE, "Foundation documents no longer contain template instructions")
+def check_unfilled_templates(project_root: Path, files: List[str]):
+    for doc in FOUNDATION_DOCS:
+        path = Path(project_root) / doc
+        if not path.is_file():
+            continue
+        for number, line in enumerate(path.read_text(encoding="utf-8", errors="replace").splitlines(), 1):
+            if "Instruction to the Developer" in line:
+                yield doc, number, "Template instruction has not been replaced with project content"
+                break
+
+
+@project_rule("golden-thread", WARN, "Every source file has a matching spec and test")
+def check_golden_thread(project_root: Path, files: List[str]):
+    specs = {path.rsplit("/", 1)[-1][len("spec_"):-len(".md")] for path in files
+             if path.startswith("docs/specs/") and path.rsplit("/", 1)[-1].startswith("spec_")}
+    tests = {path.rsplit("/", 1)[-1][len("test_"):-len(".py")] for path in files
+             if path.startswith("tests/") and path.rsplit("/", 1)[-1].startswith("test_")}
+    for path in files:
+        name = path.rsplit("/", 1)[-1]
+        if not (path.startswith("src/") and name.endswith(".py")) or name.startswith("_"):
+            continue
+        feature = name[:-len(".py")]
+        if feature not in specs:
+            yield path, None, f"No specification docs/specs/spec_{feature}.md"
+        if feature not in tests:
+            yield path, None, f"No test file tests/test_{feature}.py"
+
+
+# --- Engine --------------------------------------------------------------
+
+def load_plugins(project_root: Path) -> List[str]:
+    """Import extra rule modules from the project's rules directory; returns the loaded file names."""
+    plugin_dir = Path(project_root) / PLUGIN_DIR
+    loaded = []
+    if not plugin_dir.is_dir():
+        return loaded
+    for path in sorted(plugin_dir.glob("*.py")):
+        spec = importlib.util.spec_from_file_location(f"specpilot_rules_{path.stem}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        loaded.append(path.name)
+    return loaded
+
+
+def read_text(path: Path) -> Optional[str]:
+    """Read a file as text, or None for binaries (magic bytes or a NUL in the first block) and unreadable files."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if is_binary(data[:SNIFF_BYTES]):
+        return None
+    return data.decode("utf-8", "replace")
+
+
+def check_files(project_root: Path, paths: Sequence[str], rule_ids: Optional[Sequence[str]] = None) -> List[Finding]:
+    """Run the file rules on a batch of paths, reading each file at most once."""
+    rules = [FILE_RULES[rule_id] for rule_id in (rule_ids or FILE_RULES) if rule_id in FILE_RULES]
+    findings = []
+    for relative in paths:
+        applicable = [rule for rule in rules if rule_applies(rule, relative)]
+        if not applicable:
+            continue
+        path = Path(project_root) / relative
+        text = read_text(path) if any(rule.reads_text for rule in applicable) else None
+        for rule in applicable:
+            if rule.reads_text and text is None:
+                continue
+            for line, message in rule.check(relative, text if rule.reads_text else path):
+                findings.append(Finding(rule.id, rule.severity, relative, line, message))
+    return findings
+
+
+def _init_worker(project_root: str):
+    load_plugins(Path(project_root))
+
+
+def run_checks(project_root: Path, workers: Optional[int] = None,
+               files: Optional[List[str]] = None) -> Dict:
+    """Scan the project once, run every rule and return the report."""
+    start = time.perf_counter()
+    project_root = Path(project_root).resolve()
+    plugins = load_plugins(project_root)
+    if files is None:
+        files = sorted(scan_tree(project_root))
+
+    findings = []
+    for rule in PROJECT_RULES.values():
+        for path, line, message in rule.check(project_root, files):
+            findings.append(Finding(rule.id, rule.severity, path, line, message))
+    findings.extend(check_file_batches(project_root, files, workers))
+
+    return build_report(project_root, findings, len(files), plugins, start)
+
+
+def check_file_batches(project_root: Path, files: List[str], workers: Optional[int] = None) -> List[Finding]:
+    """Run file rules inline for small trees and across a process pool otherwise."""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(files) < INLINE_THRESHOLD:
+        return check_files(project_root, files)
+    batches = [files[i:i + BATCH_SIZE] for i in range(0, len(files), BATCH_SIZE)]
+    findings = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(project_root),)) as pool:
+        for batch_findings in pool.map(check_files, [project_root] * len(batches), batches):
+            findings.extend(batch_findings)
+    return findings
+
+
+def build_report(project_root: Path, findings: Iterable[Finding], files_scanned: int,
+                 plugins: List[str], start: float) -> Dict:
+    """Assemble the machine-readable report."""
+    findings = sorted(findings, key=lambda f: (SEVERITIES.index(f.severity), f.path, f.line or 0, f.rule))
+    summary = {severity: sum(1 for f in findings if f.severity == severity) for severity in SEVERITIES}
+    return {
+        "version": 1,
+        "ruleset_version": RULESET_VERSION,
+        "project": str(project_root),
+        "generated": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "files_scanned": files_scanned,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        "rules": sorted(FILE_RULES) + sorted(PROJECT_RULES),
+        "plugins": plugins,
+        "status": "FAIL" if summary[CRITICAL] else "PASS",
+        "summary": summary,
+        "findings": [f._asdict() for f in findings],
+        "semantic_checks": list(SEMANTIC_CHECKS)
+    }
+
+
+def render_markdown(report: Dict) -> str:
+    """Render a report in the coverage_history.md style used by Deep Check."""
+    icons = {CRITICAL: "🚨", WARN: "⚠️", INCOMPLETE: "📝"}
+    summary = report["summary"]
+    lines = [
+        f"## Deep Check (automated) - {report['generated']}",
+        "",
+        f"**Status:** {report['status']} | 🚨 CRITICAL: {summary[CRITICAL]} | ⚠️ WARN: {summary[WARN]} | "
+        f"📝 INCOMPLETE: {summary[INCOMPLETE]} | {report['files_scanned']} files in {report['duration_ms']} ms",
+        ""
+    ]
+    for finding in report["findings"]:
+        location = f"{finding['path']}:{finding['line']}" if finding["line"] else finding["path"]
+        lines.append(f"- {icons[finding['severity']]} **{finding['severity']}** `{location}` "
+                     f"[{finding['rule']}] {finding['message']}")
+    if report["findings"]:
+        lines.append("")
+    if report["semantic_checks"]:
+        lines.append("**Left for the agent (semantic):** " + "; ".join(report["semantic_checks"]))
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point used by Deep Check and Session Check."""
+    parser = argparse.ArgumentParser(description="Run SpecPilot's mechanical validation rules")
+    parser.add_argument('--project', default='.', help='Project root (default: current directory)')
+    parser.add_argument('--json', action='store_true', help='Print the JSON report instead of Markdown')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--list-rules', action='store_true', help='List the registered rules and exit')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Reuse cached results for files unchanged since the last run')
+    parser.add_argument('--full', action='store_true', help='With --incremental, re-evaluate every file')
+    parser.add_argument('--append-history', action='store_true',
+                        help="Append the report (only the delta on re-runs) to the user's coverage_history.md")
+    args = parser.parse_args(argv)
+
+    if args.list_rules:
+        load_plugins(Path(args.project))
+        for rule in list(FILE_RULES.values()) + list(PROJECT_RULES.values()):
+            print(f"{rule.severity:<11} {rule.id:<22} {rule.description}")
+        return 0
+
+    if args.incremental or args.append_history:
+        from specpilot.validation_cache import append_history, default_paths, run_incremental
+        cache_path, history_path = default_paths(Path(args.project))
+        report, previous = run_incremental(Path(args.project), args.workers, cache_path, args.full)
+        if args.append_history:
+            append_history(history_path, report, previous)
+    else:
+        report = run_checks(Path(args.project), args.workers)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        sys.stdout.write(render_markdown(report))
+    return 1 if report["status"] == "FAIL" else 0
+
+
+if __name__ == "__main__":
+    # Run through the package module so plugins and pool workers share its rule registry
+    from specpilot.validation import main as package_main
+    sys.exit(package_main())
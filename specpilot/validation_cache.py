@@ -0,0 +1,242 @@
+"""
+SpecPilot Validation Cache
+
+Incremental Deep Check re-runs. Per-file rule results are cached in
+.specpilot/workspace/<user>/cache/validation_cache.json, keyed by the file's
+SHA-256 digest and by a rule-set key, so a re-run only evaluates files that
+changed since the last run. Project rules are cheap and always re-run.
+
+The rule-set key covers RULESET_VERSION, the registered rules (ids, severity,
+patterns), the engine's reference/ documents, docs/project_conventions.md and
+the project's rule plugins. Changing any of them invalidates every cached
+result.
+
+A file is clean when its size and mtime match the cache (no read at all), or
+when its content digest still matches after a touch. Everything else is
+dirty and goes through the normal rule engine.
+
+The cache also keeps the previous run's findings, so append_history() adds
+only the new and resolved findings to coverage_history.md instead of a full
+report each time.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from specpilot.file_index import scan_tree
+from specpilot.manifest import hash_file
+from specpilot.validation import (CRITICAL, FILE_RULES, INCOMPLETE, PROJECT_RULES, PLUGIN_DIR, RULESET_VERSION,
+                                  WARN, Finding, build_report, check_file_batches, load_plugins, render_markdown,
+                                  rule_applies)
+
+CACHE_VERSION = 1
+CACHE_NAME = "validation_cache.json"
+HISTORY_NAME = "coverage_history.md"
+RULESET_INPUTS = ("docs/project_conventions.md",)
+
+
+def ruleset_key(project_root: Path) -> str:
+    """Digest of everything that decides what the rules report, apart from the checked files."""
+    project_root = Path(project_root)
+    digest = hashlib.sha256(f"ruleset {RULESET_VERSION}\n".encode("utf-8"))
+    for rule in sorted(list(FILE_RULES.values()) + list(PROJECT_RULES.values()), key=lambda rule: rule.id):
+        digest.update(f"rule {rule.id} {rule.severity} {' '.join(rule.patterns)}\n".encode("utf-8"))
+
+    inputs = []
+    reference_dir = project_root / ".specpilot" / "engine" / "reference"
+    engine_archive = project_root / ".specpilot" / "engine.zip"
+    if reference_dir.is_dir():
+        inputs.extend(sorted(reference_dir.rglob("*.md")))
+    elif engine_archive.is_file():
+        # Engine installed as one archive: its index already holds the reference digests
+        from specpilot.engine_archive import open_archive
+        for name, state in sorted(open_archive(engine_archive).digests().items()):
+            if name.startswith("reference/") and name.endswith(".md"):
+                digest.update(f"input .specpilot/engine/{name} {state}\n".encode("utf-8"))
+    inputs.extend(project_root / relative for relative in RULESET_INPUTS)
+    plugin_dir = project_root / PLUGIN_DIR
+    if plugin_dir.is_dir():
+        inputs.extend(sorted(plugin_dir.glob("*.py")))
+    for path in inputs:
+        state = hash_file(path) if path.is_file() else "missing"
+        digest.update(f"input {path.relative_to(project_root).as_posix()} {state}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def default_paths(project_root: Path, username: Optional[str] = None) -> Tuple[Path, Path]:
+    """Return (cache_path, coverage_history_path) for a project's current user."""
+    project_root = Path(project_root).resolve()
+    if not username:
+        from specpilot.logging import resolve_username
+        username = resolve_username(project_root)
+    user_dir = project_root / ".specpilot" / "workspace" / username
+    return user_dir / "cache" / CACHE_NAME, user_dir / "logs" / HISTORY_NAME
+
+
+class ResultCache:
+    """Per-file rule results and the previous run's findings."""
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = Path(cache_path)
+        self.data = self._empty(None)
+
+    def _empty(self, ruleset: Optional[str]) -> Dict:
+        return {"version": CACHE_VERSION, "ruleset": ruleset, "files": {}, "previous": None}
+
+    def load(self, ruleset: str) -> "ResultCache":
+        """Load the cache; file results from another rule-set are dropped, the previous findings are kept."""
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+        if not data or data.get("version") != CACHE_VERSION:
+            self.data = self._empty(ruleset)
+        elif data.get("ruleset") != ruleset:
+            self.data = self._empty(ruleset)
+            self.data["previous"] = data.get("previous")
+        else:
+            self.data = data
+        return self
+
+    def save(self):
+        """Atomically write the cache."""
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_name(f"{CACHE_NAME}.{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self.data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # A read-only workspace still gets a correct (uncached) result
+            pass
+
+    def cached_findings(self, relative: str, st: os.stat_result, project_root: Path) -> Optional[List[Finding]]:
+        """Cached findings for a clean file, or None when it has to be re-evaluated."""
+        entry = self.data["files"].get(relative)
+        if not entry:
+            return None
+        if entry["size"] != st.st_size or entry["mtime_ns"] != st.st_mtime_ns:
+            try:
+                if entry["size"] != st.st_size or hash_file(Path(project_root) / relative) != entry["digest"]:
+                    return None
+            except OSError:
+                return None
+            entry["mtime_ns"] = st.st_mtime_ns
+        return [Finding(rule, severity, relative, line, message)
+                for rule, severity, line, message in entry["findings"]]
+
+    def store(self, relative: str, st: os.stat_result, digest: str, findings: List[Finding]):
+        """Record a freshly evaluated file."""
+        self.data["files"][relative] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "digest": digest,
+            "findings": [[f.rule, f.severity, f.line, f.message] for f in findings]
+        }
+
+
+def run_incremental(project_root: Path, workers: Optional[int] = None, cache_path: Optional[Path] = None,
+                    full: bool = False) -> Tuple[Dict, Optional[Dict]]:
+    """
+    Run every rule, re-evaluating file rules only for files that changed since the last run.
+
+    Returns (report, previous) where previous is the last run's report summary and
+    findings, or None on the first run.
+    """
+    start = time.perf_counter()
+    project_root = Path(project_root).resolve()
+    plugins = load_plugins(project_root)
+    if cache_path is None:
+        cache_path = default_paths(project_root)[0]
+    cache = ResultCache(cache_path).load(ruleset_key(project_root))
+    if full:
+        cache.data["files"] = {}
+    previous = cache.data["previous"]
+
+    stats = scan_tree(project_root)
+    files = sorted(stats)
+    rules = list(FILE_RULES.values())
+    candidates = [relative for relative in files if any(rule_applies(rule, relative) for rule in rules)]
+
+    findings = []
+    for rule in PROJECT_RULES.values():
+        for path, line, message in rule.check(project_root, files):
+            findings.append(Finding(rule.id, rule.severity, path, line, message))
+
+    dirty = []
+    for relative in candidates:
+        cached = cache.cached_findings(relative, stats[relative], project_root)
+        if cached is None:
+            dirty.append(relative)
+        else:
+            findings.extend(cached)
+
+    by_path: Dict[str, List[Finding]] = {relative: [] for relative in dirty}
+    for finding in check_file_batches(project_root, dirty, workers):
+        by_path[finding.path].append(finding)
+    for relative, file_findings in by_path.items():
+        try:
+            cache.store(relative, stats[relative], hash_file(project_root / relative), file_findings)
+        except OSError:
+            continue
+        findings.extend(file_findings)
+
+    live = set(candidates)
+    cache.data["files"] = {relative: entry for relative, entry in cache.data["files"].items() if relative in live}
+
+    report = build_report(project_root, findings, len(files), plugins, start)
+    report["cache"] = {"evaluated": len(dirty), "reused": len(candidates) - len(dirty), "ruleset": cache.data["ruleset"]}
+    cache.data["previous"] = {"generated": report["generated"], "findings": report["findings"]}
+    cache.save()
+    return report, previous
+
+
+def finding_key(finding: Dict) -> Tuple:
+    return finding["rule"], finding["path"], finding["line"], finding["message"]
+
+
+def diff_findings(previous: Optional[Dict], report: Dict) -> Tuple[List[Dict], List[Dict]]:
+    """Return (new, resolved) findings relative to the previous run."""
+    before = {finding_key(f): f for f in (previous or {}).get("findings", [])}
+    after = {finding_key(f): f for f in report["findings"]}
+    new = [f for key, f in after.items() if key not in before]
+    resolved = [f for key, f in before.items() if key not in after]
+    return new, resolved
+
+
+def render_delta(report: Dict, previous: Dict) -> str:
+    """Render only what changed since the previous run, in the coverage_history.md style."""
+    icons = {CRITICAL: "🚨", WARN: "⚠️", INCOMPLETE: "📝"}
+    summary = report["summary"]
+    new, resolved = diff_findings(previous, report)
+    lines = [
+        f"## Deep Check (automated, delta) - {report['generated']}",
+        "",
+        f"**Status:** {report['status']} | 🚨 CRITICAL: {summary[CRITICAL]} | ⚠️ WARN: {summary[WARN]} | "
+        f"📝 INCOMPLETE: {summary[INCOMPLETE]} | {len(new)} new, {len(resolved)} resolved since "
+        f"{previous['generated']}",
+        ""
+    ]
+    for label, group in (("New", new), ("Resolved", resolved)):
+        for finding in group:
+            location = f"{finding['path']}:{finding['line']}" if finding["line"] else finding["path"]
+            lines.append(f"- {label}: {icons[finding['severity']]} **{finding['severity']}** `{location}` "
+                         f"[{finding['rule']}] {finding['message']}")
+    if new or resolved:
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def append_history(history_path: Path, report: Dict, previous: Optional[Dict]) -> str:
+    """Append the full report on the first run and only the delta afterwards; returns the appended text."""
+    text = render_markdown(report) if previous is None else render_delta(report, previous)
+    history_path = Path(history_path)
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(history_path, "a", encoding="utf-8") as f:
+        f.write("\n" + text)
+    return text
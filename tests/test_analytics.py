@@ -0,0 +1,96 @@
+"""Session analytics: attribution of transcripts around commits."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from specpilot.analytics import SessionAnalytics
+from specpilot.log_rotation import LogRotator
+
+MILESTONES = """\
+2026-10-01 10:00:00 - alice - 🎯 - [MODE_SWITCH] - Switched to Code Mode
+2026-10-01 10:30:00 - alice - ✅ - [GIT_COMMIT_SUCCESS] - abc123 first
+2026-10-01 10:40:00 - alice - 📝 - [CODE_PROPOSED] - after the commit
+"""
+
+TRANSCRIPT = """\
+{timestamp} - alice - 📝 - [TRANSCRIPT_BATCH] - Session conversations
+---
+### USER PROMPT:
+{prompt}
+---
+"""
+
+
+class SessionAnalyticsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logs_dir = Path(self.tmp.name) / "alice" / "logs"
+        self.logs_dir.mkdir(parents=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_logs(self, milestones: str, transcripts: str):
+        with open(self.logs_dir / "specpilot.log", "a") as f:
+            f.write(milestones)
+        with open(self.logs_dir / "specpilot_verbose.log", "a") as f:
+            f.write(transcripts)
+
+    def test_commit_and_older_transcripts_in_one_update(self):
+        self.write_logs(MILESTONES,
+                        TRANSCRIPT.format(timestamp="2026-10-01 10:10:00", prompt="this is still broken, fix it")
+                        + TRANSCRIPT.format(timestamp="2026-10-01 10:45:00", prompt="add the export command"))
+        state = SessionAnalytics(self.logs_dir).update().state
+
+        self.assertEqual(state['session']['user_turns'], 1)
+        self.assertEqual(state['session']['frustration_hits'], 0)
+        self.assertEqual(state['previous_session']['user_turns'], 1)
+        self.assertGreater(state['previous_session']['frustration_hits'], 0)
+
+    def test_transcript_read_after_commit_goes_to_previous_session(self):
+        self.write_logs(MILESTONES, "")
+        SessionAnalytics(self.logs_dir).update()
+        self.write_logs("", TRANSCRIPT.format(timestamp="2026-10-01 10:20:00", prompt="try again"))
+        state = SessionAnalytics(self.logs_dir).update().state
+
+        self.assertEqual(state['session']['user_turns'], 0)
+        self.assertEqual(state['previous_session']['user_turns'], 1)
+
+    def rotate(self):
+        for name in ("specpilot.log", "specpilot_verbose.log"):
+            LogRotator(self.logs_dir / name, "gzip").rotate()
+
+    def test_first_update_reads_rotated_segments(self):
+        self.write_logs(MILESTONES, TRANSCRIPT.format(timestamp="2026-10-01 10:45:00", prompt="add the export command"))
+        self.rotate()
+        state = SessionAnalytics(self.logs_dir).update().state
+
+        self.assertEqual(state['last_commit'], "2026-10-01 10:30:00")
+        self.assertEqual(state['current_mode'], "Code")
+        self.assertEqual(state['session']['event_counts'], {"CODE_PROPOSED": 1})
+        self.assertEqual(state['session']['user_turns'], 1)
+
+    def test_rotation_between_updates_keeps_the_unread_tail(self):
+        self.write_logs(MILESTONES, "")
+        SessionAnalytics(self.logs_dir).update()
+        self.write_logs("2026-10-01 10:50:00 - alice - ✅ - [TESTS_PASSED] - before rotation\n",
+                        TRANSCRIPT.format(timestamp="2026-10-01 10:50:00", prompt="add the export command"))
+        self.rotate()
+        self.write_logs("2026-10-01 11:00:00 - alice - 📝 - [CODE_PROPOSED] - after rotation\n", "")
+        self.rotate()
+        self.write_logs("2026-10-01 11:10:00 - alice - 🎯 - [MODE_SWITCH] - Switched to Vibe Mode\n", "")
+        state = SessionAnalytics(self.logs_dir).update().state
+
+        self.assertEqual(state['session']['event_counts'],
+                         {"CODE_PROPOSED": 2, "TESTS_PASSED": 1, "MODE_SWITCH": 1})
+        self.assertEqual(state['session']['user_turns'], 1)
+        self.assertEqual(state['current_mode'], "Vibe")
+
+        state = SessionAnalytics(self.logs_dir).update().state
+        self.assertEqual(sum(state['session']['event_counts'].values()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+"""A freshly installed configuration passes the config schema."""
+
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from specpilot.answers import normalize_answers
+from specpilot.config import NOTEPAD_SUMMARIES, ConfigResolver
+from specpilot.installer import SpecPilotBootstrap
+
+
+class InstalledConfigTest(unittest.TestCase):
+
+    def install(self, answers) -> Path:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        bootstrap = SpecPilotBootstrap(tmp.name)
+        bootstrap.answers = normalize_answers(answers, "test")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(bootstrap.run_fast_mode("Config Test"))
+        return Path(tmp.name)
+
+    def test_fresh_install_validates_for_every_notepad_choice(self):
+        for notepad in NOTEPAD_SUMMARIES + ("verbose",):
+            with self.subTest(notepad=notepad):
+                resolver = ConfigResolver(self.install({"notepad": notepad, "username": "alice"}), "alice")
+                resolver.resolve()
+                self.assertEqual(resolver.errors, [])
+                self.assertIn(resolver.get("logging.notepad_summary"), NOTEPAD_SUMMARIES)
+
+    def test_interactive_notepad_choices_are_in_the_schema(self):
+        bootstrap = SpecPilotBootstrap(tempfile.gettempdir())
+        for choice in ("1", "2", "3"):
+            with mock.patch("builtins.input", return_value=choice), contextlib.redirect_stdout(io.StringIO()):
+                self.assertIn(bootstrap.get_notepad_preference(), NOTEPAD_SUMMARIES)
+
+
+if __name__ == "__main__":
+    unittest.main()
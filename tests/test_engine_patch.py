@@ -0,0 +1,77 @@
+"""Engine delta patches: deltas, chains and refusal of locally modified engines."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from specpilot.engine_archive import DirectoryEngine
+from specpilot.engine_patch import (PatchError, apply_delta, compose_patches, find_chain, make_delta,
+                                    make_patch, sha256)
+
+PROTOCOL = "".join(f"{number}. Follow rule {number} of the protocol before proposing code.\n"
+                   for number in range(1, 60))
+
+
+class EnginePatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.patch_dir = self.root / "patches"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def engine(self, version: str, files: dict) -> DirectoryEngine:
+        path = self.root / version
+        for relative, text in dict(files, **{"engine_version.json": json.dumps({"version": version})}).items():
+            (path / relative).parent.mkdir(parents=True, exist_ok=True)
+            (path / relative).write_text(text, encoding="utf-8")
+        return DirectoryEngine(path)
+
+    def compose(self, chain, engine: DirectoryEngine):
+        return compose_patches(chain, engine.digests(), engine.read_bytes)
+
+    def test_delta_round_trip(self):
+        old = PROTOCOL.encode("utf-8")
+        new = old.replace(b"rule 30 ", b"the revised rule 30 ") + b"60. A new closing rule.\n"
+        delta = make_delta(old, new)
+        self.assertLess(len(delta), len(new))
+        self.assertEqual(apply_delta(old, delta), new)
+
+    def test_two_patch_chain(self):
+        v1 = self.engine("1.0.0", {"protocols/pilot.md": PROTOCOL, "commands/old.md": "old command\n"})
+        v2 = self.engine("1.1.0", {"protocols/pilot.md": PROTOCOL.replace("rule 5 ", "rule five "),
+                                   "commands/old.md": "old command\n"})
+        v3 = self.engine("1.2.0", {"protocols/pilot.md": PROTOCOL.replace("rule 5 ", "rule five ") + "60. Last.\n",
+                                   "commands/new.md": "new command\n"})
+        first = make_patch(v1, v2, self.patch_dir)
+        make_patch(v2, v3, self.patch_dir)
+        self.assertEqual(first["files"]["protocols/pilot.md"]["op"], "delta")
+
+        chain = find_chain(self.patch_dir, "1.0.0")
+        self.assertEqual([index["to_version"] for index in chain], ["1.1.0", "1.2.0"])
+        result = self.compose(chain, v1)
+        self.assertEqual(result["digests"], v3.digests())
+        self.assertEqual(result["remove"], ["commands/old.md"])
+        self.assertEqual(result["write"]["protocols/pilot.md"][0], v3.read_bytes("protocols/pilot.md"))
+
+    def test_locally_modified_base_is_refused(self):
+        v1 = self.engine("1.0.0", {"protocols/pilot.md": PROTOCOL, "core/rules.md": "rules\n",
+                                   "commands/old.md": "old command\n"})
+        v2 = self.engine("1.1.0", {"protocols/pilot.md": PROTOCOL + "60. Last.\n", "core/rules.md": "new\n"})
+        index = make_patch(v1, v2, self.patch_dir)
+        self.assertEqual({relative: entry["op"] for relative, entry in index["files"].items()},
+                         {"protocols/pilot.md": "delta", "core/rules.md": "add", "commands/old.md": "remove",
+                          "engine_version.json": "add"})
+
+        for relative in ("protocols/pilot.md", "core/rules.md", "commands/old.md"):
+            with self.subTest(relative=relative):
+                digests = dict(v1.digests(), **{relative: sha256(b"edited locally\n")})
+                with self.assertRaisesRegex(PatchError, "locally modified"):
+                    compose_patches([index], digests, v1.read_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
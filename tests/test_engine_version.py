@@ -0,0 +1,31 @@
+"""Engine version compatibility between installed and source engines."""
+
+import unittest
+
+from specpilot.engine_version import check_compatibility
+
+
+def info(version: str, compatible_from: str = "1.0.0"):
+    return {"version": version, "compatible_from": compatible_from}
+
+
+class CheckCompatibilityTest(unittest.TestCase):
+
+    def test_upgrade_reports_direction(self):
+        self.assertEqual(check_compatibility(info("1.0.0"), info("1.1.0")), (True, "upgrade 1.0.0 -> 1.1.0"))
+
+    def test_minor_downgrade_needs_explicit_permission(self):
+        ok, reason = check_compatibility(info("1.1.0"), info("1.0.0"))
+        self.assertFalse(ok)
+        self.assertIn("downgrade 1.1.0 -> 1.0.0", reason)
+        self.assertEqual(check_compatibility(info("1.1.0"), info("1.0.0"), allow_downgrade=True),
+                         (True, "downgrade 1.1.0 -> 1.0.0 (allowed)"))
+
+    def test_install_older_than_compatible_from_is_refused(self):
+        ok, reason = check_compatibility(info("1.0.0"), info("2.0.0", compatible_from="1.5.0"))
+        self.assertFalse(ok)
+        self.assertIn("1.5.0 or newer", reason)
+
+
+if __name__ == "__main__":
+    unittest.main()
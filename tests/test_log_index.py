@@ -0,0 +1,68 @@
+"""Log index queries over the live log and its rotated segments."""
+
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from specpilot.file_index import last_commit_timestamp
+from specpilot.log_index import LogIndex, iter_events, main
+from specpilot.log_rotation import LogRotator
+
+EVENTS = """\
+2026-10-01 10:00:00 - alice - 🎯 - [MODE_SWITCH] - Switched to Plan Mode
+2026-10-01 10:30:00 - alice - ✅ - [GIT_COMMIT_SUCCESS] - abc123 first
+2026-10-01 10:40:00 - alice - 🎯 - [MODE_SWITCH] - Switched to Code Mode
+"""
+
+
+class LogIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self.tmp.name)
+        self.logs_dir = self.project / ".specpilot" / "workspace" / "alice" / "logs"
+        self.logs_dir.mkdir(parents=True)
+        self.log_path = self.logs_dir / "specpilot.log"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def query(self, *args: str):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            code = main(["--project", str(self.project), "--user", "alice", *args])
+        return code, out.getvalue()
+
+    def test_missing_log_is_empty(self):
+        self.assertEqual(list(iter_events(self.log_path)), [])
+        index = LogIndex(self.log_path).refresh()
+        self.assertIsNone(index.last("GIT_COMMIT_SUCCESS"))
+        self.assertEqual(list(index.events_after_last("GIT_COMMIT_SUCCESS")), [])
+        self.assertEqual(self.query("since-last-commit"), (0, ""))
+        self.assertEqual(self.query("--log", "verbose", "since-last-commit"), (0, ""))
+
+    def test_queries_fall_back_to_rotated_segments(self):
+        self.log_path.write_text(EVENTS, encoding="utf-8")
+        LogRotator(self.log_path, "gzip").rotate()
+        self.assertFalse(self.log_path.exists())
+
+        code, out = self.query("last", "GIT_COMMIT_SUCCESS")
+        self.assertEqual(code, 0)
+        self.assertIn("abc123 first", out)
+        self.assertEqual(last_commit_timestamp(self.logs_dir), "2026-10-01 10:30:00")
+
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write("2026-10-01 11:00:00 - alice - 📝 - [CODE_PROPOSED] - live\n")
+        code, out = self.query("since-last-commit")
+        self.assertEqual(out.splitlines(), [
+            "2026-10-01 10:40:00 - alice - 🎯 - [MODE_SWITCH] - Switched to Code Mode",
+            "2026-10-01 11:00:00 - alice - 📝 - [CODE_PROPOSED] - live",
+        ])
+        code, out = self.query("since", "2026-10-01 10:30:00")
+        self.assertEqual(len(out.splitlines()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()